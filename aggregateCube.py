@@ -0,0 +1,226 @@
+import json
+import os
+import numpy as np
+from typing import Dict, Any, List, Tuple
+
+from countryHierarchy import leaf_mask
+
+CUBE_VERSION = 3
+CUBE_SUFFIX = ".cube.npz"
+
+# Order of the last axis of AggregateCube.data
+CUBE_STATS = ('sum', 'count', 'min', 'max', 'mean')
+
+# DataProcessor operation names that the cube can answer directly
+CUBE_OPERATIONS = {'sum': 'sum', 'count': 'count', 'min': 'min', 'max': 'max', 'average': 'mean'}
+
+# Fixed odd multipliers for the per-row change hash (one per year column)
+_HASH_SEED = 0x9E3779B97F4A7C15
+
+
+def _normalise(value: Any) -> str:
+    return str(value).strip().casefold()
+
+
+def _year_columns(df) -> List[str]:
+    return sorted(str(c) for c in df.columns if str(c).strip().isdigit() and len(str(c).strip()) == 4)
+
+
+def _row_hashes(matrix: np.ndarray) -> np.ndarray:
+    """Cheap per-row hash of a float matrix, used to spot changed rows"""
+    if matrix.shape[1] == 0:
+        return np.zeros(len(matrix), dtype=np.uint64)
+    canonical = np.where(np.isnan(matrix), np.nan, matrix)
+    bits = np.ascontiguousarray(canonical).view(np.uint64)
+    # Odd multipliers are invertible mod 2**64, so a single changed cell always changes the hash
+    multipliers = (np.arange(1, matrix.shape[1] + 1, dtype=np.uint64) * np.uint64(_HASH_SEED)) | np.uint64(1)
+    return np.bitwise_xor.reduce(bits * multipliers, axis=1)
+
+
+def _reduce_rows(rows: np.ndarray) -> np.ndarray:
+    """Return (years, len(CUBE_STATS)) statistics for one group of rows"""
+    out = np.full((rows.shape[1], len(CUBE_STATS)), np.nan)
+    valid = ~np.isnan(rows)
+    counts = valid.sum(axis=0)
+    sums = np.where(valid, rows, 0.0).sum(axis=0)
+    out[:, 0] = sums
+    out[:, 1] = counts
+    if len(rows):
+        has_data = counts > 0
+        out[has_data, 2] = np.fmin.reduce(rows, axis=0)[has_data]
+        out[has_data, 3] = np.fmax.reduce(rows, axis=0)[has_data]
+        out[has_data, 4] = sums[has_data] / counts[has_data]
+    return out
+
+
+class AggregateCube:
+    """Continent x year x {sum, count, min, max, mean} computed once per dataset.
+
+    Cells cover leaf countries only. After the continents come two extra
+    groups: leaf rows without a continent, then aggregate rows (World Bank
+    region and income-group codes). Continent and dataset-wide totals read
+    the leaf groups alone, so nothing is double counted.
+    """
+
+    def __init__(self, continents: List[str], years: List[str], data: np.ndarray,
+                 row_codes: np.ndarray, row_keys: np.ndarray, row_hashes: np.ndarray):
+        self.continents = list(continents)
+        self.years = list(years)
+        self.data = data
+        self.row_codes = row_codes
+        self.row_keys = row_keys
+        self.row_hashes = row_hashes
+        self.continent_index = {}
+        for i, name in enumerate(self.continents):
+            self.continent_index.setdefault(_normalise(name), i)
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+        self.row_counts = np.bincount(row_codes, minlength=len(self.continents) + 2)
+        # fingerprint of the dataset the cube was built from, if known
+        self.fingerprint = None
+
+    # -----------------------------
+    # Building
+    # -----------------------------
+
+    @staticmethod
+    def _frame_arrays(df) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        years = _year_columns(df)
+        matrix = df[years].to_numpy(dtype=np.float64, na_value=np.nan)
+        labels = df['Continent'].to_numpy(dtype=object)
+        key_column = 'Country Code' if 'Country Code' in df.columns else 'Country Name'
+        keys = df[key_column].astype(str).to_numpy(dtype=str)
+        return years, matrix, labels, leaf_mask(df), keys
+
+    @staticmethod
+    def _group_codes(labels: np.ndarray, leaves: np.ndarray, lookup: Dict[str, int]) -> np.ndarray:
+        """Group of every row: its continent, then unlabelled leaves, then aggregates (-1: unknown continent)"""
+        n = len(lookup)
+        codes = np.array([lookup.get(label, -1) if isinstance(label, str) else n for label in labels],
+                         dtype=np.intp)
+        codes[~leaves] = n + 1
+        return codes
+
+    @classmethod
+    def from_frame(cls, df) -> "AggregateCube":
+        """Build the cube from a cleaned frame"""
+        years, matrix, labels, leaves, keys = cls._frame_arrays(df)
+        continents = sorted({label for label in labels[leaves] if isinstance(label, str)})
+        codes = cls._group_codes(labels, leaves, {name: i for i, name in enumerate(continents)})
+
+        data = np.empty((len(continents) + 2, len(years), len(CUBE_STATS)))
+        for c in range(len(continents) + 2):
+            data[c] = _reduce_rows(matrix[codes == c])
+
+        cube = cls(continents, years, data, codes, keys, _row_hashes(matrix))
+        cube.fingerprint = df.attrs.get("fingerprint")
+        return cube
+
+    def update(self, df) -> List[str]:
+        """Bring the cube up to date with a changed frame.
+
+        When the rows are the same countries in the same order, only the
+        continents owning a changed row are recomputed; anything else falls
+        back to a full rebuild. Returns the continents that were recomputed.
+        """
+        years, matrix, labels, leaves, keys = self._frame_arrays(df)
+        codes = self._group_codes(labels, leaves, {name: i for i, name in enumerate(self.continents)})
+
+        if years != self.years or len(keys) != len(self.row_keys) or \
+                not np.array_equal(keys, self.row_keys) or (codes < 0).any():
+            self.__dict__.update(AggregateCube.from_frame(df).__dict__)
+            return list(self.continents)
+
+        hashes = _row_hashes(matrix)
+        changed = (hashes != self.row_hashes) | (codes != self.row_codes)
+        affected = np.union1d(self.row_codes[changed], codes[changed])
+        for c in affected:
+            self.data[c] = _reduce_rows(matrix[codes == c])
+
+        self.row_codes = codes
+        self.row_hashes = hashes
+        self.fingerprint = df.attrs.get("fingerprint")
+        self.row_counts = np.bincount(codes, minlength=len(self.continents) + 2)
+        return [self.continents[c] for c in affected if c < len(self.continents)]
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+
+    def has_region(self, region: str) -> bool:
+        return _normalise(region) in self.continent_index
+
+    def has_year(self, year: Any) -> bool:
+        return str(year) in self.year_index
+
+    def get(self, region: str, year: Any, stat: str = 'sum') -> float:
+        """One statistic for one continent and year"""
+        c = self.continent_index[_normalise(region)]
+        return float(self.data[c, self.year_index[str(year)], CUBE_STATS.index(stat)])
+
+    def total(self, year: Any, stat: str = 'sum') -> float:
+        """One statistic over every leaf country of the dataset for a year"""
+        column = self.data[:len(self.continents) + 1, self.year_index[str(year)], :]
+        sums, counts = column[:, 0].sum(), column[:, 1].sum()
+        if stat == 'sum':
+            return float(sums)
+        if stat == 'count':
+            return float(counts)
+        if not counts:
+            return float('nan')
+        if stat == 'mean':
+            return float(sums / counts)
+        reducer = np.fmin if stat == 'min' else np.fmax
+        return float(reducer.reduce(column[:, CUBE_STATS.index(stat)]))
+
+    def year_slice(self, year: Any, stat: str = 'sum') -> Tuple[List[str], np.ndarray]:
+        """Continent labels and their statistic for one year"""
+        values = self.data[:len(self.continents), self.year_index[str(year)], CUBE_STATS.index(stat)]
+        return list(self.continents), values
+
+    def region_series(self, region: str, stat: str = 'sum') -> np.ndarray:
+        """A continent's statistic across every year"""
+        c = self.continent_index[_normalise(region)]
+        return self.data[c, :, CUBE_STATS.index(stat)]
+
+    def covers(self, df) -> bool:
+        """True when df is the frame the cube was built from: same dataset, same rows"""
+        return self.fingerprint is not None and df.attrs.get("fingerprint") == self.fingerprint \
+            and len(df) == len(self.row_codes)
+
+    def region_rows(self, region: str) -> int:
+        return int(self.row_counts[self.continent_index[_normalise(region)]])
+
+    def leaf_rows(self) -> int:
+        """Rows behind total(): every country row, aggregates left out"""
+        return int(self.row_counts[:len(self.continents) + 1].sum())
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def save(self, path: str, fingerprint: str | None) -> None:
+        meta = {"version": CUBE_VERSION, "fingerprint": fingerprint,
+                "continents": self.continents, "years": self.years}
+        tmp_path = path + ".tmp.npz"
+        try:
+            np.savez(tmp_path, meta=np.array(json.dumps(meta)), data=self.data,
+                     row_codes=self.row_codes, row_keys=self.row_keys, row_hashes=self.row_hashes)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["AggregateCube", Dict[str, Any]] | None:
+        """Load a saved cube; returns (cube, meta) or None if unreadable"""
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                meta = json.loads(str(saved["meta"]))
+                if meta.get("version") != CUBE_VERSION:
+                    return None
+                cube = cls(meta["continents"], meta["years"], saved["data"],
+                           saved["row_codes"], saved["row_keys"], saved["row_hashes"])
+                cube.fingerprint = meta.get("fingerprint")
+        except Exception:
+            return None
+        return cube, meta
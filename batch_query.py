@@ -0,0 +1,57 @@
+import argparse
+import json
+import sys
+from typing import Dict, Any, Iterator, List
+
+from dataLoader import DataLoader
+from dataProcessor import DataProcessor
+
+
+def read_configs(filepath: str) -> List[Dict[str, Any]]:
+    """Read configs from a JSON list or a JSON Lines file ("-" for stdin)"""
+    if filepath == "-":
+        text = sys.stdin.read()
+    else:
+        with open(filepath, 'r') as f:
+            text = f.read()
+
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def run_batch(configs: List[Dict[str, Any]], data_file: str) -> Iterator[Dict[str, Any]]:
+    """Load the dataset once and yield one result per config, in input order"""
+    loader = DataLoader()
+    df = loader.load_cleaned(data_file)
+    if df.empty:
+        raise SystemExit(f"Data file '{data_file}' not found or empty")
+
+    return DataProcessor().process_batch(df, configs, loader=loader)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Evaluate many GDP configs in one pass")
+    parser.add_argument("configs", help="JSON list or JSON Lines file of configs ('-' for stdin)")
+    parser.add_argument("--data", default="gdp_cleaned_fixed.csv", help="cleaned GDP CSV")
+    parser.add_argument("--output", default="-", help="JSON Lines output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        configs = read_configs(args.configs)
+    except (OSError, json.JSONDecodeError) as exc:
+        print(f"Error: cannot read configs from '{args.configs}': {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    out = sys.stdout if args.output == "-" else open(args.output, 'w')
+    try:
+        for result in run_batch(configs, args.data):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Benchmark every GDP pipeline stage on synthetic scaled-up datasets.
+
+    python benchmarks/bench_pipeline.py --scales 1,10,100 --output bench.json
+    python benchmarks/bench_pipeline.py --baseline bench.json --threshold 0.25
+
+Each synthetic dataset repeats the rows of gdp_cleaned_fixed.csv ``scale``
+times. Copies get their own country names/codes, cycle through several
+indicator codes, perturb the values, and write part of them with thousands
+separators so the cleaning stage has real work. Datasets also grow wider:
+every row carries indicator value columns (population, GNP, ...), one more
+per tenfold scale unless --indicator-columns fixes the count; process_data
+uses the first one as weights. Every (scale, stage) runs in a fresh process
+with a time limit. The peak RSS is reset once the stage's inputs are built,
+so peak_rss_mb is the high-water mark while the stage runs and
+stage_rss_mb what the stage added on top of its inputs.
+"""
+import argparse
+import gc
+import json
+import math
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, List
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import numpy as np
+import pandas as pd
+
+SOURCE = os.path.join(REPO, "gdp_cleaned_fixed.csv")
+DATA_DIR = os.path.join(REPO, "benchmarks", "data")
+
+INDICATORS = ["NY.GDP.MKTP.CD", "NY.GDP.PCAP.CD", "SP.POP.TOTL", "NY.GNP.MKTP.CD"]
+
+# Per-row indicator value columns added to the synthetic datasets, in order
+INDICATOR_COLUMNS = ["SP.POP.TOTL", "NY.GNP.MKTP.CD", "NE.EXP.GNFS.CD", "NE.IMP.GNFS.CD",
+                     "BX.KLT.DINV.CD.WD", "GC.DOD.TOTL.CN"]
+
+DATA_STAGES = ["load_csv", "clean_numeric_columns", "filter_by_config", "process_data"]
+CHART_STAGES = ["yearly_gdp_bar", "regional_gdp_bar", "yearly_gdp_pie", "regional_gdp_pie",
+                "plot_country_timeseries", "plot_region_time_series"]
+
+BENCH_CONFIG = {"year": 2020, "operation": "average", "region": "Asia", "country": "Nigeria"}
+
+STAGE_TIMEOUT_SECONDS = 1800
+
+
+# -----------------------------
+# Synthetic data
+# -----------------------------
+
+def indicator_columns(scale: int) -> int:
+    """Default number of indicator value columns: one, plus one per tenfold scale"""
+    return 1 + int(round(math.log10(max(scale, 1))))
+
+
+def _indicator_names(count: int) -> List[str]:
+    return [INDICATOR_COLUMNS[i % len(INDICATOR_COLUMNS)] + (f" #{i // len(INDICATOR_COLUMNS)}"
+                                                             if i >= len(INDICATOR_COLUMNS) else "")
+            for i in range(count)]
+
+
+def synthetic_dataset(scale: int, columns: int | None = None) -> str:
+    """Path of the raw (uncleaned) synthetic CSV for a scale, generating it once"""
+    columns = indicator_columns(scale) if columns is None else columns
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"gdp_x{scale}_c{columns}.csv")
+    if os.path.exists(path):
+        return path
+
+    base = pd.read_csv(SOURCE)
+    years = [c for c in base.columns if str(c).isdigit()]
+    rng = np.random.default_rng(scale)
+    parts = []
+    for copy in range(scale):
+        part = base.copy()
+        if copy:
+            part["Country Name"] = part["Country Name"] + f" #{copy}"
+            part["Country Code"] = part["Country Code"] + f"{copy}"
+            part[years] = part[years] * rng.uniform(0.5, 1.5, size=(len(part), 1))
+        part["Indicator Code"] = INDICATORS[copy % len(INDICATORS)]
+        parts.append(part)
+    df = pd.concat(parts, ignore_index=True)
+    for name in _indicator_names(columns):
+        df[name] = rng.lognormal(mean=15.0, sigma=2.0, size=len(df)).round(1)
+
+    # write a third of the year columns with thousands separators, as raw
+    # World Bank extracts do
+    for col in years[::3]:
+        df[col] = df[col].map(lambda v: "" if pd.isna(v) else f"{v:,.1f}")
+    df.to_csv(path, index=False)
+    return path
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+
+def _stage_runner(stage: str, raw_path: str):
+    """Return (callable running the stage once, rows processed or None)"""
+    from dataLoader import DataLoader
+    from dataProcessor import DataProcessor
+
+    loader = DataLoader()
+    if stage == "load_csv":
+        return lambda: loader.load_csv(raw_path), None
+
+    raw = loader.load_csv(raw_path)
+    if stage == "clean_numeric_columns":
+        return lambda: loader.clean_numeric_columns(raw.copy()), len(raw)
+
+    df = loader.clean_numeric_columns(raw)
+    if stage == "filter_by_config":
+        return lambda: loader.filter_by_config(df, BENCH_CONFIG), len(df)
+    if stage == "process_data":
+        weights = [c for c in df.columns if str(c).split(" #")[0] in INDICATOR_COLUMNS][:1]
+        config = {**BENCH_CONFIG, "operations": ["weighted_mean"], "weights": weights[0]} if weights \
+            else BENCH_CONFIG
+        return lambda: DataProcessor(memo_size=0).process_data(df, config), len(df)
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import dashboard
+    import draw_bar_chart
+    import draw_pie_chart
+
+    year, region, country = BENCH_CONFIG["year"], BENCH_CONFIG["region"], BENCH_CONFIG["country"]
+    draw = {
+        "yearly_gdp_bar": lambda: draw_bar_chart.yearly_gdp_bar(df, year),
+        "regional_gdp_bar": lambda: draw_bar_chart.regional_gdp_bar(df, region, year),
+        "yearly_gdp_pie": lambda: draw_pie_chart.yearly_gdp_pie(df, year),
+        "regional_gdp_pie": lambda: draw_pie_chart.regional_gdp_pie(df, region, year),
+        "plot_country_timeseries": lambda: dashboard.plot_country_timeseries(df, country, show=False),
+        "plot_region_time_series": lambda: dashboard.plot_region_time_series(df, region, show=False),
+    }[stage]
+
+    def render():
+        # draw and rasterise, as savefig would, then release the figure
+        draw()
+        fig = plt.gcf()
+        fig.canvas.draw()
+        plt.close("all")
+
+    return render, len(df)
+
+
+def _run_stage(stage: str, raw_path: str, repeats: int, queue) -> None:
+    try:
+        queue.put(_time_stage(stage, raw_path, repeats))
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def _rss_mb(field: str) -> float | None:
+    """VmRSS / VmHWM of this process from /proc (Linux), in MB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Start a new RSS high-water mark (Linux 4.0+); False where that is not possible"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1e6 if sys.platform == "darwin" else 1e3)
+
+
+def _time_stage(stage: str, raw_path: str, repeats: int) -> Dict[str, Any]:
+    run, rows = _stage_runner(stage, raw_path)
+    gc.collect()
+    setup_rss = _rss_mb("VmRSS")
+    reset = setup_rss is not None and _reset_peak_rss()
+    if not reset:
+        # no resettable high-water mark: subtract the peak the setup reached
+        setup_rss = _max_rss_mb()
+
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    if rows is None:
+        rows = len(result)
+
+    tracemalloc.start()
+    run()
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_rss = _rss_mb("VmHWM") if reset else _max_rss_mb()
+    return {
+        "rows": rows,
+        "seconds": min(timings),
+        "rows_per_sec": rows / min(timings) if min(timings) else None,
+        "py_peak_mb": py_peak / 1e6,
+        "peak_rss_mb": peak_rss,
+        "stage_rss_mb": max(peak_rss - setup_rss, 0.0),
+    }
+
+
+def measure(stage: str, raw_path: str, repeats: int, timeout: float = STAGE_TIMEOUT_SECONDS) -> Dict[str, Any]:
+    """Run one stage in a fresh process and return its measurements.
+
+    A process that dies without reporting, or runs past timeout seconds,
+    gives an {"error": ...} result instead of hanging the run.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_stage, args=(stage, raw_path, repeats, queue))
+    proc.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1.0)
+        except queue_module.Empty:
+            if not proc.is_alive():
+                try:
+                    result = queue.get(timeout=1.0)  # reported just before exiting
+                except queue_module.Empty:
+                    result = {"error": f"worker exited with code {proc.exitcode} without a result"}
+            elif time.monotonic() > deadline:
+                proc.terminate()
+                result = {"error": f"timed out after {timeout:.0f}s"}
+    proc.join()
+    if proc.exitcode and "error" not in result:
+        result = {"error": f"worker exited with code {proc.exitcode}"}
+    return result
+
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float) -> List[str]:
+    """Messages for every (scale, columns, stage) slower than baseline by more than threshold"""
+    previous = {(r["scale"], r.get("columns"), r["stage"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get((r["scale"], r.get("columns"), r["stage"]))
+        if old and r["seconds"] > old["seconds"] * (1 + threshold):
+            regressions.append(f"{r['stage']} x{r['scale']}: {old['seconds']:.4f}s -> {r['seconds']:.4f}s "
+                               f"(+{(r['seconds'] / old['seconds'] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GDP pipeline stages")
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated, e.g. 1,10,100,1000")
+    parser.add_argument("--stages", help="comma-separated subset of stages")
+    parser.add_argument("--chart-max-scale", type=int, default=10,
+                        help="skip chart stages above this scale (they plot every row)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--indicator-columns", type=int,
+                        help="indicator value columns per row (default: 1 + log10(scale))")
+    parser.add_argument("--timeout", type=float, default=STAGE_TIMEOUT_SECONDS, help="seconds per stage")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(",")]
+    stages = args.stages.split(",") if args.stages else DATA_STAGES + CHART_STAGES
+
+    results = []
+    for scale in scales:
+        columns = indicator_columns(scale) if args.indicator_columns is None else args.indicator_columns
+        raw_path = synthetic_dataset(scale, columns)
+        for stage in stages:
+            if stage in CHART_STAGES and scale > args.chart_max_scale:
+                continue
+            r = {"scale": scale, "columns": columns, "stage": stage,
+                 **measure(stage, raw_path, args.repeats, args.timeout)}
+            if "error" in r:
+                print(f"x{scale:<5} {stage:<26} failed: {r['error']}", flush=True)
+                continue
+            results.append(r)
+            print(f"x{scale:<5} {stage:<26} {r['seconds'] * 1000:10.2f} ms  "
+                  f"{(r['rows_per_sec'] or 0):>14,.0f} rows/s  {r['peak_rss_mb']:8.1f} MB peak RSS "
+                  f"(+{r['stage_rss_mb']:.1f} MB in stage)", flush=True)
+
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                 "machine": platform.machine(), "cpus": os.cpu_count(), "repeats": args.repeats},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
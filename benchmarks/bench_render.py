@@ -0,0 +1,84 @@
+"""Benchmark chart rendering throughput (images per second) per engine.
+
+    python benchmarks/bench_render.py --images 200
+    python benchmarks/bench_render.py --kinds region_bar,year_pie --output render.json
+
+Jobs come from the same region x year grid bulk_export renders, cycling
+through the chart kinds. Every engine renders the same jobs in one process:
+"matplotlib" is chart_jobs.render_chart_bytes (a new Figure per image),
+"template" reuses one figure per kind, and "svg" writes SVG directly. The
+first image of each engine is a warm-up and is not timed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, List
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import fastRender
+from bulk_export import GRID_CHART_TYPES, build_grid_jobs
+from dataLoader import DataLoader
+
+# (engine, format) pairs to time
+RUNS = [("matplotlib", "png"), ("template", "png"), ("matplotlib", "svg"), ("template", "svg"), ("svg", "svg")]
+
+
+def bench_jobs(data_file: str, kinds: List[str], images: int) -> List[Dict[str, Any]]:
+    """images jobs, taking the kinds in turn"""
+    loader = DataLoader()
+    df = loader.load_cleaned(data_file)
+    cube = loader.load_cube(data_file, df)
+    jobs = build_grid_jobs(loader, df, cube, {"chart_types": kinds}, output_dir="")
+    by_kind = {kind: [job for job in jobs if job["kind"] == kind] for kind in kinds}
+    mixed = []
+    while len(mixed) < images and any(by_kind.values()):
+        for kind in kinds:
+            if by_kind[kind] and len(mixed) < images:
+                mixed.append(by_kind[kind].pop(0))
+    return mixed
+
+
+def time_engine(jobs: List[Dict[str, Any]], engine: str, fmt: str) -> Dict[str, Any]:
+    fastRender.render_bytes(jobs[0], fmt, engine)  # warm-up: imports, font cache, templates
+    total_bytes = 0
+    start = time.perf_counter()
+    for job in jobs:
+        total_bytes += len(fastRender.render_bytes(job, fmt, engine))
+    seconds = time.perf_counter() - start
+    return {"engine": engine, "format": fmt, "images": len(jobs), "seconds": seconds,
+            "images_per_sec": len(jobs) / seconds if seconds else 0.0,
+            "mean_kb": total_bytes / len(jobs) / 1024}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark chart rendering engines")
+    parser.add_argument("--data", default=os.path.join(REPO, "gdp_cleaned_fixed.csv"))
+    parser.add_argument("--images", type=int, default=100, help="images per engine")
+    parser.add_argument("--kinds", default=",".join(GRID_CHART_TYPES), help="comma-separated chart kinds")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    jobs = bench_jobs(args.data, args.kinds.split(","), args.images)
+    if not jobs:
+        print("No chart jobs for the given kinds")
+        return 1
+
+    report = [time_engine(jobs, engine, fmt) for engine, fmt in RUNS]
+    baseline = {r["format"]: r["images_per_sec"] for r in report if r["engine"] == "matplotlib"}
+    print(f"{len(jobs)} images ({args.kinds})")
+    for r in report:
+        r["speedup"] = r["images_per_sec"] / baseline[r["format"]] if baseline[r["format"]] else 0.0
+        print(f"  {r['engine']:<11} {r['format']}  {r['images_per_sec']:8.1f} images/s  "
+              f"x{r['speedup']:.1f}  {r['mean_kb']:.0f} KB/image")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
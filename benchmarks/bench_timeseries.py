@@ -0,0 +1,81 @@
+"""Check that the time-series metrics stay fast on a large matrix store.
+
+    python benchmarks/bench_timeseries.py
+    python benchmarks/bench_timeseries.py --scale 100 --window 10 --budget 0.25
+
+The store comes from bench_pipeline's synthetic dataset for the scale
+(266k countries x 65 years at the default x1000). Every metric gdp_cli can
+compute runs over the whole store; the best of --repeats runs is compared
+with --budget and the script exits 1 when any metric goes over it.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, List
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import numpy as np
+
+import timeSeries
+from bench_pipeline import synthetic_dataset
+from dataLoader import DataLoader
+
+# Seconds any one metric may take over the whole store
+BUDGET_SECONDS = 1.0
+
+
+def metric_runs(window: int) -> Dict[str, Any]:
+    return {
+        "yoy": timeSeries.yoy_growth,
+        "rolling_mean": lambda v: timeSeries.rolling_mean(v, window),
+        "rolling_std": lambda v: timeSeries.rolling_std(v, window),
+        "volatility": lambda v: timeSeries.volatility(v, window),
+        "cumsum": timeSeries.nan_cumsum,
+    }
+
+
+def time_metric(fn, values: np.ndarray, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time-series metrics scale check")
+    parser.add_argument("--scale", type=int, default=1000, help="synthetic dataset scale")
+    parser.add_argument("--window", type=int, default=5, help="rolling window in years")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="seconds per metric")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    store = DataLoader().load_matrix(synthetic_dataset(args.scale))
+    values = np.asarray(store.values)
+    print(f"x{args.scale}: {values.shape[0]:,} rows x {values.shape[1]} years, window {args.window}")
+
+    report = []
+    for name, fn in metric_runs(args.window).items():
+        seconds = time_metric(fn, values, args.repeats)
+        report.append({"metric": name, "seconds": seconds, "within_budget": seconds <= args.budget})
+        print(f"  {name:<13} {seconds * 1000:9.1f} ms{'' if seconds <= args.budget else '  OVER BUDGET'}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    over = [r["metric"] for r in report if not r["within_budget"]]
+    if over:
+        print(f"Over the {args.budget:g}s budget: {', '.join(over)}")
+        return 1
+    print(f"Every metric within {args.budget:g}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
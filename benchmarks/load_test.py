@@ -0,0 +1,154 @@
+"""Load-test a running gdp_server and report latency percentiles.
+
+    python gdp_server.py --port 8765 &
+    python benchmarks/load_test.py --url http://127.0.0.1:8765 --requests 2000 --concurrency 16
+
+    python benchmarks/load_test.py --spawn        # start a server on a free port first
+
+Requests are drawn from a mix of stats queries over every year and a few
+regions (so the result cache sees both misses and repeats) plus, with
+--charts, a share of chart requests. Every client keeps one HTTP/1.1
+connection open, like a dashboard polling the server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlencode, urlsplit
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REGIONS = ["All", "Asia", "Europe", "Africa", "North America", "South America", "Oceania"]
+OPERATIONS = ["sum", "average", "min", "max"]
+
+
+def request_mix(n: int, years: range, chart_share: float, seed: int = 0) -> List[Tuple[str, str, bytes]]:
+    """(method, path, body) for n requests"""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(n):
+        year = rng.choice(years)
+        region = rng.choice(REGIONS)
+        if rng.random() < chart_share:
+            kind = rng.choice(["year_bar", "year_pie"] if region == "All" else ["region_bar", "region_line"])
+            query = {"kind": kind, "year": year, "region": region}
+            requests.append(("GET", "/chart?" + urlencode(query), b""))
+        else:
+            config = {"year": year, "operation": rng.choice(OPERATIONS), "region": region}
+            requests.append(("POST", "/stats", json.dumps(config).encode()))
+    return requests
+
+
+async def client(host: str, port: int, queue: asyncio.Queue, latencies: List[float], errors: List[str]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                method, path, body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(f"{status} {method} {path}")
+    finally:
+        writer.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+async def run(url: str, requests: List[Tuple[str, str, bytes]], concurrency: int) -> Dict[str, Any]:
+    parts = urlsplit(url)
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(parts.hostname, parts.port, queue, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "first_errors": errors[:5],
+    }
+
+
+def spawn_server(data_file: str) -> Tuple[subprocess.Popen, str]:
+    """Start gdp_server on a free localhost port and wait until it answers"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO, "gdp_server.py"), "--data", data_file,
+                             "--port", str(port)], cwd=REPO, stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()  # "Serving ..." once the dataset is loaded
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test gdp_server")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--spawn", action="store_true", help="start a server for the test")
+    parser.add_argument("--data", default=os.path.join(REPO, "gdp_cleaned_fixed.csv"))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--charts", type=float, default=0.0, help="share of chart requests, 0-1")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    proc = None
+    url = args.url
+    if args.spawn:
+        proc, url = spawn_server(args.data)
+    try:
+        requests = request_mix(args.requests, range(1960, 2024), args.charts)
+        report = asyncio.run(run(url, requests, args.concurrency))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{report['requests']} requests, {report['errors']} errors in {report['seconds']:.2f}s "
+          f"({report['requests_per_sec']:.0f} req/s)")
+    print(f"p50 {report['p50_ms']:.2f} ms   p90 {report['p90_ms']:.2f} ms   "
+          f"p99 {report['p99_ms']:.2f} ms   max {report['max_ms']:.2f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
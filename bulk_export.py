@@ -0,0 +1,211 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+import chart_jobs
+import fastRender
+from dataLoader import DataLoader
+from tracing import absorb, remote
+
+MANIFEST_NAME = "manifest.json"
+
+# Chart types a grid can ask for
+GRID_CHART_TYPES = ("region_bar", "region_pie", "region_line", "year_bar", "year_pie")
+
+# Save the manifest after this many finished images, so an interrupted run
+# loses little work
+MANIFEST_FLUSH_EVERY = 50
+
+
+def grid_years(spec: Dict[str, Any], available: List[str]) -> List[str]:
+    """Years from spec["years"] (list) or spec["year_range"] ([first, last])"""
+    if "years" in spec:
+        years = [str(y) for y in spec["years"]]
+    elif "year_range" in spec:
+        first, last = spec["year_range"]
+        years = [str(y) for y in range(int(first), int(last) + 1)]
+    else:
+        years = list(available)
+    return [y for y in years if y in available]
+
+
+def inputs_hash(job: Dict[str, Any]) -> str:
+    """Hash of everything that determines an image's pixels"""
+    payload = json.dumps({k: job[k] for k in ("kind", "data", "params")}, sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def build_grid_jobs(loader: DataLoader, df, cube, spec: Dict[str, Any], output_dir: str) -> List[Dict[str, Any]]:
+    """Slice the data for every (region, year, chart type) in the grid"""
+    regions = spec.get("regions", "all")
+    if regions == "all":
+        regions = list(cube.continents)
+    years = grid_years(spec, cube.years)
+    types = spec.get("chart_types", list(GRID_CHART_TYPES))
+    ext = spec.get("format", "png")
+    unknown = [t for t in types if t not in GRID_CHART_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown chart types in grid: {unknown}")
+
+    names = df["Country Name"].to_numpy(dtype=object)
+    columns = {y: df[y].to_numpy(dtype=np.float64, na_value=np.nan) for y in years}
+    jobs: List[Dict[str, Any]] = []
+
+    def add(kind, data, params, filename):
+        job = {"kind": kind, "data": data, "params": params,
+               "out_path": os.path.join(output_dir, filename)}
+        job["inputs"] = inputs_hash(job)
+        jobs.append(job)
+
+    for region in regions:
+        positions = loader.positions_for_config(df, {"region": region})
+        if len(positions) == 0:
+            print(f" No data for region '{region}'")
+            continue
+        labels = names[positions].tolist()
+
+        if "region_line" in types and cube.has_region(region):
+            add("region_line",
+                {"years": [int(y) for y in cube.years], "values": cube.region_series(region).tolist()},
+                {"region": region}, f"region_line_{region}.{ext}")
+
+        for year in years:
+            values = columns[year][positions]
+            if np.isnan(values).all():
+                continue
+            for kind in ("region_bar", "region_pie"):
+                if kind in types:
+                    if kind == "region_pie":
+                        # a pie cannot show missing values
+                        keep = ~np.isnan(values)
+                        data = {"labels": [l for l, k in zip(labels, keep) if k], "values": values[keep].tolist()}
+                    else:
+                        data = {"labels": labels, "values": values.tolist()}
+                    add(kind, data, {"region": region, "year": int(year)}, f"{kind}_{region}_{year}.{ext}")
+
+    for year in years:
+        labels, values = cube.year_slice(year, "sum")
+        for kind in ("year_bar", "year_pie"):
+            if kind in types:
+                add(kind, {"labels": list(labels), "values": values.tolist()}, {"year": int(year)},
+                    f"{kind}_{year}.{ext}")
+
+    return jobs
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"images": {}}
+
+
+def save_manifest(manifest: Dict[str, Any], path: str) -> None:
+    """Write the manifest atomically so a crash never truncates it"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def render_timed(job: Dict[str, Any], engine: str = "matplotlib") -> Tuple[str, float]:
+    start = time.perf_counter()
+    if engine == "matplotlib":
+        path = chart_jobs.render_chart(job)
+    else:
+        path = fastRender.render_chart(job, engine)
+    return path, time.perf_counter() - start
+
+
+def export_grid(spec: Dict[str, Any], workers: int | None = None, engine: str | None = None) -> Dict[str, Any]:
+    """Render every image in the grid that the manifest does not already cover.
+
+    engine (or spec["engine"]) picks the renderer, one of fastRender.ENGINES;
+    images drawn by another engine are redrawn. Returns a summary with the
+    number of rendered, skipped and failed images.
+    """
+    data_file = spec.get("data_file", "gdp_cleaned_fixed.csv")
+    output_dir = spec.get("output_dir", "charts")
+    engine = engine or spec.get("engine", "matplotlib")
+    if engine not in fastRender.ENGINES:
+        raise SystemExit(f"Unknown render engine '{engine}' (expected one of {', '.join(fastRender.ENGINES)})")
+    if engine == "svg" and spec.get("format", "png") != "svg":
+        raise SystemExit('The svg engine needs "format": "svg" in the grid')
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Load and index once; workers only receive the small per-image slices
+    loader = DataLoader()
+    df = loader.load_cleaned(data_file)
+    if df.empty:
+        raise SystemExit(f"Data file '{data_file}' not found or empty")
+    cube = loader.load_cube(data_file, df)
+
+    jobs = build_grid_jobs(loader, df, cube, spec, output_dir)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    images = manifest.setdefault("images", {})
+    manifest["dataset"] = loader.fingerprint
+
+    todo = [job for job in jobs
+            if images.get(job["out_path"], {}).get("inputs") != job["inputs"]
+            or images[job["out_path"]].get("engine", "matplotlib") != engine
+            or not os.path.exists(job["out_path"])]
+    summary = {"total": len(jobs), "skipped": len(jobs) - len(todo), "rendered": 0, "failed": 0}
+    print(f"Grid: {len(jobs)} images, {summary['skipped']} already up to date")
+
+    start = time.perf_counter()
+    workers = max(min(len(todo), workers or os.cpu_count() or 1), 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(*remote(render_timed, {k: v for k, v in job.items() if k != "inputs"}, engine)): job
+                   for job in todo}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                path, seconds = absorb(future.result())
+            except Exception as e:
+                print(f"Could not draw {job['out_path']}: {e}")
+                summary["failed"] += 1
+                continue
+            images[path] = {"kind": job["kind"], **job["params"], "inputs": job["inputs"],
+                            "engine": engine, "render_seconds": round(seconds, 4)}
+            summary["rendered"] += 1
+            if summary["rendered"] % MANIFEST_FLUSH_EVERY == 0:
+                save_manifest(manifest, manifest_path)
+
+    save_manifest(manifest, manifest_path)
+    summary["seconds"] = time.perf_counter() - start
+    summary["manifest"] = manifest_path
+    return summary
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Render every chart in a region x year x type grid")
+    parser.add_argument("grid", help="JSON grid specification")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--engine", choices=fastRender.ENGINES,
+                        help="renderer: matplotlib (default), template (reused figures) or svg (direct SVG)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.grid, 'r') as f:
+            spec = json.load(f)
+    except (OSError, json.JSONDecodeError) as exc:
+        print(f"Error: cannot read grid '{args.grid}': {exc}")
+        sys.exit(1)
+
+    summary = export_grid(spec, workers=args.workers, engine=args.engine)
+    print(f"Rendered {summary['rendered']}, skipped {summary['skipped']}, failed {summary['failed']} "
+          f"in {summary['seconds']:.1f}s; manifest: {summary['manifest']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Callable, List
+
+import draw_bar_chart
+import draw_line_chart
+import draw_pie_chart
+from renderCache import format_of
+from tracing import absorb, remote, span, traced
+
+# A chart job is a plain, picklable dict:
+#   {"kind": "region_bar", "data": {...}, "params": {...}, "out_path": "..."}
+# "data" holds the already-sliced values, so workers never see the full frame.
+
+CHART_KINDS = {
+    "region_bar": (
+        (12, 6),
+        lambda ax, d, p: draw_bar_chart.plot_regional_bar(ax, d["labels"], d["values"], p["region"], p["year"]),
+    ),
+    "region_pie": (
+        (7, 7),
+        lambda ax, d, p: draw_pie_chart.plot_regional_pie(ax, d["labels"], d["values"], p["region"], p["year"]),
+    ),
+    "year_bar": (
+        (10, 6),
+        lambda ax, d, p: draw_bar_chart.plot_yearly_bar(ax, d["labels"], d["values"], p["year"]),
+    ),
+    "year_pie": (
+        (7, 7),
+        lambda ax, d, p: draw_pie_chart.plot_yearly_pie(ax, d["labels"], d["values"], p["year"]),
+    ),
+    "region_line": (
+        (10, 5),
+        lambda ax, d, p: draw_line_chart.plot_line(ax, d["years"], d["values"],
+                                                   f"Regional GDP over time — {p['region']}"),
+    ),
+    "country_line": (
+        (10, 5),
+        lambda ax, d, p: draw_line_chart.plot_line(ax, d["years"], d["values"],
+                                                   f"GDP over time — {p['country']}"),
+    ),
+}
+
+
+def draw_job(fig, job: Dict[str, Any]) -> None:
+    """Draw a job onto an existing figure (pyplot or object-oriented)"""
+    _, draw = CHART_KINDS[job["kind"]]
+    draw(fig.add_subplot(), job["data"], job["params"])
+    fig.tight_layout()
+
+
+@traced("build_figure")
+def build_figure(job: Dict[str, Any]):
+    """A standalone Figure for a job; no global pyplot state involved"""
+    from matplotlib.figure import Figure  # loaded on the first render only
+
+    figsize, _ = CHART_KINDS[job["kind"]]
+    fig = Figure(figsize=figsize)
+    draw_job(fig, job)
+    return fig
+
+
+def render_chart(job: Dict[str, Any]) -> str:
+    """Render one job to job["out_path"] and return the path"""
+    fig = build_figure(job)
+    with span("savefig", kind=job["kind"]):
+        fig.savefig(job["out_path"], bbox_inches="tight")
+    return job["out_path"]
+
+
+def render_chart_bytes(job: Dict[str, Any], fmt: str = "png") -> bytes:
+    """Render one job to PNG or SVG bytes"""
+    buffer = io.BytesIO()
+    fig = build_figure(job)
+    with span("savefig", kind=job["kind"]):
+        fig.savefig(buffer, format=fmt, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _run_all(fn: Callable, calls: List[tuple], workers: int | None) -> List[Any]:
+    """fn(*args) for every call, in worker processes when there is more than one.
+
+    Results keep the call order; a failed call leaves its exception in place.
+    Spans traced in the workers are merged into the active tracer.
+    """
+    workers = min(len(calls), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        results = []
+        for args in calls:
+            try:
+                results.append(fn(*args))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(*remote(fn, *args)) for args in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(absorb(future.result()))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+@traced("render_jobs", rows=len)
+def render_jobs(jobs: List[Dict[str, Any]], workers: int | None = None, cache=None) -> List[str]:
+    """Render jobs, in parallel worker processes when there is more than one.
+
+    With a RenderCache, cached images are written straight to their
+    out_path and only the misses are rendered. Returns the saved paths in
+    job order; a job that fails is reported and left out.
+    """
+    if cache is None:
+        results = _run_all(render_chart, [(job,) for job in jobs], workers)
+    else:
+        results = [None] * len(jobs)
+        misses = []
+        for i, job in enumerate(jobs):
+            fmt = format_of(job["out_path"])
+            key = cache.key(job, fmt)
+            payload = cache.get(key, fmt)
+            if payload is None:
+                misses.append((i, fmt, key))
+            else:
+                results[i] = _write(job["out_path"], payload)
+
+        rendered = _run_all(render_chart_bytes, [(jobs[i], fmt) for i, fmt, _ in misses], workers)
+        for (i, fmt, key), payload in zip(misses, rendered):
+            if isinstance(payload, Exception):
+                results[i] = payload
+                continue
+            cache.put(key, fmt, payload, jobs[i])
+            results[i] = _write(jobs[i]["out_path"], payload)
+
+    saved: List[str] = []
+    for job, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            print(f"Could not draw {job['kind']} chart: {result}")
+        else:
+            saved.append(result)
+    return saved
+
+
+def _write(path: str, payload: bytes) -> str:
+    with open(path, 'wb') as f:
+        f.write(payload)
+    return path
@@ -1,124 +1,132 @@
-﻿
-import pandas as pd
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List
+
 import pandas as pd
 
-print("=== GDP CSV Cleaner ===")
-
-# 1. Read CSV
-print("1. Loading CSV...")
-df = pd.read_csv('gdp_with_continent_filled.csv')
-print(f"   Original: {df.shape[0]} rows, {df.shape[1]} columns")
-
-# 2. Clean year columns
-print("\n2. Cleaning year columns...")
-year_columns = [col for col in df.columns if str(col).strip().isdigit() and len(str(col).strip()) == 4]
-
-for col in year_columns:
-    df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '', regex=False), errors='coerce')
-    print(f"    Cleaned {col}")
-
-# 3. Save cleaned file
-output_file = 'gdp_cleaned_fixed.csv'
-df.to_csv(output_file, index=False)
-print(f"\n3. Saved as '{output_file}'")
-
-# 4. SIMPLE TEST FUNCTION
-print("\n" + "="*60)
-print(" TEST YOUR CLEANED DATA")
-print("="*60)
-
-# Show first few countries
-print("Available countries (first 5):")
-for i, country in enumerate(df['Country Name'].head()):
-    print(f"  {i+1}. {country}")
-
-while True:
-    print("\nOptions:")
-    print("1. Check a country's GDP")
-    print("2. Exit")
-    
-    choice = input("Choose (1 or 2): ").strip()
-    
-    if choice == '1':
-        # Show examples
-        print("Examples: 'Aruba', 'Andorra', 'Afghanistan'")
-        country = input("Country name: ").strip()
-        year = input("Year (1960-2024): ").strip()
-        
-        if year not in df.columns:
-            print(f" Year must be between 1960-2024")
-            continue
-        
-        # FIXED SEARCH - exact match
-        found = df[df['Country Name'].str.strip().str.lower() == country.lower()]
-        
-        if found.empty:
-            print(f" '{country}' not found. Try exact name from list above.")
-            continue
-        
-        gdp = found.iloc[0][year]
-        
-        if pd.isna(gdp):
-            print(f" {country} in {year}: NO DATA AVAILABLE")
-        else:
-            print(f" SUCCESS! Data is clean!")
-            print(f" {country} in {year}: ${gdp:,.2f}")
-            print(f"   Continent: {found.iloc[0]['Continent']}")
-            print(f"   Code: {found.iloc[0]['Country Code']}")
-            
-            # Show raw value to prove no commas
-            print(f"   Raw value: {gdp} (no commas!)")
-    
-    elif choice == '2':
-        print(" Testing complete! Data is clean.")
-        break
-    
-    else:
-        print("Please enter 1 or 2")
-
-print("\n YOUR CSV IS CLEAN AND READY FOR ANALYSIS!")
-
-# 2. Show current numeric columns with comma issues
-print("\n2. Checking numeric columns with comma issues...")
-
-# Get year columns (1960, 1961, etc.)
-year_columns = []
-for col in df.columns:
+DEFAULT_INPUT = 'gdp_with_continent_filled.csv'
+DEFAULT_OUTPUT = 'gdp_cleaned_fixed.csv'
+DEFAULT_MEMORY_MB = 64
+
+# Parsed pandas rows take several times their size on disk; used to turn a
+# memory budget into a chunk size
+MEMORY_PER_BYTE_ON_DISK = 8
+
+
+def year_columns(columns: List[Any]) -> List[str]:
+    """Columns whose name is a 4-digit year"""
+    return [col for col in columns if str(col).strip().isdigit() and len(str(col).strip()) == 4]
+
+
+def chunk_rows_for_budget(filepath: str, max_memory_mb: float) -> int:
+    """Rows per chunk that keep one parsed chunk within max_memory_mb"""
+    with open(filepath, 'rb') as f:
+        sample = f.read(1 << 16)
+    lines = max(sample.count(b'\n'), 1)
+    bytes_per_row = max(len(sample) / lines, 1.0) * MEMORY_PER_BYTE_ON_DISK
+    return max(int(max_memory_mb * 1024 * 1024 / bytes_per_row), 1)
+
+
+def clean_cells(values: Any) -> Any:
+    """Clean raw year-cell strings to floats the way iter_clean_chunks does (NaN if not a number)"""
+    return pd.to_numeric(
+        pd.Series(values, dtype=object).astype(str).str.replace(',', '', regex=False), errors='coerce'
+    ).to_numpy(dtype='float64')
+
+
+def iter_clean_chunks(filepath: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield cleaned chunks of at most chunk_rows rows.
+
+    Thousands separators are handled by the CSV parser itself. Only year
+    columns that still come out non-numeric (stray text next to numbers)
+    take the slower string clean-up. Year columns are always float64, so
+    the output does not depend on the chunk size.
+    """
+    reader = pd.read_csv(filepath, chunksize=chunk_rows, thousands=',')
+    for chunk in reader:
+        for col in year_columns(chunk.columns):
+            if not pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = pd.to_numeric(
+                    chunk[col].astype(str).str.replace(',', '', regex=False), errors='coerce'
+                )
+            # dtypes are inferred per chunk: a year with no gap in this chunk
+            # would come out as ints and be written without the ".0"
+            chunk[col] = chunk[col].astype('float64')
+        yield chunk
+
+
+def clean_file(
+    input_file: str = DEFAULT_INPUT,
+    output_file: str = DEFAULT_OUTPUT,
+    max_memory_mb: float = DEFAULT_MEMORY_MB,
+    chunk_rows: int | None = None,
+    report: Callable[[Dict[str, Any]], None] | None = None,
+) -> Dict[str, Any]:
+    """Clean input_file into output_file chunk by chunk.
+
+    Cleaned chunks are appended to a temporary file that replaces
+    output_file only once every chunk has been written. ``report`` is called
+    after each chunk with running totals.
+    """
+    chunk_rows = chunk_rows or chunk_rows_for_budget(input_file, max_memory_mb)
+    tmp_file = output_file + '.tmp'
+
+    progress = {"rows": 0, "chunks": 0, "chunk_rows": chunk_rows, "seconds": 0.0,
+                "rows_per_sec": 0.0, "mb_written": 0.0}
+    start = time.perf_counter()
     try:
-        # Check if column name is a 4-digit year
-        if str(col).strip().isdigit() and len(str(col).strip()) == 4:
-            year_columns.append(col)
-    except:
-        continue
-
-print(f"   Found {len(year_columns)} year columns")
-
-# 3. Clean ONLY the year columns
-print("\n3. Cleaning year columns (removing commas from numbers)...")
-
-for col in year_columns:
-    # Remove commas and convert to numeric
-    df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '', regex=False), errors='coerce')
-    # Count how many were cleaned
-    cleaned_count = df[col].astype(str).str.contains(',').sum()
-    if cleaned_count == 0:
-        print(f"   {col}: Clean")
-    else:
-        print(f"   {col}: Fixed {cleaned_count} values")
-
-# 4. Save cleaned file
-output_file = 'gdp_cleaned_fixed.csv'
-df.to_csv(output_file, index=False)
-print(f"\n4. Saved cleaned file as '{output_file}'")
-
-# 5. Show sample
-print("\n5. Sample of cleaned data (first 3 countries):")
-sample_cols = ['Country Name', 'Country Code', '1960', '1961', '1962']
-if len(df) > 0:
-    print(df[sample_cols].head(3).to_string())
-else:
-    print("   No data to display")
-
-print("\n" + "="*50)
-print("CLEANING COMPLETE!")
-print("="*50)
+        with open(tmp_file, 'w', newline='') as out:
+            for chunk in iter_clean_chunks(input_file, chunk_rows):
+                chunk.to_csv(out, index=False, header=progress["chunks"] == 0)
+                progress["rows"] += len(chunk)
+                progress["chunks"] += 1
+                progress["seconds"] = time.perf_counter() - start
+                progress["rows_per_sec"] = progress["rows"] / max(progress["seconds"], 1e-9)
+                progress["mb_written"] = out.tell() / 1e6
+                if report:
+                    report(dict(progress))
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+    return progress
+
+
+def print_progress(progress: Dict[str, Any]) -> None:
+    print(f"   chunk {progress['chunks']}: {progress['rows']} rows, "
+          f"{progress['mb_written']:.1f} MB written, {progress['rows_per_sec']:,.0f} rows/s")
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Clean the GDP CSV in bounded-size chunks")
+    parser.add_argument("input", nargs="?", default=DEFAULT_INPUT)
+    parser.add_argument("output", nargs="?", default=DEFAULT_OUTPUT)
+    parser.add_argument("--max-memory-mb", type=float, default=DEFAULT_MEMORY_MB,
+                        help="memory ceiling for one parsed chunk")
+    parser.add_argument("--chunk-rows", type=int, help="fixed chunk size (overrides --max-memory-mb)")
+    parser.add_argument("--quiet", action="store_true", help="only print the final summary")
+    args = parser.parse_args(argv)
+
+    print("=== GDP CSV Cleaner ===")
+    if not os.path.exists(args.input):
+        print(f"Error: input file '{args.input}' not found")
+        sys.exit(1)
+
+    summary = clean_file(
+        args.input,
+        args.output,
+        max_memory_mb=args.max_memory_mb,
+        chunk_rows=args.chunk_rows,
+        report=None if args.quiet else print_progress,
+    )
+    print(f"Saved {summary['rows']} rows to '{args.output}' in {summary['chunks']} chunk(s), "
+          f"{summary['seconds']:.2f}s ({summary['rows_per_sec']:,.0f} rows/s)")
+    print("Use lookup_gdp.py to check individual countries.")
+
+
+if __name__ == "__main__":
+    main()
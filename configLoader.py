@@ -1,5 +1,7 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from statsEngine import expand_operations
 
 def load_config(filepath: str = 'config.json') -> Dict[str, Any]:
     """Load configuration from JSON file"""
@@ -27,6 +29,63 @@ def validate_config(config: Dict[str, Any]) -> bool:
     print("Config validation passed")
     return True
 
+def _normalise_names(value: Any) -> Any:
+    if value is None:
+        return "All"
+    names = [value] if isinstance(value, str) else list(value)
+    names = sorted({str(n).strip().casefold() for n in names} - {"", "all"})
+    if not names:
+        return "All"
+    return names[0] if len(names) == 1 else names
+
+def normalise_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """The query part of a config in canonical form, for use as a cache key.
+
+    Names are stripped and casefolded, "All"/empty filters become "All", the
+    year becomes an int and extra operations are expanded and sorted. Keys
+    that do not change the statistics (charts, output_dir, ...) are dropped.
+    """
+    year = config.get("year")
+    try:
+        year = int(str(year).strip())
+    except (TypeError, ValueError):
+        pass
+    normalised = {
+        "year": year,
+        "operation": str(config.get("operation", "average")).strip(),
+        "region": _normalise_names(config.get("region")),
+        "country": _normalise_names(config.get("country")),
+    }
+    extra = expand_operations(config.get("operations"))
+    if extra:
+        normalised["operations"] = sorted(op.strip() for op in extra)
+    if config.get("weights"):
+        normalised["weights"] = config["weights"]
+    return normalised
+
+# Columns every query reads: the names it filters on and reports
+LABEL_COLUMNS = ['Country Name', 'Country Code', 'Continent']
+
+def required_columns(config: Dict[str, Any], charts: bool = True) -> List[str] | None:
+    """Columns the config reads, or None when it needs every column.
+
+    Statistics need the label columns, the year and the weights column.
+    With charts, bar and pie charts read the same year, while line charts
+    read every year, as does gap filling (it interpolates across years).
+    """
+    if config.get("gap_fill"):
+        return None
+    columns = LABEL_COLUMNS + [str(config.get("year")).strip()]
+    if config.get("weights"):
+        columns.append(str(config["weights"]))
+    if charts and any(str(kind).lower() == "line" for kind in (config.get("charts") or {}).values()):
+        return None
+    return columns
+
+def config_key(config: Dict[str, Any]) -> str:
+    """normalise_config as a stable string"""
+    return json.dumps(normalise_config(config), sort_keys=True)
+
 # test
 if __name__ == "__main__":
     print("Testing config_loader.py...")
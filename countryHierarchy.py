@@ -0,0 +1,133 @@
+import numpy as np
+from typing import Any, List
+
+# World Bank aggregate codes found in the GDP extracts: regions, income
+# groups, lending groups and demographic groups. Rows with these codes are
+# sums over real countries, so adding them to country rows double counts.
+AGGREGATE_CODES = frozenset({
+    'AFE', 'AFW', 'ARB', 'CEB', 'CSS', 'EAP', 'EAR', 'EAS', 'ECA', 'ECS',
+    'EMU', 'EUU', 'FCS', 'HIC', 'HPC', 'IBD', 'IBT', 'IDA', 'IDB', 'IDX',
+    'INX', 'LAC', 'LCN', 'LDC', 'LIC', 'LMC', 'LMY', 'LTE', 'MEA', 'MIC',
+    'MNA', 'NAC', 'OED', 'OSS', 'PRE', 'PSS', 'PST', 'SAS', 'SSA', 'SSF',
+    'SST', 'TEA', 'TEC', 'TLA', 'TMN', 'TSA', 'TSS', 'UMC', 'WLD',
+})
+
+# Continent label the dataset gives to rows that only hold aggregates
+GLOBAL_CONTINENT = 'Global'
+
+
+def is_aggregate(codes: Any) -> np.ndarray:
+    """Boolean mask of aggregate rows for an array of Country Codes"""
+    codes = np.asarray(codes, dtype=str)
+    return np.isin(np.char.upper(np.char.strip(codes)), list(AGGREGATE_CODES))
+
+
+def leaf_mask(df) -> np.ndarray:
+    """True for real-country rows of a frame (every row if it has no codes)"""
+    if 'Country Code' not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    return ~is_aggregate(df['Country Code'].astype(str).to_numpy())
+
+
+class Hierarchy:
+    """Leaf countries -> continents -> World, from Country Code and Continent.
+
+    ``parent[row]`` is the continent index of a leaf row, len(continents)
+    for a leaf without a continent (it still counts towards World) and -1
+    for aggregate rows, which belong to no rollup at all.
+    """
+
+    def __init__(self, codes: Any, labels: Any):
+        self.aggregate = is_aggregate(codes)
+        labels = np.asarray(labels, dtype=object)
+        self.continents = sorted({label for label, agg in zip(labels, self.aggregate)
+                                  if isinstance(label, str) and not agg})
+        lookup = {name: i for i, name in enumerate(self.continents)}
+        parent = np.array([lookup.get(label, len(self.continents)) if isinstance(label, str)
+                           else len(self.continents) for label in labels], dtype=np.intp)
+        parent[self.aggregate] = -1
+        self.parent = parent
+        # leaf rows of every group, the unlabelled group last
+        self.members = [np.flatnonzero(parent == c) for c in range(len(self.continents) + 1)]
+
+    @classmethod
+    def from_frame(cls, df) -> "Hierarchy":
+        codes = df['Country Code'].astype(str).to_numpy() if 'Country Code' in df.columns \
+            else np.full(len(df), '')
+        return cls(codes, df['Continent'].to_numpy(dtype=object))
+
+    @classmethod
+    def from_store(cls, store) -> "Hierarchy":
+        return cls(store.codes, store.continent_labels())
+
+    @property
+    def leaves(self) -> np.ndarray:
+        return ~self.aggregate
+
+
+class Rollup:
+    """Continent and World totals summed from leaf countries, all years at once.
+
+    Totals are kept (cached) per group; update() rewrites some rows and
+    recomputes only the continents those rows belong to, then World from the
+    continent totals. NaN cells add nothing; ``counts`` says how many leaves
+    had a value.
+    """
+
+    def __init__(self, hierarchy: Hierarchy, values: Any):
+        self.hierarchy = hierarchy
+        self.values = np.array(values, dtype=np.float64)  # own copy, rewritten by update
+        n_groups = len(hierarchy.continents) + 1
+        self.sums = np.zeros((n_groups, self.values.shape[1]))
+        self.counts = np.zeros((n_groups, self.values.shape[1]), dtype=np.int64)
+        for group in range(n_groups):
+            self._recompute(group)
+        self._refresh_world()
+
+    @classmethod
+    def from_frame(cls, df) -> "Rollup":
+        years = sorted(str(c) for c in df.columns if str(c).isdigit() and len(str(c)) == 4)
+        return cls(Hierarchy.from_frame(df), df[years].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    @classmethod
+    def from_store(cls, store) -> "Rollup":
+        return cls(Hierarchy.from_store(store), store.values)
+
+    def _recompute(self, group: int) -> None:
+        rows = self.values[self.hierarchy.members[group]]
+        observed = ~np.isnan(rows)
+        self.sums[group] = np.where(observed, rows, 0.0).sum(axis=0)
+        self.counts[group] = observed.sum(axis=0)
+
+    def _refresh_world(self) -> None:
+        self.world_sums = self.sums.sum(axis=0)
+        self.world_counts = self.counts.sum(axis=0)
+
+    def continent_totals(self) -> np.ndarray:
+        """(continents, years) sums; rows follow hierarchy.continents"""
+        return self.sums[:len(self.hierarchy.continents)]
+
+    def continent(self, name: str) -> np.ndarray:
+        """One continent's totals across every year"""
+        return self.sums[self.hierarchy.continents.index(name)]
+
+    def world(self) -> np.ndarray:
+        """World totals across every year (every leaf, with or without a continent)"""
+        return self.world_sums
+
+    def update(self, rows: Any, new_values: Any) -> List[str]:
+        """Replace some rows and recompute their ancestors only.
+
+        Returns the continents recomputed, plus "World" when any leaf changed.
+        """
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        self.values[rows] = new_values
+        groups = np.unique(self.hierarchy.parent[rows])
+        groups = groups[groups >= 0]
+        for group in groups:
+            self._recompute(group)
+        if not len(groups):
+            return []
+        self._refresh_world()
+        names = [self.hierarchy.continents[g] for g in groups if g < len(self.hierarchy.continents)]
+        return names + ["World"]
@@ -1,14 +1,17 @@
 from typing import Dict, Any, List
 import os
 import sys
-import matplotlib.pyplot as plt
 import pandas as pd
 
-from configLoader import load_config, validate_config
+from configLoader import load_config, required_columns, validate_config
 from dataLoader import DataLoader
 from dataProcessor import DataProcessor
+import chart_jobs
 import draw_bar_chart
+import draw_line_chart
 import draw_pie_chart
+from renderCache import RenderCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_MB
+from tracing import Tracer, span, traced
 
 
 # -----------------------------
@@ -31,28 +34,22 @@ def ensure_year_in_df(df: pd.DataFrame, year: int) -> None:
 # -----------------------------
 # Line charts
 # -----------------------------
+# matplotlib is imported inside the functions that draw, so importing this
+# module (or running a stats-only job) never loads a plotting backend
 
+@traced("plot_country_timeseries")
 def plot_country_timeseries(
     df: pd.DataFrame,
     country: str,
     show: bool = True,
     out_path: str | None = None,
 ) -> None:
+    import matplotlib.pyplot as plt
 
-    years = _year_columns(df)
-    row = df[df["Country Name"] == country]
-
-    if row.empty:
-        raise ValueError(f"Country '{country}' not found in data")
-
-    values = row[years].astype(float).iloc[0].tolist()
+    years, values = draw_line_chart.country_series_data(df, country)
 
     plt.figure(figsize=(10, 5))
-    plt.plot([int(y) for y in years], values, marker="o")
-    plt.title(f"GDP over time — {country}")
-    plt.xlabel("Year")
-    plt.ylabel("GDP")
-    plt.grid(alpha=0.3)
+    draw_line_chart.plot_line(plt.gca(), years, values, f"GDP over time — {country}")
     plt.tight_layout()
 
     if out_path:
@@ -64,26 +61,20 @@ def plot_country_timeseries(
         plt.close()
 
 
+@traced("plot_region_time_series")
 def plot_region_time_series(
     df: pd.DataFrame,
     region: str,
     show: bool = True,
     out_path: str | None = None,
+    cube=None,
 ) -> None:
-    years = _year_columns(df)
-    grouped = df[df["Continent"] == region][years].sum()
+    import matplotlib.pyplot as plt
 
-    if grouped.empty:
-        raise ValueError(f"Region '{region}' not found or has no data")
-
-    values = grouped.astype(float).tolist()
+    years, values = draw_line_chart.region_series_data(df, region, cube)
 
     plt.figure(figsize=(10, 5))
-    plt.plot([int(y) for y in years], values, marker="o")
-    plt.title(f"Regional GDP over time — {region}")
-    plt.xlabel("Year")
-    plt.ylabel("GDP")
-    plt.grid(alpha=0.3)
+    draw_line_chart.plot_line(plt.gca(), years, values, f"Regional GDP over time — {region}")
     plt.tight_layout()
 
     if out_path:
@@ -96,85 +87,70 @@ def plot_region_time_series(
 
 
 # -----------------------------
-# Dashboard runner
+# Chart jobs
 # -----------------------------
 
-def run_from_config(
-    cfg: Dict[str, Any],
-    show: bool = True,
-    save_dir: str | None = None,
-) -> Dict[str, Any]:
-
-    # Validate config
-    if not validate_config(cfg):
-        raise SystemExit("Invalid configuration")
+def _chart_job(kind: str, data: Dict[str, Any], params: Dict[str, Any],
+               save_dir: str | None, filename: str) -> Dict[str, Any]:
+    return {
+        "kind": kind,
+        "data": data,
+        "params": params,
+        "out_path": os.path.join(save_dir, filename) if save_dir else None,
+    }
 
-    # Load data
-    loader = DataLoader()
-    df = loader.load_csv(cfg.get("data_file", "gdp_cleaned_fixed.csv"))
-    if df.empty:
-        raise SystemExit("Data file not found or empty")
 
-    df = loader.clean_numeric_columns(df)
+def chart_jobs_from_config(
+    df: pd.DataFrame,
+    cfg: Dict[str, Any],
+    cube=None,
+    save_dir: str | None = None,
+    ranks=None,
+) -> List[Dict[str, Any]]:
+    """Slice the data for every chart in cfg["charts"] into render jobs.
 
+    cfg["top_n"] limits region bar/pie charts to the largest countries plus
+    an "Other" total, read from the RankIndex when one is given.
+    """
+    charts = cfg.get("charts", {})
     year = cfg["year"]
-    ensure_year_in_df(df, year)
+    region = cfg.get("region")
+    country = cfg.get("country")
+    top_n = cfg.get("top_n")
+    jobs: List[Dict[str, Any]] = []
 
-    # Process stats
-    proc = DataProcessor()
-    stats = proc.process_data(df, cfg)
+    def region_line():
+        years, values = draw_line_chart.region_series_data(df, region, cube)
+        return _chart_job("region_line", {"years": years, "values": values}, {"region": region},
+                          save_dir, f"region_line_{region}_{year}.png")
 
-    # Summary
-    print("\n=== Dashboard summary ===")
-    print(
-        f"Config: region={cfg.get('region')}, "
-        f"country={cfg.get('country')}, "
-        f"year={year}, operation={cfg.get('operation')}"
-    )
-    print(f"Result ({stats['operation']}): ${stats['result']:,.2f}")
-
-    charts = cfg.get("charts", {})
-    saved_files: list[str] = []
+    def country_line():
+        years, values = draw_line_chart.country_series_data(df, country)
+        return _chart_job("country_line", {"years": years, "values": values}, {"country": country},
+                          save_dir, f"country_line_{country}_{year}.png")
 
     # -----------------------------
     # Region-level chart
     # -----------------------------
     rc = charts.get("region_chart")
-    if rc and cfg.get("region"):
+    if rc and region:
         try:
-            region = cfg["region"]
-
+            params = {"region": region, "year": year}
+            if top_n:
+                params["top_n"] = top_n
             if rc.lower() == "bar":
-                draw_bar_chart.regional_gdp_bar(df, region, year)
+                data = draw_bar_chart.regional_bar_data(df, region, year, top_n, ranks)
+                if data is not None:
+                    jobs.append(_chart_job("region_bar", {"labels": data[0], "values": data[1]}, params,
+                                           save_dir, f"region_{rc}_{region}_{year}.png"))
             elif rc.lower() == "pie":
-                draw_pie_chart.regional_gdp_pie(df, region, year)
+                labels, values = draw_pie_chart.regional_pie_data(df, region, year, top_n, ranks)
+                jobs.append(_chart_job("region_pie", {"labels": labels, "values": values}, params,
+                                       save_dir, f"region_{rc}_{region}_{year}.png"))
             elif rc.lower() == "line":
-                plot_region_time_series(
-                    df,
-                    region,
-                    show=show,
-                    out_path=(
-                        os.path.join(save_dir, f"region_line_{region}_{year}.png")
-                        if save_dir
-                        else None
-                    ),
-                )
-                rc = None  # already handled
+                jobs.append(region_line())
             else:
                 print(f"Unknown region_chart type: {rc}")
-                rc = None
-
-            if rc:
-                if save_dir:
-                    out = os.path.join(save_dir, f"region_{rc}_{region}_{year}.png")
-                    plt.savefig(out, bbox_inches="tight")
-                    saved_files.append(out)
-
-                if show:
-                    plt.show()
-                else:
-                    plt.close()
-
         except Exception as e:
             print(f"Could not draw region chart: {e}")
 
@@ -184,55 +160,213 @@ def run_from_config(
     yc = charts.get("year_chart")
     if yc:
         try:
+            params = {"year": year}
             if yc.lower() == "bar":
-                draw_bar_chart.yearly_gdp_bar(df, year)
+                labels, values = draw_bar_chart.yearly_bar_data(df, year, cube)
+                jobs.append(_chart_job("year_bar", {"labels": labels, "values": values}, params,
+                                       save_dir, f"year_{yc}_{year}.png"))
             elif yc.lower() == "pie":
-                draw_pie_chart.yearly_gdp_pie(df, year)
+                labels, values = draw_pie_chart.yearly_pie_data(df, year, cube)
+                jobs.append(_chart_job("year_pie", {"labels": labels, "values": values}, params,
+                                       save_dir, f"year_{yc}_{year}.png"))
             elif yc.lower() == "line":
-                if cfg.get("country"):
-                    plot_country_timeseries(
-                        df,
-                        cfg["country"],
-                        show=show,
-                        out_path=(
-                            os.path.join(save_dir, f"country_line_{cfg['country']}_{year}.png")
-                            if save_dir
-                            else None
-                        ),
-                    )
-                    yc = None
-                elif cfg.get("region"):
-                    plot_region_time_series(
-                        df,
-                        cfg["region"],
-                        show=show,
-                        out_path=(
-                            os.path.join(save_dir, f"region_line_{cfg['region']}_{year}.png")
-                            if save_dir
-                            else None
-                        ),
-                    )
-                    yc = None
+                if country:
+                    jobs.append(country_line())
+                elif region:
+                    jobs.append(region_line())
                 else:
                     print("Line chart requires country or region")
-                    yc = None
             else:
                 print(f"Unknown year_chart type: {yc}")
-                yc = None
+        except Exception as e:
+            print(f"Could not draw year chart: {e}")
+
+    # -----------------------------
+    # Country-level chart
+    # -----------------------------
+    cc = charts.get("country_chart")
+    if cc and country:
+        try:
+            if cc.lower() == "line":
+                jobs.append(country_line())
+            else:
+                print(f"Unknown country_chart type: {cc}")
+        except Exception as e:
+            print(f"Could not draw country chart: {e}")
 
-            if yc:
-                if save_dir:
-                    out = os.path.join(save_dir, f"year_{yc}_{year}.png")
-                    plt.savefig(out, bbox_inches="tight")
-                    saved_files.append(out)
+    return jobs
 
-                if show:
-                    plt.show()
-                else:
-                    plt.close()
 
-        except Exception as e:
-            print(f"Could not draw year chart: {e}")
+def render_cache_from_config(cfg: Dict[str, Any]) -> RenderCache | None:
+    """RenderCache for cfg["render_cache"]: true, or {"dir": ..., "max_mb": ...}"""
+    setting = cfg.get("render_cache")
+    if not setting:
+        return None
+    if setting is True:
+        setting = {}
+    return RenderCache(
+        setting.get("dir", DEFAULT_CACHE_DIR),
+        max_bytes=int(setting.get("max_mb", DEFAULT_MAX_MB) * 1024 * 1024),
+    )
+
+
+def show_chart_job(job: Dict[str, Any]) -> str | None:
+    """Draw a job through pyplot, save it if it has an out_path, and show it"""
+    import matplotlib.pyplot as plt
+
+    figsize, _ = chart_jobs.CHART_KINDS[job["kind"]]
+    fig = plt.figure(figsize=figsize)
+    chart_jobs.draw_job(fig, job)
+    if job["out_path"]:
+        with span("savefig", kind=job["kind"]):
+            fig.savefig(job["out_path"], bbox_inches="tight")
+    plt.show()
+    return job["out_path"]
+
+
+# -----------------------------
+# Dashboard runner
+# -----------------------------
+
+def run_from_config(
+    cfg: Dict[str, Any],
+    show: bool = True,
+    save_dir: str | None = None,
+) -> Dict[str, Any]:
+    """Load, compute and chart one config; returns the stats record.
+
+    ``cfg["trace"]`` turns on per-stage instrumentation: true, or
+    {"jsonl": path, "chrome": path, "memory": bool}. The span records are
+    then returned as stats["trace"] and optionally written to the given
+    files (JSON lines, or Chrome trace-event JSON for chrome://tracing).
+
+    ``cfg["lazy"]`` reads only the columns the config needs (see
+    configLoader.required_columns) instead of the whole dataset; columns
+    the charts need are fetched once the statistics are done.
+
+    ``cfg["gap_fill"]`` fills missing years before anything is computed:
+    a gapFill method name, or {"method": ..., "limit": years}. The summary
+    then reports observed and imputed data points separately.
+
+    ``cfg["results_file"]`` also writes the result rows (one per operation)
+    to a .jsonl, .parquet or .arrow file; see resultExport.
+    """
+    trace_cfg = cfg.get("trace")
+    if not trace_cfg:
+        return _run_dashboard(cfg, show, save_dir)
+    if trace_cfg is True:
+        trace_cfg = {}
+
+    with Tracer(memory=trace_cfg.get("memory", True)) as tracer:
+        with span("run_from_config"):
+            stats = _run_dashboard(cfg, show, save_dir)
+
+    print("\n=== Trace ===")
+    for line in tracer.summary():
+        print(line)
+    if trace_cfg.get("jsonl"):
+        tracer.write_jsonl(trace_cfg["jsonl"])
+    if trace_cfg.get("chrome"):
+        tracer.write_chrome(trace_cfg["chrome"])
+
+    stats["trace"] = tracer.records
+    return stats
+
+
+def _run_dashboard(cfg: Dict[str, Any], show: bool, save_dir: str | None) -> Dict[str, Any]:
+    # Validate config
+    if not validate_config(cfg):
+        raise SystemExit("Invalid configuration")
+
+    # Load data
+    loader = DataLoader()
+    lazy = None
+    if cfg.get("lazy"):
+        # only the columns the statistics need; charts fetch theirs later
+        lazy = loader.load_lazy(
+            cfg.get("data_file", "gdp_cleaned_fixed.csv"),
+            use_cache=cfg.get("use_cache", True),
+        )
+        df = lazy.frame(required_columns(cfg, charts=False)) if lazy is not None else pd.DataFrame()
+    else:
+        df = loader.load_cleaned(
+            cfg.get("data_file", "gdp_cleaned_fixed.csv"),
+            use_cache=cfg.get("use_cache", True),
+        )
+    if df.empty:
+        raise SystemExit("Data file not found or empty")
+
+    print(f"Data cache: {'hit' if loader.last_cache_hit else 'miss'}")
+    if lazy is not None:
+        # a cube that is not cached would need every column, so go without
+        cube = lazy.cube() if cfg.get("use_cache", True) else None
+    else:
+        cube = loader.load_cube(
+            cfg.get("data_file", "gdp_cleaned_fixed.csv"),
+            df,
+            use_cache=cfg.get("use_cache", True),
+        )
+
+    year = cfg["year"]
+    ensure_year_in_df(df, year)
+
+    imputed = None
+    if cfg.get("gap_fill"):
+        fill = cfg["gap_fill"]
+        fill = fill if isinstance(fill, dict) else {"method": fill if isinstance(fill, str) else "linear"}
+        df, imputed = loader.fill_gaps(df, fill.get("method", "linear"), fill.get("limit"))
+        # the cube holds reported values only
+        cube = None
+
+    # Process stats
+    proc = DataProcessor(memo_dir=cfg.get("memo_dir"))
+    stats = proc.process_data(df, cfg, cube=cube, imputed=imputed)
+
+    # Summary
+    print("\n=== Dashboard summary ===")
+    print(
+        f"Config: region={cfg.get('region')}, "
+        f"country={cfg.get('country')}, "
+        f"year={year}, operation={cfg.get('operation')}"
+    )
+    print(f"Result ({stats['operation']}): ${stats['result']:,.2f}")
+    if imputed is not None:
+        print(f"Data points: {stats['observed_points']} observed, {stats['imputed_points']} imputed")
+    if cfg.get("results_file"):
+        import resultExport
+        resultExport.export_records(resultExport.result_rows([cfg], [stats]), cfg["results_file"])
+        print(f"Results written to {cfg['results_file']}")
+
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+    ranks = loader.load_rank_index(cfg.get("data_file", "gdp_cleaned_fixed.csv")) if cfg.get("top_n") else None
+    if lazy is not None and imputed is None:
+        df = lazy.frame(required_columns(cfg))
+    with span("chart_data") as s:
+        jobs = chart_jobs_from_config(df, cfg, cube=cube, save_dir=save_dir, ranks=ranks)
+        s.set_rows(len(jobs))
+
+    if show:
+        # interactive windows need pyplot, so these are drawn one at a time
+        saved_files = []
+        for job in jobs:
+            try:
+                out = show_chart_job(job)
+            except Exception as e:
+                print(f"Could not draw {job['kind']} chart: {e}")
+                continue
+            if out:
+                saved_files.append(out)
+    else:
+        # independent charts render at the same time in worker processes
+        cache = render_cache_from_config(cfg)
+        saved_files = chart_jobs.render_jobs(
+            [job for job in jobs if job["out_path"]],
+            workers=cfg.get("render_workers"),
+            cache=cache,
+        )
+        if cache is not None:
+            print(f"Render cache: {cache.stats()}")
 
     if save_dir:
         print(f"Saved chart files: {saved_files}")
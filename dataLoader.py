@@ -1,7 +1,96 @@
+import json
+import os
+import weakref
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+from aggregateCube import AggregateCube, CUBE_SUFFIX
+from countryHierarchy import leaf_mask
+from gapFill import fill_gaps
+from matrixStore import MatrixStore, MATRIX_SUFFIX
+from nameIndex import NameIndex, NAMES_SUFFIX
+from rankIndex import RankIndex, RANK_SUFFIX
+from sourceFingerprint import file_fingerprint, source_matches
+from tracing import traced
+
+# Bump whenever clean_numeric_columns changes its output, so cached frames
+# produced by an older cleaner are rebuilt instead of reused.
+CLEANING_VERSION = 1
+
+CACHE_SUFFIX = ".cache.npz"
+
+
+def normalise_key(value: Any) -> str:
+    """Normalise a name for lookups (stripped and casefolded)"""
+    return str(value).strip().casefold()
+
+
+INDEXED_COLUMNS = ('Continent', 'Country Name')
+
+
+class DatasetIndex:
+    """Normalised continent and country keys mapped to row positions"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self.keys = {}
+        for column in INDEXED_COLUMNS:
+            if column in df.columns:
+                self.keys[column] = self._build(df[column])
+
+    def _build(self, series: pd.Series) -> Dict[str, np.ndarray]:
+        normalised = series.astype(str).str.strip().str.casefold().to_numpy()
+        codes, uniques = pd.factorize(normalised)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        return {key: order[bounds[i]:bounds[i + 1]] for i, key in enumerate(uniques)}
+
+    def positions(self, column: str, names: List[str]) -> np.ndarray:
+        """Sorted row positions whose column matches any of the names"""
+        if column not in self.keys:
+            raise KeyError(column)
+        lookup = self.keys[column]
+        empty = np.empty(0, dtype=np.intp)
+        found = [lookup.get(normalise_key(name), empty) for name in names]
+        if len(found) == 1:
+            return found[0]
+        return np.unique(np.concatenate(found))
+
+
+def as_name_list(value: Any) -> List[str]:
+    """A config name filter as a list: None/"" -> [], "x" -> ["x"]"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    return [str(v) for v in value if str(v).strip()]
+
+
+def _decode_column(data: Any, i: int, col: Dict[str, Any]) -> pd.Series:
+    """Column i of an open binary cache (only that column's arrays are read)"""
+    values = data[f"col/{i}"]
+    if col["kind"] == "str":
+        values = values.astype(object)
+        values[data[f"null/{i}"]] = None
+    return pd.Series(values, dtype=col["dtype"])
+
 
 class DataLoader:
+    def __init__(self):
+        # Set by load_cleaned: True/False for the last load, None before any load
+        self.last_cache_hit = None
+        self.fingerprint = None
+        # id(df) -> (weakref to df, DatasetIndex); one index per loaded dataset
+        self._indexes = {}
+        # Continents recomputed by the last load_cube call ([] on a cache hit)
+        self.last_cube_rebuilt = None
+        # id(df) -> (weakref to df, NameIndex) for fuzzy suggestions
+        self._names = {}
+        # id(df) -> (weakref to df, leaf row mask)
+        self._leaves = {}
+
+    @traced("load_csv", rows=len)
     def load_csv(self, filepath: str) -> pd.DataFrame:
         """Load CSV file"""
         try:
@@ -9,6 +98,7 @@ class DataLoader:
         except Exception:
             return pd.DataFrame()
     
+    @traced("clean_numeric_columns", rows=len)
     def clean_numeric_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean numeric columns using functional programming"""
         if df.empty:
@@ -32,22 +122,400 @@ class DataLoader:
         
         return df
     
+    @traced("fill_gaps", rows=lambda result: len(result[0]))
+    def fill_gaps(self, df: pd.DataFrame, method: str = 'linear',
+                  limit: int | None = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Fill missing years of a cleaned frame; returns (filled frame, imputed mask).
+
+        Runs gapFill over the whole countries x years block at once. The mask
+        is a boolean frame with the same index and year columns, True where
+        a value was filled in. The filled frame gets its own fingerprint, so
+        memoized results never mix filled and reported data.
+        """
+        years = [c for c in df.columns if str(c).strip().isdigit() and len(str(c).strip()) == 4]
+        filled, imputed = fill_gaps(df[years].to_numpy(dtype=np.float64, na_value=np.nan), method, limit)
+
+        out = df.copy()
+        out[years] = filled
+        if df.attrs.get("fingerprint"):
+            out.attrs["fingerprint"] = f"{df.attrs['fingerprint']}+{method}:{limit}"
+        return out, pd.DataFrame(imputed, index=df.index, columns=years)
+
+    # -----------------------------
+    # Binary cache
+    # -----------------------------
+
+    def cache_path(self, filepath: str) -> str:
+        """Path of the binary cache kept next to the source file"""
+        return filepath + CACHE_SUFFIX
+
+    @traced("load_cleaned", rows=len)
+    def load_cleaned(self, filepath: str, use_cache: bool = True) -> pd.DataFrame:
+        """Load and clean a CSV, reusing the binary cache when it is still valid.
+
+        The cache is keyed on the source size, mtime, sha256 and
+        CLEANING_VERSION. ``self.last_cache_hit`` records whether this load
+        was served from the cache.
+        """
+        self.last_cache_hit = False
+        self.fingerprint = None
+
+        if not os.path.exists(filepath):
+            return pd.DataFrame()
+
+        cache_file = self.cache_path(filepath)
+        if use_cache and os.path.exists(cache_file):
+            df = self._read_cache(filepath, cache_file)
+            if df is not None:
+                self.last_cache_hit = True
+                df.attrs["fingerprint"] = self.fingerprint
+                return df
+
+        df = self.clean_numeric_columns(self.load_csv(filepath))
+        if df.empty:
+            return df
+
+        source = file_fingerprint(filepath)
+        self.fingerprint = self._fingerprint_key(source)
+        if use_cache:
+            self._write_cache(df, source, cache_file)
+        df.attrs["fingerprint"] = self.fingerprint
+        return df
+
+    def save_cleaned(self, df: pd.DataFrame, filepath: str, use_cache: bool = True) -> None:
+        """Write an already-cleaned frame to filepath and key its binary cache on the result.
+
+        The CSV is replaced atomically; df.attrs["fingerprint"] and
+        ``self.fingerprint`` are set as load_cleaned would set them.
+        """
+        tmp_file = filepath + ".tmp"
+        try:
+            df.to_csv(tmp_file, index=False)
+            os.replace(tmp_file, filepath)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+        source = file_fingerprint(filepath)
+        self.fingerprint = self._fingerprint_key(source)
+        if use_cache:
+            self._write_cache(df, source, self.cache_path(filepath))
+        df.attrs["fingerprint"] = self.fingerprint
+
+    def _fingerprint_key(self, source: Dict[str, Any]) -> str:
+        return f"{source['sha256']}:v{CLEANING_VERSION}"
+
+    def _read_cache(self, filepath: str, cache_file: str) -> pd.DataFrame | None:
+        try:
+            with np.load(cache_file, allow_pickle=False) as data:
+                meta = json.loads(str(data["__meta__"]))
+                if meta.get("cleaning_version") != CLEANING_VERSION:
+                    return None
+
+                matches, source = source_matches(meta["source"], filepath)
+                if not matches:
+                    return None
+                # A touched file with unchanged content only needs re-keying
+                refresh = source is not meta["source"]
+
+                columns = {col["name"]: _decode_column(data, i, col) for i, col in enumerate(meta["columns"])}
+        except Exception:
+            return None
+
+        df = pd.DataFrame(columns)
+        self.fingerprint = self._fingerprint_key(source)
+        if refresh:
+            self._write_cache(df, source, cache_file)
+        return df
+
+    def _write_cache(self, df: pd.DataFrame, source: Dict[str, Any], cache_file: str) -> None:
+        arrays = {}
+        columns = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                kind = "num"
+                arrays[f"col/{i}"] = series.to_numpy()
+            else:
+                kind = "str"
+                nulls = series.isna().to_numpy()
+                arrays[f"col/{i}"] = series.astype(str).to_numpy(dtype=str)
+                arrays[f"null/{i}"] = nulls
+            columns.append({"name": str(name), "kind": kind, "dtype": str(series.dtype)})
+
+        meta = {"cleaning_version": CLEANING_VERSION, "source": source, "columns": columns}
+        arrays["__meta__"] = np.array(json.dumps(meta))
+
+        # Write to a temp file first so a crash never leaves a half-written cache
+        tmp_file = cache_file + ".tmp.npz"
+        try:
+            np.savez(tmp_file, **arrays)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def load_lazy(self, filepath: str, use_cache: bool = True) -> "LazyDataset | None":
+        """Open a dataset without reading any column yet; None if the file is missing.
+
+        With a valid binary cache, columns are later read one by one from it;
+        otherwise they are parsed (and cleaned) from the CSV with usecols.
+        """
+        self.last_cache_hit = False
+        if not os.path.exists(filepath):
+            return None
+
+        cache_file = self.cache_path(filepath)
+        if use_cache and os.path.exists(cache_file):
+            try:
+                with np.load(cache_file, allow_pickle=False) as data:
+                    meta = json.loads(str(data["__meta__"]))
+                matches, source = source_matches(meta["source"], filepath)
+                if matches and meta.get("cleaning_version") == CLEANING_VERSION:
+                    self.last_cache_hit = True
+                    self.fingerprint = self._fingerprint_key(source)
+                    return LazyDataset(self, filepath, [col["name"] for col in meta["columns"]],
+                                       self.fingerprint, meta["columns"])
+            except Exception:
+                pass
+
+        columns = [str(c) for c in pd.read_csv(filepath, nrows=0).columns]
+        self.fingerprint = self._fingerprint_key(file_fingerprint(filepath))
+        return LazyDataset(self, filepath, columns, self.fingerprint, None, use_cache)
+
+    @traced("load_cube")
+    def load_cube(self, filepath: str, df: pd.DataFrame, use_cache: bool = True) -> AggregateCube:
+        """Return the continent x year cube for a frame loaded by load_cleaned.
+
+        The cube is stored next to the dataset cache. When the source changed,
+        the stale cube is updated incrementally for the changed rows only.
+        """
+        cube_file = filepath + CUBE_SUFFIX
+        saved = AggregateCube.load(cube_file) if use_cache and os.path.exists(cube_file) else None
+
+        if saved is not None:
+            cube, meta = saved
+            if self.fingerprint is not None and meta.get("fingerprint") == self.fingerprint:
+                self.last_cube_rebuilt = []
+                return cube
+            self.last_cube_rebuilt = cube.update(df)
+        else:
+            cube = AggregateCube.from_frame(df)
+            self.last_cube_rebuilt = list(cube.continents)
+        cube.fingerprint = self.fingerprint
+
+        if use_cache:
+            cube.save(cube_file, self.fingerprint)
+        return cube
+
+    def load_matrix(self, filepath: str, dtype: Any = np.float64) -> MatrixStore | None:
+        """Open the memory-mapped countries x years store for a CSV.
+
+        The store is (re)built from load_cleaned when missing or stale; after
+        that every call, from any process, maps the same file read-only.
+        """
+        if not os.path.exists(filepath):
+            return None
+
+        store = MatrixStore.open(filepath, source_file=filepath)
+        if store is not None and store.values.dtype == np.dtype(dtype):
+            return store
+
+        df = self.load_cleaned(filepath)
+        if df.empty:
+            return None
+        MatrixStore.from_frame(df, dtype=dtype).save(filepath, file_fingerprint(filepath))
+        return MatrixStore.open(filepath)
+
+    def load_rank_index(self, filepath: str) -> RankIndex | None:
+        """Per-year country rankings for a CSV, cached next to it.
+
+        Built from the matrix store on first use and rebuilt only when the
+        source file changes.
+        """
+        rank_file = filepath + RANK_SUFFIX
+        ranks = RankIndex.load(rank_file, source_file=filepath) if os.path.exists(rank_file) else None
+        if ranks is not None:
+            return ranks
+
+        store = self.load_matrix(filepath)
+        if store is None:
+            return None
+        ranks = RankIndex.from_store(store)
+        ranks.save(rank_file, file_fingerprint(filepath))
+        return ranks
+
+    # -----------------------------
+    # Indexed filtering
+    # -----------------------------
+
+    def index_for(self, df: pd.DataFrame) -> DatasetIndex:
+        """Return the name index for a dataset, building it on first use.
+
+        The index is kept for as long as the frame lives and keeps its row
+        count. Label columns edited in place are not noticed: call
+        forget(df) after rewriting Continent or Country Name.
+        """
+        entry = self._indexes.get(id(df))
+        if entry is not None and entry[0]() is df and entry[1].n_rows == len(df):
+            return entry[1]
+
+        index = DatasetIndex(df)
+        self._indexes = {k: v for k, v in self._indexes.items() if v[0]() is not None}
+        self._indexes[id(df)] = (weakref.ref(df), index)
+        return index
+
+    def leaves_for(self, df: pd.DataFrame) -> np.ndarray:
+        """Read-only mask of a frame's real-country rows, built on first use.
+
+        Kept like index_for: per frame, until its row count changes or
+        forget(df) is called.
+        """
+        entry = self._leaves.get(id(df))
+        if entry is not None and entry[0]() is df and len(entry[1]) == len(df):
+            return entry[1]
+
+        leaves = leaf_mask(df)
+        leaves.setflags(write=False)
+        self._leaves = {k: v for k, v in self._leaves.items() if v[0]() is not None}
+        self._leaves[id(df)] = (weakref.ref(df), leaves)
+        return leaves
+
+    def forget(self, df: pd.DataFrame) -> None:
+        """Drop the indexes built for a frame, after its labels were edited in place"""
+        self._indexes.pop(id(df), None)
+        self._names.pop(id(df), None)
+        self._leaves.pop(id(df), None)
+
+    def load_name_index(self, filepath: str, df: pd.DataFrame, use_cache: bool = True) -> NameIndex:
+        """Exact and fuzzy name lookup for a frame loaded by load_cleaned, cached next to it"""
+        names_file = filepath + NAMES_SUFFIX
+        saved = NameIndex.load(names_file) if use_cache and os.path.exists(names_file) else None
+        if saved is not None and self.fingerprint is not None and saved[1].get("fingerprint") == self.fingerprint:
+            names = saved[0]
+        else:
+            names = NameIndex.from_frame(df)
+            if use_cache:
+                names.save(names_file, self.fingerprint)
+        self._names[id(df)] = (weakref.ref(df), names)
+        return names
+
+    def names_for(self, df: pd.DataFrame) -> NameIndex:
+        """The NameIndex of a dataset (the loaded one if any), building it on first use"""
+        entry = self._names.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        names = NameIndex.from_frame(df)
+        self._names = {k: v for k, v in self._names.items() if v[0]() is not None}
+        self._names[id(df)] = (weakref.ref(df), names)
+        return names
+
+    def _report_missing(self, df: pd.DataFrame, column: str, kind: str, names: List[str]) -> None:
+        """Print a suggestion for every name that matches no row"""
+        index = self.index_for(df)
+        for name in names:
+            if not len(index.positions(column, [name])):
+                label = "Region" if kind == "continent" else "Country"
+                print(f"{label} '{name}' not found.{self.names_for(df).did_you_mean(name, kind)}")
+
+    def positions_for_config(self, df: pd.DataFrame, config: Dict[str, Any]) -> np.ndarray:
+        """Row positions selected by the config's region(s) and country(s)"""
+        index = self.index_for(df)
+        positions = None
+
+        regions = as_name_list(config.get('region'))
+        if regions:
+            positions = index.positions('Continent', regions)
+
+        countries = as_name_list(config.get('country'))
+        if countries:
+            selected = index.positions('Country Name', countries)
+            positions = selected if positions is None else np.intersect1d(positions, selected)
+
+        if positions is None:
+            return np.arange(len(df))
+        return positions
+
+    @traced("filter_by_config", rows=len)
     def filter_by_config(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
-        """Filter data based on configuration with case-insensitive matching"""
-        filtered_df = df.copy()
-        
-        region = config.get('region', '').strip()
-        country = config.get('country', '').strip()
-        
-        # Case-insensitive filtering using lambda
-        if region:
-            region_lower = region.lower()
-            region_filter = lambda row: str(row['Continent']).strip().lower() == region_lower
-            filtered_df = filtered_df[filtered_df.apply(region_filter, axis=1)]
-        
-        if country:
-            country_lower = country.lower()
-            country_filter = lambda row: str(row['Country Name']).strip().lower() == country_lower
-            filtered_df = filtered_df[filtered_df.apply(country_filter, axis=1)]
-        
-        return filtered_df
\ No newline at end of file
+        """Filter data based on configuration with case-insensitive matching.
+
+        ``region`` and ``country`` may each be a single name or a list of names.
+        """
+        if not as_name_list(config.get('region')) and not as_name_list(config.get('country')):
+            return df.copy()
+
+        positions = self.positions_for_config(df, config)
+        if not len(positions):
+            # a misspelt name should not pass silently as an empty selection
+            self._report_missing(df, 'Continent', 'continent', as_name_list(config.get('region')))
+            self._report_missing(df, 'Country Name', 'country', as_name_list(config.get('country')))
+        return df.iloc[positions]
+
+
+class LazyDataset:
+    """A cleaned dataset whose columns are read only when a frame asks for them.
+
+    Columns come from the binary cache one npz member at a time, or, without
+    a valid cache, from the CSV with usecols and are cleaned on the way in.
+    Columns already read are kept, so a later frame() only fetches what is
+    new. A full read from the CSV also writes the binary cache.
+    """
+
+    def __init__(self, loader: DataLoader, filepath: str, columns: List[str], fingerprint: str,
+                 cache_columns: List[Dict[str, Any]] | None = None, use_cache: bool = True):
+        self.loader = loader
+        self.filepath = filepath
+        self.columns = list(columns)
+        self.fingerprint = fingerprint
+        self.use_cache = use_cache
+        # name -> (position, cache meta) when reading from the binary cache
+        self._cache_columns = {col["name"]: (i, col) for i, col in enumerate(cache_columns)} \
+            if cache_columns is not None else None
+        self._loaded: Dict[str, pd.Series] = {}
+
+    @property
+    def year_columns(self) -> List[str]:
+        return [c for c in self.columns if c.strip().isdigit() and len(c.strip()) == 4]
+
+    @property
+    def loaded_columns(self) -> List[str]:
+        return [c for c in self.columns if c in self._loaded]
+
+    def frame(self, columns: List[str] | None = None) -> pd.DataFrame:
+        """A frame of the given columns (every column for None), in file order"""
+        wanted = set(self.columns if columns is None else columns) & set(self.columns)
+        missing = [c for c in self.columns if c in wanted and c not in self._loaded]
+        if missing:
+            self._fetch(missing)
+        df = pd.DataFrame({c: self._loaded[c] for c in self.columns if c in wanted})
+        df.attrs["fingerprint"] = self.fingerprint
+        return df
+
+    @traced("fetch_columns")
+    def _fetch(self, names: List[str]) -> None:
+        if self._cache_columns is not None:
+            with np.load(self.loader.cache_path(self.filepath), allow_pickle=False) as data:
+                for name in names:
+                    i, col = self._cache_columns[name]
+                    self._loaded[name] = _decode_column(data, i, col)
+            return
+
+        df = self.loader.clean_numeric_columns(pd.read_csv(self.filepath, usecols=names))
+        df.columns = [str(c) for c in df.columns]
+        for name in names:
+            self._loaded[name] = df[name]
+        if self.use_cache and len(self._loaded) == len(self.columns):
+            # everything has been parsed once anyway; keep it for next time
+            full = pd.DataFrame({c: self._loaded[c] for c in self.columns})
+            self.loader._write_cache(full, file_fingerprint(self.filepath), self.loader.cache_path(self.filepath))
+
+    def cube(self, use_cache: bool = True) -> AggregateCube:
+        """The continent cube; reads every column only if the saved cube is stale"""
+        cube_file = self.filepath + CUBE_SUFFIX
+        saved = AggregateCube.load(cube_file) if use_cache and os.path.exists(cube_file) else None
+        if saved is not None and saved[1].get("fingerprint") == self.fingerprint:
+            return saved[0]
+        self.loader.fingerprint = self.fingerprint
+        return self.loader.load_cube(self.filepath, self.frame(), use_cache=use_cache)
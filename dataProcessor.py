@@ -1,50 +1,302 @@
-from typing import List, Dict, Any
+import hashlib
+import json
+import os
+import copy
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+import numpy as np
 import pandas as pd
-from functools import reduce
+
+from aggregateCube import CUBE_OPERATIONS
+from configLoader import config_key
+from dataLoader import DataLoader, as_name_list, normalise_key
+from lruCache import LRUCache
+from statsEngine import compute_statistics, expand_operations
+from tracing import traced
+
+def dataset_key(df: pd.DataFrame) -> str | None:
+    """Memo identity of a frame, or None when it was not loaded by load_cleaned.
+
+    The fingerprint load_cleaned stores in df.attrs, plus the frame's row
+    labels: pandas carries attrs over to filtered frames, and the labels
+    tell which rows of the loaded dataset a frame holds. A loaded frame has
+    a RangeIndex, so its key costs nothing to build.
+    """
+    fingerprint = df.attrs.get("fingerprint")
+    if not fingerprint:
+        return None
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        rows = f"{index.start}:{index.stop}:{index.step}"
+    else:
+        rows = hashlib.blake2b(pd.util.hash_array(index.to_numpy()).tobytes(), digest_size=8).hexdigest()
+    return f"{fingerprint}/{rows}"
+
+
+class ResultMemo:
+    """Bounded LRU of process_data results, optionally mirrored to disk.
+
+    Keys are (dataset key, normalised config, cube used, imputed mask
+    used). When the source file changes, load_cleaned gives the data a new
+    fingerprint and every old entry simply stops matching (and ages out). Records are copied in and out, so a
+    caller editing a returned record never edits the memo. With a directory, each entry is also
+    written there as ``<fingerprint>-<hash>.json`` so other processes (or
+    the next dashboard run) start warm; the directory keeps at most
+    max_entries files, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 1024, directory: str | None = None):
+        self.cache = LRUCache(max_entries)
+        self.directory = directory
+        self.disk_hits = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _file(self, key: Tuple[str, str, bool, bool]) -> str:
+        name = hashlib.sha256(json.dumps(key).encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f"{key[0].split(':')[0][:16]}-{name}.json")
+
+    def get(self, key: Tuple[str, str, bool, bool]) -> Dict[str, Any] | None:
+        record = self.cache.get(key)
+        if record is not None or not self.directory:
+            return copy.deepcopy(record)
+        path = self._file(key)
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if saved.get("key") != list(key):
+            return None
+        os.utime(path)  # mark as recently used
+        self.disk_hits += 1
+        record = saved["record"]
+        self.cache.put(key, record, len(json.dumps(record)))
+        return copy.deepcopy(record)
+
+    def put(self, key: Tuple[str, str, bool, bool], record: Dict[str, Any]) -> None:
+        payload = json.dumps({"key": list(key), "record": record}, default=str)
+        self.cache.put(key, copy.deepcopy(record), len(payload))
+        if not self.directory:
+            return
+        path = self._file(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.stat(path).st_mtime_ns, path))
+                except OSError:
+                    continue
+        for _, path in sorted(entries)[:max(len(entries) - self.cache.max_entries, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def invalidate(self, fingerprint: str | None = None) -> int:
+        """Drop entries for one dataset fingerprint (every entry if None)"""
+        removed = 0
+        for key in self.cache.keys():
+            if fingerprint is None or key[0].startswith(fingerprint):
+                self.cache.pop(key)
+                removed += 1
+        if self.directory:
+            prefix = fingerprint.split(':')[0][:16] if fingerprint else ""
+            for name in os.listdir(self.directory):
+                if name.endswith(".json") and name.startswith(prefix):
+                    os.remove(os.path.join(self.directory, name))
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "disk_hits": self.disk_hits}
+
+
+def _named(config: Dict[str, Any], field: str) -> List[str]:
+    """The names a config filters a field on ("All" means no filter)"""
+    return [n for n in as_name_list(config.get(field)) if normalise_key(n) != 'all']
+
+
+def _echo(record: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """A cached record with the caller's own spelling of the config fields"""
+    record = dict(record)
+    record["year"] = config.get("year")
+    for field in ("region", "country"):
+        given = config.get(field, "All")
+        if normalise_key(record[field]) == normalise_key("All" if given is None else given):
+            record[field] = given
+    return record
+
 
 class DataProcessor:
-    def extract_year_data(self, df: pd.DataFrame, year: int) -> List[float]:
-        """Extract GDP values for specific year using functional approach"""
+    def __init__(self, memo_size: int = 1024, memo_dir: str | None = None):
+        # Results of process_data for loaded datasets; memo_size=0 turns it off
+        self.memo = ResultMemo(memo_size, memo_dir) if memo_size else None
+        # row indexes (names, leaf rows) built once per frame
+        self.loader = DataLoader()
+
+    def year_values(self, df: pd.DataFrame, year: int) -> np.ndarray:
+        """Return a year column as a float64 array, NaNs included"""
         year_str = str(year)
-        
+
         if year_str not in df.columns or df.empty:
-            return []
-        
-        # Filter out NaN values using lambda and filter
-        values = df[year_str].tolist()
-        non_nan_values = list(filter(lambda x: not pd.isna(x), values))
-        
-        return list(map(float, non_nan_values))
-    
+            return np.empty(0, dtype=np.float64)
+
+        return df[year_str].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def imputed_counts(self, df: pd.DataFrame, year: int, imputed: pd.DataFrame,
+                       rows: np.ndarray | None = None) -> Dict[str, int]:
+        """Observed and imputed non-NaN points of a year column (of the given row positions)"""
+        values = self.year_values(df, year)
+        rows = np.arange(len(values)) if rows is None or not len(values) else rows
+        values = values[rows]
+        if str(year) not in imputed.columns or not len(values):
+            return {"observed_points": int((~np.isnan(values)).sum()), "imputed_points": 0}
+        mask = imputed[str(year)].reindex(df.index, fill_value=False).to_numpy(dtype=bool)[rows]
+        present = ~np.isnan(values)
+        return {"observed_points": int((present & ~mask).sum()), "imputed_points": int((present & mask).sum())}
+
+    def extract_year_data(self, df: pd.DataFrame, year: int) -> List[float]:
+        """Extract non-NaN GDP values for specific year"""
+        values = self.year_values(df, year)
+        return values[~np.isnan(values)].tolist()
+
     def calculate_statistics(self, gdp_values: List[float], operation: str) -> float:
-        """Calculate statistics using functional programming"""
-        if not gdp_values:
-            return 0.0
-        
-        # Define operations as lambda functions
-        operations = {
-            'average': lambda vals: reduce(lambda x, y: x + y, vals) / len(vals),
-            'sum': lambda vals: reduce(lambda x, y: x + y, vals),
-            'min': lambda vals: reduce(lambda x, y: x if x < y else y, vals),
-            'max': lambda vals: reduce(lambda x, y: x if x > y else y, vals)
-        }
-        
-        if operation in operations:
-            return operations[operation](gdp_values)
+        """Calculate a single statistic"""
+        return compute_statistics(gdp_values, [operation])[operation]
+
+    def from_cube(self, cube, config: Dict[str, Any], operations: List[str]) -> Dict[str, Any] | None:
+        """Answer a plain region/year aggregate from the cube, or return None.
+
+        A plain aggregate names no country, and every operation is one the
+        cube stores. The caller checks that the cube covers its frame. A named region is answered for the whole region;
+        otherwise the totals span every country row the cube was built from.
+        """
+        year = config.get("year")
+        region = config.get("region") or "All"
+        country = config.get("country") or "All"
+        if country != "All" or not isinstance(region, str) or not cube.has_year(year):
+            return None
+        if not all(op in CUBE_OPERATIONS for op in operations):
+            return None
+
+        if region == "All":
+            lookup = lambda stat: cube.total(year, stat)
+            rows = cube.leaf_rows()
+        elif cube.has_region(region):
+            lookup = lambda stat: cube.get(region, year, stat)
+            rows = cube.region_rows(region)
         else:
-            return 0.0
-    
-    def process_data(self, df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Main processing function - uses functional programming"""
+            return None
+        if rows < 2:
+            # single-row answers also need the row's names, take the frame path
+            return None
+
+        count = int(lookup('count'))
+        results = {}
+        for op in operations:
+            value = lookup(CUBE_OPERATIONS[op])
+            results[op] = float(value) if count and not np.isnan(value) else 0.0
+        results['count'] = float(count)
+        return {"results": results, "region": "Multiple" if region == "All" else region}
+
+    def uses_cube(self, cube, df: pd.DataFrame, config: Dict[str, Any]) -> bool:
+        """True when process_data(df, config, cube) is answered from the cube"""
+        if cube is None or not cube.covers(df):
+            return False
+        operations = [config.get("operation", "average"), *expand_operations(config.get("operations"))]
+        return self.from_cube(cube, config, list(dict.fromkeys(operations))) is not None
+
+    @traced("process_data", rows=lambda stats: stats["data_points"])
+    def process_data(self, df: pd.DataFrame, config: Dict[str, Any], cube=None,
+                     imputed: pd.DataFrame | None = None) -> Dict[str, Any]:
+        """Main processing function.
+
+        ``config["operations"]`` may list extra operations (or be "all"); they
+        are computed in the same pass and returned under "results".
+        ``config["weights"]`` names the column used by weighted_mean.
+        Statistics cover the rows the config's region(s) and country(s)
+        select, as filter_by_config selects them, so a frame filtered
+        beforehand gives the same answer. Aggregate rows (World, regions,
+        income groups) are left out unless the config names a country, as
+        they are in the cube's cells. With an AggregateCube built from df
+        itself (cube.covers(df)), plain region/year aggregates are read from
+        it; a filtered or derived frame takes the frame path.
+        With the imputed mask of DataLoader.fill_gaps, the record also splits
+        data_points into observed_points and imputed_points (the cube, built
+        from reported values only, is not used then).
+        Results for frames loaded by DataLoader.load_cleaned are memoized on
+        (dataset_key, normalised config). The key does not look at values:
+        a frame edited in place, or derived from a loaded one with the same
+        rows, must drop df.attrs["fingerprint"] (fill_gaps re-keys its own).
+        """
+        key = None
+        if self.memo is not None and not isinstance(config.get("year"), (list, dict)):
+            data_key = dataset_key(df)
+            if data_key is not None:
+                key = (data_key, config_key(config), self.uses_cube(cube, df, config) and imputed is None,
+                       imputed is not None)
+                cached = self.memo.get(key)
+                if cached is not None:
+                    return _echo(cached, config)
+
+        stats = self._process(df, config, None if imputed is not None else cube)
+        if imputed is not None:
+            stats.update(self.imputed_counts(df, config.get("year"), imputed, self.counted_rows(df, config)))
+        if key is not None:
+            self.memo.put(key, stats)
+        return stats
+
+    def _process(self, df: pd.DataFrame, config: Dict[str, Any], cube=None) -> Dict[str, Any]:
         year = config.get("year")
         operation = config.get("operation", "average")
-        
-        # Extract GDP values
-        gdp_values = self.extract_year_data(df, year)
-        
-        # Calculate result
-        result = self.calculate_statistics(gdp_values, operation)
-        
+        extra = expand_operations(config.get("operations"))
+
+        if cube is not None and cube.covers(df):
+            cached = self.from_cube(cube, config, list(dict.fromkeys([operation, *extra])))
+            if cached is not None:
+                return self._stats_record(config, cached["results"], cached["region"], "Multiple")
+
+        # Extract GDP values and calculate every requested statistic at once
+        values = self.year_values(df, year)
+        weights = None
+        weight_column = config.get("weights")
+        if weight_column and weight_column in df.columns and len(values):
+            weights = df[weight_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        rows = self.counted_rows(df, config)
+        if len(values):
+            values = values[rows]
+            weights = weights[rows] if weights is not None else None
+        results = compute_statistics(values, [operation, *extra, 'count'], weights)
+
+        region, country = self.describe_selection(df.iloc[rows[:2]], config)
+        return self._stats_record(config, results, region, country)
+
+    def counted_rows(self, df: pd.DataFrame, config: Dict[str, Any]) -> np.ndarray:
+        """Positions of the rows a config's statistics cover.
+
+        The rows its region(s) and country(s) select; aggregate rows only
+        when a country is named.
+        """
+        regions, countries = _named(config, 'region'), _named(config, 'country')
+        if not regions and not countries:
+            return np.flatnonzero(self.loader.leaves_for(df))
+        positions = self.loader.positions_for_config(df, {'region': regions, 'country': countries})
+        if countries:
+            return positions
+        return positions[self.loader.leaves_for(df)[positions]]
+
+    def describe_selection(self, df: pd.DataFrame, config: Dict[str, Any]) -> Tuple[Any, Any]:
+        """Resolve "All" region/country to the single row's names or "Multiple"""
         # Get region and country from filtered data
         region = config.get("region", "All")
         country = config.get("country", "All")
@@ -55,12 +307,127 @@ class DataProcessor:
                 region = df['Continent'].iloc[0] if len(df) == 1 else "Multiple"
             if country == "All" and 'Country Name' in df.columns:
                 country = df['Country Name'].iloc[0] if len(df) == 1 else "Multiple"
-        
-        return {
+
+        return region, country
+
+    def _stats_record(self, config: Dict[str, Any], results: Dict[str, float],
+                      region: Any, country: Any) -> Dict[str, Any]:
+        operation = config.get("operation", "average")
+        extra = expand_operations(config.get("operations"))
+        stats = {
             "operation": operation,
-            "year": year,
+            "year": config.get("year"),
             "region": region,
             "country": country,
-            "result": result,
-            "data_points": len(gdp_values)
-        }
\ No newline at end of file
+            "result": results[operation],
+            "data_points": int(results['count'])
+        }
+        if extra:
+            stats["results"] = {op: results[op] for op in dict.fromkeys([operation, *extra])}
+        return stats
+
+    # -----------------------------
+    # Batch queries
+    # -----------------------------
+
+    def process_batch(self, df: pd.DataFrame, configs: Iterable[Dict[str, Any]],
+                      loader: DataLoader | None = None) -> Iterator[Dict[str, Any]]:
+        """Evaluate many configs against one dataset, yielding results in input order.
+
+        Each config is answered over the rows its region/country select (as
+        filter_by_config would select them; "All" means no filter). Configs
+        sharing a year and filter are reduced together: every distinct
+        (filter, year, weights) group is computed once, with the union of the
+        operations its configs ask for.
+        """
+        configs = list(configs)
+        loader = loader or self.loader
+
+        def selection_key(config):
+            names = lambda field: tuple(sorted(normalise_key(n) for n in _named(config, field)))
+            return names('region'), names('country')
+
+        def group_key(config):
+            return selection_key(config), str(config.get('year')), config.get('weights')
+
+        wanted: Dict[Any, set] = {}
+        for config in configs:
+            ops = [config.get("operation", "average"), *expand_operations(config.get("operations"))]
+            wanted.setdefault(group_key(config), {'count'}).update(ops)
+
+        selections: Dict[Any, np.ndarray] = {}
+        columns: Dict[str, np.ndarray] = {}
+        computed: Dict[Any, Dict[str, float]] = {}
+
+        for config in configs:
+            key = group_key(config)
+            selection, year, weight_column = key
+
+            if selection not in selections:
+                regions, countries = selection
+                positions = loader.positions_for_config(df, {'region': list(regions), 'country': list(countries)})
+                if not countries:
+                    # aggregate rows only count when asked for by name
+                    positions = positions[loader.leaves_for(df)[positions]]
+                selections[selection] = positions
+            positions = selections[selection]
+
+            if key not in computed:
+                if year not in columns:
+                    columns[year] = self.year_values(df, year)
+                values = columns[year][positions] if len(columns[year]) else columns[year]
+                weights = None
+                if weight_column and weight_column in df.columns and len(values):
+                    weights = df[weight_column].to_numpy(dtype=np.float64, na_value=np.nan)[positions]
+                computed[key] = compute_statistics(values, sorted(wanted[key]), weights)
+
+            # Two rows are enough to tell "single row" from "Multiple"
+            region, country = self.describe_selection(df.iloc[positions[:2]], config)
+            yield self._stats_record(config, computed[key], region, country)
+
+    # -----------------------------
+    # Cross-indicator expressions
+    # -----------------------------
+
+    def indicator_ratio(self, store, numerator: str, denominator: str, scale: float = 1.0) -> np.ndarray:
+        """numerator / denominator * scale for every country and year of an IndicatorStore.
+
+        GDP over population gives GDP per capita. Cells where either side is
+        missing or the denominator is not positive are NaN.
+        """
+        top = store.indicator(numerator)
+        bottom = store.indicator(denominator)
+        out = np.full(top.shape, np.nan)
+        valid = bottom > 0
+        np.divide(top, bottom, out=out, where=valid)
+        if scale != 1.0:
+            out *= scale
+        return out
+
+    def indicator_weighted_mean(self, store, indicator: str, weight: str,
+                                values: np.ndarray | None = None) -> Tuple[List[str], np.ndarray]:
+        """Weighted average of an indicator per continent and for all countries, every year.
+
+        Returns (labels, groups x years) with labels the store's continents
+        followed by "All". ``values`` replaces the indicator with a derived
+        countries x years block (e.g. an indicator_ratio result). Aggregate
+        rows are left out so no country is weighted twice; groups with no
+        weight in a year are NaN.
+        """
+        from countryHierarchy import is_aggregate
+
+        block = store.indicator(indicator) if values is None else values
+        w = store.indicator(weight)
+        both = ~np.isnan(block) & ~np.isnan(w) & ~is_aggregate(store.codes)[:, None]
+        weighted = np.where(both, block * w, 0.0)
+        weights = np.where(both, w, 0.0)
+
+        # one row per group: continents, then every leaf row
+        groups = np.zeros((len(store.continents) + 1, len(store.codes)))
+        labelled = store.continent_codes >= 0
+        groups[store.continent_codes[labelled], np.flatnonzero(labelled)] = 1.0
+        groups[-1] = 1.0
+        totals = groups @ weights
+        out = np.full(totals.shape, np.nan)
+        np.divide(groups @ weighted, totals, out=out, where=totals != 0)
+        return list(store.continents) + ["All"], out
@@ -1,20 +1,47 @@
-import matplotlib.pyplot as plt
 import pandas as pd
+from typing import Tuple, List
 
-def yearly_gdp_bar(df: pd.DataFrame, year: int) -> None:
+from countryHierarchy import leaf_mask
+from nameIndex import NameIndex
+from rankIndex import top_n_with_other
+from tracing import traced
+
+# -----------------------------
+# Data slices (no plotting)
+# -----------------------------
+
+@traced("yearly_bar_data", rows=lambda data: len(data[1]))
+def yearly_bar_data(df: pd.DataFrame, year: int, cube=None) -> Tuple[List[str], List[float]]:
+    """Continent labels and GDP totals for one year (leaf countries only)"""
     year = str(year)
+    if cube is not None and cube.has_year(year) and cube.covers(df):
+        # precomputed continent totals, no groupby over the frame
+        labels, values = cube.year_slice(year, "sum")
+        return list(labels), values.tolist()
     df[year] = pd.to_numeric(df[year], errors="coerce")
-    grouped = df.groupby("Continent")[year].sum()
-    plt.figure(figsize=(10, 6))
-    plt.bar(grouped.index, grouped.values)
-    plt.xlabel("Continent")
-    plt.ylabel("GDP")
-    plt.title(f"GDP by Continent in {year}")
-    plt.tight_layout()
+    grouped = df[leaf_mask(df)].groupby("Continent")[year].sum()
+    return grouped.index.tolist(), grouped.values.tolist()
+
+@traced("regional_bar_data", rows=lambda data: len(data[1]))
+def regional_bar_data(df: pd.DataFrame, region: str, year: int, top_n: int | None = None,
+                      ranks=None) -> Tuple[List[str], List[float]] | None:
+    """Country names and GDP for one region and year, or None if nothing to plot.
 
-def regional_gdp_bar(df: pd.DataFrame, region: str, year: int) -> None:
+    With top_n, only the top_n largest countries (aggregate rows left out)
+    are kept, largest first, followed by an "Other" total for the rest;
+    a RankIndex answers that without sorting the frame.
+    """
     year = str(year)
 
+    if top_n and ranks is not None and year in ranks.year_index:
+        labels, values, rest = ranks.top_in_region(region, year, top_n)
+        if not labels:
+            print(f" No data for region '{region}'")
+            return None
+        if rest is not None:
+            labels, values = labels + ["Other"], values + [rest]
+        return labels, values
+
     # ensure numeric
     df[year] = pd.to_numeric(df[year], errors="coerce")
 
@@ -23,17 +50,61 @@ def regional_gdp_bar(df: pd.DataFrame, region: str, year: int) -> None:
 
     if region_df.empty:
         print(f" No data for region '{region}'")
-        return
+        return None
 
     values = region_df[year]
     if values.isna().all():
         print(f" All GDP values are NaN for region '{region}' year {year}")
+        return None
+
+    if top_n:
+        leaves = leaf_mask(region_df)
+        return top_n_with_other(region_df["Country Name"][leaves].tolist(), values[leaves].tolist(), top_n)
+    return region_df["Country Name"].tolist(), values.tolist()
+
+# -----------------------------
+# Drawing onto an Axes
+# -----------------------------
+
+def plot_yearly_bar(ax, labels: List[str], values: List[float], year: int) -> None:
+    ax.bar(labels, values)
+    ax.set_xlabel("Continent")
+    ax.set_ylabel("GDP")
+    ax.set_title(f"GDP by Continent in {year}")
+
+def plot_regional_bar(ax, labels: List[str], values: List[float], region: str, year: int) -> None:
+    ax.bar(labels, values)
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.set_xlabel("Country")
+    ax.set_ylabel("GDP")
+    ax.set_title(f"GDP by Country — {region} ({year})")
+
+# -----------------------------
+# pyplot entry points
+# -----------------------------
+# pyplot is imported on first use so that data-only callers never load it
+
+@traced("yearly_gdp_bar")
+def yearly_gdp_bar(df: pd.DataFrame, year: int, cube=None) -> None:
+    import matplotlib.pyplot as plt
+
+    labels, values = yearly_bar_data(df, year, cube)
+    plt.figure(figsize=(10, 6))
+    plot_yearly_bar(plt.gca(), labels, values, year)
+    plt.tight_layout()
+
+@traced("regional_gdp_bar")
+def regional_gdp_bar(df: pd.DataFrame, region: str, year: int, top_n: int | None = None) -> None:
+    import matplotlib.pyplot as plt
+
+    data = regional_bar_data(df, region, year, top_n)
+    if data is None:
+        names = NameIndex.from_frame(df)
+        if names.exact(region) is None:
+            # not a continent, country or code at all: most likely a typo
+            raise ValueError(f"Unknown region '{region}'.{names.did_you_mean(region, 'continent')}")
         return
 
     plt.figure(figsize=(12, 6))
-    plt.bar(region_df["Country Name"], values)
-    plt.xticks(rotation=90)
-    plt.xlabel("Country")
-    plt.ylabel("GDP")
-    plt.title(f"GDP by Country — {region} ({year})")
-    plt.tight_layout()
\ No newline at end of file
+    plot_regional_bar(plt.gca(), *data, region, year)
+    plt.tight_layout()
@@ -0,0 +1,57 @@
+import pandas as pd
+from typing import Tuple, List
+
+from countryHierarchy import leaf_mask
+from tracing import traced
+
+
+def _year_columns(df: pd.DataFrame) -> List[str]:
+    """Return sorted year columns as strings (e.g., '1960', '1961', ...)"""
+    return sorted(
+        [str(c) for c in df.columns if str(c).isdigit() and len(str(c)) == 4]
+    )
+
+
+# -----------------------------
+# Data slices (no plotting)
+# -----------------------------
+
+@traced("country_series_data")
+def country_series_data(df: pd.DataFrame, country: str) -> Tuple[List[int], List[float]]:
+    """Years and GDP values for one country"""
+    years = _year_columns(df)
+    row = df[df["Country Name"] == country]
+
+    if row.empty:
+        raise ValueError(f"Country '{country}' not found in data")
+
+    values = row[years].astype(float).iloc[0].tolist()
+    return [int(y) for y in years], values
+
+
+@traced("region_series_data")
+def region_series_data(df: pd.DataFrame, region: str, cube=None) -> Tuple[List[int], List[float]]:
+    """Years and summed GDP values for one region (leaf countries only)"""
+    if cube is not None and cube.has_region(region) and cube.covers(df):
+        # precomputed continent totals for every year
+        return [int(y) for y in cube.years], cube.region_series(region, "sum").tolist()
+
+    years = _year_columns(df)
+    grouped = df[(df["Continent"] == region) & leaf_mask(df)][years].sum()
+
+    if grouped.empty:
+        raise ValueError(f"Region '{region}' not found or has no data")
+
+    return [int(y) for y in years], grouped.astype(float).tolist()
+
+
+# -----------------------------
+# Drawing onto an Axes
+# -----------------------------
+
+def plot_line(ax, years: List[int], values: List[float], title: str) -> None:
+    ax.plot(years, values, marker="o")
+    ax.set_title(title)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("GDP")
+    ax.grid(alpha=0.3)
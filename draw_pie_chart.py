@@ -1,29 +1,83 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 from typing import Tuple, List
 
-def yearly_gdp_pie(df: pd.DataFrame,year: int)->None:
+from countryHierarchy import leaf_mask
+from rankIndex import top_n_with_other
+from tracing import traced
+
+# -----------------------------
+# Data slices (no plotting)
+# -----------------------------
+
+@traced("yearly_pie_data",rows=lambda data:len(data[1]))
+def yearly_pie_data(df: pd.DataFrame,year: int,cube=None)->Tuple[List[str], List[float]]:
     year=str(year)
 
-    gdp_by_region=df.groupby("Continent")[year].sum()
+    if cube is not None and cube.has_year(year) and cube.covers(df):
+        lable,values=cube.year_slice(year,"sum")
+        return list(lable),values.tolist()
+
+    # leaf countries only, aggregate rows would count their members twice
+    gdp_by_region=df[leaf_mask(df)].groupby("Continent")[year].sum()
 
     lable=gdp_by_region.index.tolist()
     values=gdp_by_region.values.tolist()
+    return lable,values
 
-    plt.figure(figsize=(7, 7))
-    plt.pie(values, labels=lable, autopct='%1.2f%%')
-    plt.title(f"GDP Distribution by Continent ({year})")
-    plt.show()
-
-def regional_gdp_pie(df: pd.DataFrame, region: str, year: int) -> None:
+@traced("regional_pie_data",rows=lambda data:len(data[1]))
+def regional_pie_data(df: pd.DataFrame, region: str, year: int, top_n: int | None=None, ranks=None) -> Tuple[List[str], List[float]]:
     year = str(year)
 
+    # top_n largest countries plus an "Other" slice, aggregate rows left out
+    if top_n and ranks is not None and year in ranks.year_index:
+        labels,values,rest=ranks.top_in_region(region,year,top_n)
+        if rest is not None:
+            labels,values=labels+["Other"],values+[rest]
+        return labels,values
+
     region_df=df[df["Continent"]==region]
 
+    if top_n:
+        leaves=leaf_mask(region_df)
+        return top_n_with_other(region_df["Country Name"][leaves].tolist(),region_df[year][leaves].tolist(),top_n)
+
     labels=region_df["Country Name"].tolist()
     values=region_df[year].tolist()
+    return labels,values
+
+# -----------------------------
+# Drawing onto an Axes
+# -----------------------------
+
+def plot_yearly_pie(ax, lable: List[str], values: List[float], year: int) -> None:
+    ax.pie(values, labels=lable, autopct='%1.2f%%')
+    ax.set_title(f"GDP Distribution by Continent ({year})")
+
+def plot_regional_pie(ax, labels: List[str], values: List[float], region: str, year: int) -> None:
+    ax.pie(values, labels=labels, autopct='%1.1f%%')
+    ax.set_title(f"GDP Distribution in {region} ({year})")
+
+# -----------------------------
+# pyplot entry points
+# -----------------------------
+# pyplot is imported on first use so that data-only callers never load it
+
+@traced("yearly_gdp_pie")
+def yearly_gdp_pie(df: pd.DataFrame,year: int,cube=None)->None:
+    import matplotlib.pyplot as plt
+
+    lable,values=yearly_pie_data(df,year,cube)
+
+    plt.figure(figsize=(7, 7))
+    plot_yearly_pie(plt.gca(),lable,values,year)
+    plt.show()
+
+@traced("regional_gdp_pie")
+def regional_gdp_pie(df: pd.DataFrame, region: str, year: int, top_n: int | None=None) -> None:
+    import matplotlib.pyplot as plt
+
+    labels,values=regional_pie_data(df,region,year,top_n)
 
     plt.figure(figsize=(7, 7))
-    plt.pie(values, labels=labels, autopct='%1.1f%%')
-    plt.title(f"GDP Distribution in {region} ({year})")
-    plt.show()
\ No newline at end of file
+    plot_regional_pie(plt.gca(),labels,values,region,year)
+    plt.show()
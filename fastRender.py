@@ -0,0 +1,427 @@
+import io
+import math
+import os
+from typing import Dict, Any, List, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from chart_jobs import CHART_KINDS
+from renderCache import format_of
+
+# Bulk chart rendering for jobs in the chart_jobs format. Two engines sit
+# next to chart_jobs.render_chart:
+#   "template" - one matplotlib Figure per chart kind, built once and updated
+#                in place for every job (one collection for all bars/wedges)
+#   "svg"      - writes SVG text directly, no matplotlib at all
+# Both use fixed margins instead of tight_layout/bbox_inches="tight", so a
+# render is a single draw pass.
+
+ENGINES = ("matplotlib", "template", "svg")
+
+AXIS_LABELS = {
+    "region_bar": ("Country", "GDP"),
+    "year_bar": ("Continent", "GDP"),
+    "region_line": ("Year", "GDP"),
+    "country_line": ("Year", "GDP"),
+}
+
+# Axes rectangle (left, bottom, width, height) as figure fractions; the
+# country bar leaves room for its rotated names
+AXES_RECT = {
+    "region_bar": (0.08, 0.32, 0.9, 0.6),
+    "year_bar": (0.1, 0.1, 0.86, 0.82),
+    "region_pie": (0.1, 0.08, 0.8, 0.82),
+    "year_pie": (0.1, 0.08, 0.8, 0.82),
+    "region_line": (0.1, 0.12, 0.86, 0.8),
+    "country_line": (0.1, 0.12, 0.86, 0.8),
+}
+
+# matplotlib's default colour cycle
+PALETTE = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+           "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
+
+BAR_WIDTH = 0.8
+# zlib level for template PNGs: ~10% faster saves for ~5% larger files than the default 6
+PNG_COMPRESS_LEVEL = 1
+WEDGE_STEPS = 48  # arc points per pie wedge
+
+
+def chart_title(job: Dict[str, Any]) -> str:
+    """The title the draw_* functions give a job's chart"""
+    kind, p = job["kind"], job["params"]
+    if kind == "region_bar":
+        return f"GDP by Country — {p['region']} ({p['year']})"
+    if kind == "year_bar":
+        return f"GDP by Continent in {p['year']}"
+    if kind == "region_pie":
+        return f"GDP Distribution in {p['region']} ({p['year']})"
+    if kind == "year_pie":
+        return f"GDP Distribution by Continent ({p['year']})"
+    if kind == "region_line":
+        return f"Regional GDP over time — {p['region']}"
+    if kind == "country_line":
+        return f"GDP over time — {p['country']}"
+    raise ValueError(f"Unknown chart kind: {kind}")
+
+
+def _pie_slices(labels: List[str], values: Any) -> Tuple[List[str], np.ndarray]:
+    """Labels and shares of the positive, finite slices"""
+    values = np.asarray(values, dtype=np.float64)
+    keep = np.isfinite(values) & (values > 0)
+    values = values[keep]
+    return [l for l, k in zip(labels, keep) if k], values / values.sum() if len(values) else values
+
+
+def _value_range(values: np.ndarray, include_zero: bool) -> Tuple[float, float]:
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return 0.0, 1.0
+    lo, hi = float(finite.min()), float(finite.max())
+    if include_zero:
+        lo, hi = min(lo, 0.0), max(hi, 0.0)
+    if lo == hi:
+        lo, hi = lo - 1.0, hi + 1.0
+    pad = (hi - lo) * 0.05
+    return (lo if include_zero and lo == 0 else lo - pad), (hi if include_zero and hi == 0 else hi + pad)
+
+
+def _bar_xlim(n: int) -> Tuple[float, float]:
+    """Bar positions 0..n-1 plus matplotlib's default 5% margin"""
+    lo, hi = -BAR_WIDTH / 2, n - 1 + BAR_WIDTH / 2
+    pad = (hi - lo) * 0.05
+    return lo - pad, hi + pad
+
+
+# -----------------------------
+# Reused matplotlib templates
+# -----------------------------
+
+class TemplateRenderer:
+    """Renders jobs by updating one pre-built matplotlib figure per chart kind.
+
+    Building a figure, its axes, ticks and per-bar Rectangle patches is most
+    of what chart_jobs.render_chart spends. Here each kind's figure is built
+    on first use and kept; a job only swaps the data of its artists (bar and
+    wedge polygons in one PolyCollection, a Line2D's points, the title text)
+    and saves. Not thread-safe: use one renderer per thread or process.
+    """
+
+    def __init__(self, dpi: int = 100):
+        self.dpi = dpi
+        self.templates: Dict[str, Dict[str, Any]] = {}
+
+    def render(self, job: Dict[str, Any], fmt: str = "png") -> bytes:
+        """PNG or SVG bytes for a job"""
+        template = self.templates.get(job["kind"])
+        if template is None:
+            template = self.templates[job["kind"]] = self._build(job["kind"])
+        template["title"].set_text(chart_title(job))
+        template["update"](template, job["data"])
+        buffer = io.BytesIO()
+        options = {"pil_kwargs": {"compress_level": PNG_COMPRESS_LEVEL}} if fmt == "png" else {}
+        template["figure"].savefig(buffer, format=fmt, dpi=self.dpi, **options)
+        return buffer.getvalue()
+
+    def _build(self, kind: str) -> Dict[str, Any]:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figsize, _ = CHART_KINDS[kind]
+        figure = Figure(figsize=figsize, dpi=self.dpi)
+        FigureCanvasAgg(figure)
+        ax = figure.add_axes(AXES_RECT[kind])
+        template = {"figure": figure, "axes": ax, "title": ax.set_title("")}
+        if kind.endswith("_bar"):
+            self._build_bar(template, kind)
+        elif kind.endswith("_pie"):
+            self._build_pie(template, kind)
+        else:
+            self._build_line(template, kind)
+        return template
+
+    def _build_bar(self, template: Dict[str, Any], kind: str) -> None:
+        from matplotlib.collections import PolyCollection
+
+        ax = template["axes"]
+        xlabel, ylabel = AXIS_LABELS[kind]
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        if kind == "region_bar":
+            ax.tick_params(axis="x", labelrotation=90)
+        template["bars"] = ax.add_collection(PolyCollection([], facecolors=PALETTE[0]))
+        template["update"] = self._update_bar
+
+    @staticmethod
+    def _update_bar(template: Dict[str, Any], data: Dict[str, Any]) -> None:
+        ax = template["axes"]
+        heights = np.asarray(data["values"], dtype=np.float64)
+        n = len(heights)
+        x = np.arange(n, dtype=np.float64)
+        # (n, 4, 2) rectangle corners; a missing value is an empty bar
+        top = np.nan_to_num(heights, nan=0.0)
+        left, right = x - BAR_WIDTH / 2, x + BAR_WIDTH / 2
+        verts = np.empty((n, 4, 2))
+        verts[:, :, 0] = np.stack([left, left, right, right], axis=1)
+        verts[:, 0, 1] = verts[:, 3, 1] = 0.0
+        verts[:, 1, 1] = verts[:, 2, 1] = top
+        template["bars"].set_verts(verts)
+        ax.set_xticks(x, labels=[str(l) for l in data["labels"]])
+        ax.set_xlim(*_bar_xlim(n))
+        ax.set_ylim(*_value_range(heights, include_zero=True))
+
+    def _build_pie(self, template: Dict[str, Any], kind: str) -> None:
+        from matplotlib.collections import PolyCollection
+
+        ax = template["axes"]
+        ax.set(frame_on=False, xticks=[], yticks=[], xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+        ax.set_aspect("equal")
+        template["wedges"] = ax.add_collection(PolyCollection([], edgecolors="none"))
+        template["texts"] = []  # (label, percentage) pairs, reused across jobs
+        template["pct_format"] = "%1.2f%%" if kind == "year_pie" else "%1.1f%%"
+        template["update"] = self._update_pie
+
+    @staticmethod
+    def _update_pie(template: Dict[str, Any], data: Dict[str, Any]) -> None:
+        ax = template["axes"]
+        labels, shares = _pie_slices(data["labels"], data["values"])
+        n = len(shares)
+        # counter-clockwise from 3 o'clock, as ax.pie draws them
+        bounds = 2 * np.pi * np.concatenate([[0.0], np.cumsum(shares)])
+        steps = np.linspace(0.0, 1.0, WEDGE_STEPS)
+        angles = bounds[:-1, None] + (bounds[1:] - bounds[:-1])[:, None] * steps
+        verts = np.zeros((n, WEDGE_STEPS + 1, 2))
+        verts[:, 1:, 0] = np.cos(angles)
+        verts[:, 1:, 1] = np.sin(angles)
+        template["wedges"].set_verts(verts)
+        template["wedges"].set_facecolors([PALETTE[i % len(PALETTE)] for i in range(n)])
+
+        texts = template["texts"]
+        while len(texts) < n:
+            texts.append((ax.text(0, 0, "", va="center"), ax.text(0, 0, "", ha="center", va="center")))
+        middle = (bounds[:-1] + bounds[1:]) / 2
+        for i, (label, pct) in enumerate(texts):
+            visible = i < n
+            label.set_visible(visible)
+            pct.set_visible(visible)
+            if not visible:
+                continue
+            x, y = math.cos(middle[i]), math.sin(middle[i])
+            label.set_text(str(labels[i]))
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment("left" if x > 0 else "right")
+            pct.set_text(template["pct_format"] % (100 * shares[i]))
+            pct.set_position((0.6 * x, 0.6 * y))
+
+    def _build_line(self, template: Dict[str, Any], kind: str) -> None:
+        ax = template["axes"]
+        xlabel, ylabel = AXIS_LABELS[kind]
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.grid(alpha=0.3)
+        template["line"], = ax.plot([], [], marker="o")
+        template["update"] = self._update_line
+
+    @staticmethod
+    def _update_line(template: Dict[str, Any], data: Dict[str, Any]) -> None:
+        ax = template["axes"]
+        years = np.asarray(data["years"], dtype=np.float64)
+        values = np.asarray(data["values"], dtype=np.float64)
+        template["line"].set_data(years, values)
+        ax.set_xlim(*_value_range(years, include_zero=False))
+        ax.set_ylim(*_value_range(values, include_zero=False))
+
+
+# -----------------------------
+# Direct SVG output
+# -----------------------------
+
+def _nice_ticks(lo: float, hi: float, count: int = 5) -> np.ndarray:
+    """Round tick positions (1, 2 or 5 times a power of ten apart) inside [lo, hi]"""
+    raw = (hi - lo) / count
+    power = 10.0 ** math.floor(math.log10(raw))
+    step = next(m * power for m in (1, 2, 5, 10) if m * power >= raw)
+    return np.arange(math.ceil(lo / step) * step, hi + step * 1e-9, step)
+
+
+def _short_number(value: float) -> str:
+    for scale, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= scale:
+            return f"{value / scale:g}{suffix}"
+    return f"{value:g}"
+
+
+class _SvgAxes:
+    """Maps data coordinates onto an axes rectangle of an SVG canvas"""
+
+    def __init__(self, kind: str, width: float, height: float, xlim: Tuple[float, float],
+                 ylim: Tuple[float, float]):
+        left, bottom, w, h = AXES_RECT[kind]
+        self.left, self.right = left * width, (left + w) * width
+        self.top, self.bottom = (1 - bottom - h) * height, (1 - bottom) * height
+        self.xlim, self.ylim = xlim, ylim
+
+    def x(self, values: Any) -> np.ndarray:
+        lo, hi = self.xlim
+        return self.left + (np.asarray(values, dtype=np.float64) - lo) / (hi - lo) * (self.right - self.left)
+
+    def y(self, values: Any) -> np.ndarray:
+        lo, hi = self.ylim
+        return self.bottom - (np.asarray(values, dtype=np.float64) - lo) / (hi - lo) * (self.bottom - self.top)
+
+
+def _text(x: float, y: float, text: Any, size: float = 10, anchor: str = "middle", extra: str = "") -> str:
+    return (f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" text-anchor="{anchor}"{extra}>'
+            f'{escape(str(text))}</text>')
+
+
+def _svg_frame(axes: _SvgAxes, kind: str, yticks: np.ndarray, grid: bool) -> List[str]:
+    """Axes box, y ticks with labels and the axis titles"""
+    parts = [f'<rect x="{axes.left:.1f}" y="{axes.top:.1f}" width="{axes.right - axes.left:.1f}" '
+             f'height="{axes.bottom - axes.top:.1f}" fill="none" stroke="black" stroke-width="0.8"/>']
+    for tick, y in zip(yticks, axes.y(yticks)):
+        if grid:
+            parts.append(f'<line x1="{axes.left:.1f}" y1="{y:.1f}" x2="{axes.right:.1f}" y2="{y:.1f}" '
+                         f'stroke="#b0b0b0" stroke-opacity="0.3"/>')
+        parts.append(f'<line x1="{axes.left - 3.5:.1f}" y1="{y:.1f}" x2="{axes.left:.1f}" y2="{y:.1f}" '
+                     f'stroke="black" stroke-width="0.8"/>')
+        parts.append(_text(axes.left - 6, y + 3.5, _short_number(tick), anchor="end"))
+    middle = (axes.top + axes.bottom) / 2
+    parts.append(_text(14, middle, AXIS_LABELS[kind][1], extra=f' transform="rotate(-90 14 {middle:.1f})"'))
+    return parts
+
+
+def _svg_bar(kind: str, data: Dict[str, Any], width: float, height: float) -> List[str]:
+    heights = np.nan_to_num(np.asarray(data["values"], dtype=np.float64), nan=0.0)
+    n = len(heights)
+    axes = _SvgAxes(kind, width, height, _bar_xlim(n), _value_range(heights, include_zero=True))
+    parts = _svg_frame(axes, kind, _nice_ticks(*axes.ylim), grid=False)
+
+    # every bar in one path
+    left = axes.x(np.arange(n) - BAR_WIDTH / 2)
+    bar_width = axes.x(BAR_WIDTH) - axes.x(0)
+    zero, top = axes.y(0.0), axes.y(heights)
+    d = "".join(f"M{x:.2f} {t:.2f}h{bar_width:.2f}V{zero:.2f}h{-bar_width:.2f}Z" for x, t in zip(left, top))
+    parts.append(f'<path d="{d}" fill="{PALETTE[0]}"/>')
+
+    centres = axes.x(np.arange(n))
+    for label, x in zip(data["labels"], centres):
+        if kind == "region_bar":
+            y = axes.bottom + 6
+            parts.append(_text(x + 3.5, y, label, anchor="end", extra=f' transform="rotate(-90 {x + 3.5:.1f} {y:.1f})"'))
+        else:
+            parts.append(_text(x, axes.bottom + 14, label))
+    label_y = height - 8 if kind == "region_bar" else axes.bottom + 30
+    parts.append(_text((axes.left + axes.right) / 2, label_y, AXIS_LABELS[kind][0]))
+    return parts
+
+
+def _svg_line(kind: str, data: Dict[str, Any], width: float, height: float) -> List[str]:
+    years = np.asarray(data["years"], dtype=np.float64)
+    values = np.asarray(data["values"], dtype=np.float64)
+    axes = _SvgAxes(kind, width, height, _value_range(years, include_zero=False),
+                    _value_range(values, include_zero=False))
+    parts = _svg_frame(axes, kind, _nice_ticks(*axes.ylim), grid=True)
+    xticks = _nice_ticks(*axes.xlim)
+    for tick, x in zip(xticks, axes.x(xticks)):
+        parts.append(f'<line x1="{x:.1f}" y1="{axes.top:.1f}" x2="{x:.1f}" y2="{axes.bottom:.1f}" '
+                     f'stroke="#b0b0b0" stroke-opacity="0.3"/>')
+        parts.append(_text(x, axes.bottom + 14, f"{tick:g}"))
+    parts.append(_text((axes.left + axes.right) / 2, axes.bottom + 30, AXIS_LABELS[kind][0]))
+
+    # missing years break the line, as in matplotlib
+    xs, ys = axes.x(years), axes.y(values)
+    d, pen_down = [], False
+    for x, y in zip(xs, ys):
+        if math.isnan(y):
+            pen_down = False
+            continue
+        d.append(f"{'L' if pen_down else 'M'}{x:.2f} {y:.2f}")
+        pen_down = True
+    parts.append(f'<path d="{"".join(d)}" fill="none" stroke="{PALETTE[0]}" stroke-width="1.5"/>')
+    parts.extend(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="3" fill="{PALETTE[0]}"/>'
+                 for x, y in zip(xs, ys) if not math.isnan(y))
+    return parts
+
+
+def _svg_pie(kind: str, data: Dict[str, Any], width: float, height: float) -> List[str]:
+    labels, shares = _pie_slices(data["labels"], data["values"])
+    left, bottom, w, h = AXES_RECT[kind]
+    cx, cy = (left + w / 2) * width, (1 - bottom - h / 2) * height
+    r = min(w * width, h * height) / 2 / 1.25
+    pct_format = "%1.2f%%" if kind == "year_pie" else "%1.1f%%"
+    bounds = 2 * np.pi * np.concatenate([[0.0], np.cumsum(shares)])
+
+    parts = []
+    for i, share in enumerate(shares):
+        colour = PALETTE[i % len(PALETTE)]
+        start, end = bounds[i], bounds[i + 1]
+        if share >= 1.0:
+            parts.append(f'<circle cx="{cx:.2f}" cy="{cy:.2f}" r="{r:.2f}" fill="{colour}"/>')
+        else:
+            # SVG y grows downwards, so counter-clockwise is sweep flag 0
+            x0, y0 = cx + r * math.cos(start), cy - r * math.sin(start)
+            x1, y1 = cx + r * math.cos(end), cy - r * math.sin(end)
+            large = 1 if end - start > math.pi else 0
+            parts.append(f'<path d="M{cx:.2f} {cy:.2f}L{x0:.2f} {y0:.2f}A{r:.2f} {r:.2f} 0 {large} 0 '
+                         f'{x1:.2f} {y1:.2f}Z" fill="{colour}"/>')
+        middle = (start + end) / 2
+        x, y = math.cos(middle), math.sin(middle)
+        parts.append(_text(cx + 1.1 * r * x, cy - 1.1 * r * y + 3.5, labels[i], anchor="start" if x > 0 else "end"))
+        parts.append(_text(cx + 0.6 * r * x, cy - 0.6 * r * y + 3.5, pct_format % (100 * share)))
+    return parts
+
+
+def svg_chart(job: Dict[str, Any]) -> bytes:
+    """SVG for a bar, pie or line job, written without matplotlib"""
+    kind = job["kind"]
+    figsize, _ = CHART_KINDS[kind]
+    width, height = figsize[0] * 72.0, figsize[1] * 72.0  # points, as matplotlib's SVG backend
+    if kind.endswith("_bar"):
+        body = _svg_bar(kind, job["data"], width, height)
+    elif kind.endswith("_pie"):
+        body = _svg_pie(kind, job["data"], width, height)
+    else:
+        body = _svg_line(kind, job["data"], width, height)
+    title_y = (1 - AXES_RECT[kind][1] - AXES_RECT[kind][3]) * height - 8
+    svg = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}pt" height="{height:g}pt" '
+           f'viewBox="0 0 {width:g} {height:g}" font-family="DejaVu Sans, sans-serif">',
+           f'<rect width="{width:g}" height="{height:g}" fill="white"/>',
+           _text(width / 2, title_y, chart_title(job), size=12)]
+    svg.extend(body)
+    svg.append('</svg>\n')
+    return "\n".join(svg).encode("utf-8")
+
+
+# -----------------------------
+# Engine dispatch
+# -----------------------------
+
+_renderer: TemplateRenderer | None = None
+
+
+def render_bytes(job: Dict[str, Any], fmt: str = "png", engine: str = "template") -> bytes:
+    """Render a job with one of ENGINES; the template renderer is kept per process"""
+    global _renderer
+    if engine == "svg":
+        if fmt != "svg":
+            raise ValueError("The svg engine only writes SVG output")
+        return svg_chart(job)
+    if engine == "template":
+        if _renderer is None:
+            _renderer = TemplateRenderer()
+        return _renderer.render(job, fmt)
+    if engine == "matplotlib":
+        import chart_jobs
+        return chart_jobs.render_chart_bytes(job, fmt)
+    raise ValueError(f"Unknown render engine: {engine} (expected one of {', '.join(ENGINES)})")
+
+
+def render_chart(job: Dict[str, Any], engine: str = "template") -> str:
+    """Render one job to job["out_path"] and return the path"""
+    payload = render_bytes(job, format_of(job["out_path"]), engine)
+    tmp_path = job["out_path"] + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, job["out_path"])
+    return job["out_path"]
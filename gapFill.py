@@ -0,0 +1,90 @@
+import numpy as np
+from typing import Any, Tuple
+
+# Gap filling over a countries x years float block (rows are countries,
+# columns consecutive years, NaN where nothing was reported). Every method
+# works on all rows at once and returns (filled copy, imputed mask), where
+# the mask is True exactly for the cells the method filled in.
+
+METHODS = ('linear', 'ffill', 'carry_forward')
+
+
+def previous_observed(observed: np.ndarray) -> np.ndarray:
+    """Column of the last observation at or before each cell, -1 if none"""
+    columns = np.arange(observed.shape[1], dtype=np.int32)
+    previous = np.where(observed, columns, np.int32(-1))
+    np.maximum.accumulate(previous, axis=1, out=previous)
+    return previous
+
+
+def next_observed(observed: np.ndarray) -> np.ndarray:
+    """Column of the first observation at or after each cell, n_years if none"""
+    n = observed.shape[1]
+    columns = np.arange(n, dtype=np.int32)
+    following = np.where(observed, columns, np.int32(n))[:, ::-1]
+    return np.minimum.accumulate(following, axis=1)[:, ::-1]
+
+
+def interpolate_linear(values: Any, limit: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Straight-line fill of interior gaps (leading and trailing gaps stay NaN).
+
+    With limit, only gaps of at most limit missing years are filled.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    observed = ~np.isnan(values)
+    previous = previous_observed(observed)
+    following = next_observed(observed)
+    imputed = ~observed & (previous >= 0) & (following < values.shape[1])
+    if limit is not None:
+        imputed &= (following - previous - 1) <= limit
+
+    filled = values.copy()
+    rows, cols = np.nonzero(imputed)
+    before, after = previous[rows, cols], following[rows, cols]
+    start, end = values[rows, before], values[rows, after]
+    filled[rows, cols] = start + (end - start) * (cols - before) / (after - before)
+    return filled, imputed
+
+
+def forward_fill(values: Any, limit: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Repeat the last observation into the following missing years, at most limit of them"""
+    values = np.asarray(values, dtype=np.float64)
+    observed = ~np.isnan(values)
+    previous = previous_observed(observed)
+    imputed = ~observed & (previous >= 0)
+    if limit is not None:
+        imputed &= (np.arange(values.shape[1]) - previous) <= limit
+
+    filled = values.copy()
+    rows, cols = np.nonzero(imputed)
+    filled[rows, cols] = values[rows, previous[rows, cols]]
+    return filled, imputed
+
+
+def carry_forward(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Carry each row's latest observation to the end of the series only.
+
+    Interior gaps stay NaN; the mask tells the carried "latest available"
+    values apart from reported ones.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    observed = ~np.isnan(values)
+    previous = previous_observed(observed)
+    last = previous[:, -1:]
+    imputed = ~observed & (last >= 0) & (np.arange(values.shape[1]) > last)
+
+    filled = values.copy()
+    rows, cols = np.nonzero(imputed)
+    filled[rows, cols] = values[rows, last[rows, 0]]
+    return filled, imputed
+
+
+def fill_gaps(values: Any, method: str = 'linear', limit: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(filled, imputed) for one of METHODS"""
+    if method == 'linear':
+        return interpolate_linear(values, limit)
+    if method == 'ffill':
+        return forward_fill(values, limit)
+    if method == 'carry_forward':
+        return carry_forward(values)
+    raise ValueError(f"Unknown gap fill method: {method} (expected one of {', '.join(METHODS)})")
@@ -0,0 +1,396 @@
+import argparse
+import json
+import sys
+from typing import Dict, Any, List
+
+import numpy as np
+
+# Only light modules are imported here. The stats command answers from the
+# memory-mapped matrix store with numpy alone; pandas and matplotlib are
+# imported inside the commands that need them.
+from countryHierarchy import is_aggregate
+from matrixStore import MatrixStore
+from nameIndex import NameIndex
+from rankIndex import RankIndex, RANK_SUFFIX
+from sourceFingerprint import file_fingerprint
+from statsEngine import compute_statistics, expand_operations
+import timeSeries
+
+DEFAULT_DATA = "gdp_cleaned_fixed.csv"
+
+# chart kind -> config["charts"] entry understood by dashboard.chart_jobs_from_config
+CHART_CONFIG = {
+    "region_bar": {"region_chart": "bar"},
+    "region_pie": {"region_chart": "pie"},
+    "region_line": {"region_chart": "line"},
+    "year_bar": {"year_chart": "bar"},
+    "year_pie": {"year_chart": "pie"},
+    "country_line": {"country_chart": "line"},
+}
+
+
+def _names(value: Any) -> List[str]:
+    if not value:
+        return []
+    names = [value] if isinstance(value, str) else list(value)
+    return [n for n in names if str(n).strip() and str(n).strip().casefold() != "all"]
+
+
+def check_names(names: NameIndex, regions: List[str], countries: List[str]) -> None:
+    """Raise ValueError, with close matches, for the first unknown region or country"""
+    for kind, label, wanted in (("continent", "Region", regions), ("country", "Country", countries)):
+        for name in wanted:
+            if names.exact(name, kind) is None:
+                raise ValueError(f"{label} '{name}' not found.{names.did_you_mean(name, kind)}")
+
+
+def check_store_names(store: MatrixStore, regions: List[str], countries: List[str]) -> None:
+    """check_names against a matrix store; the name index is only built on a miss"""
+    key = lambda name: str(name).strip().casefold()
+    continents = {key(name) for name in store.continents}
+    missing = any(key(r) not in continents for r in regions)
+    if countries and not missing:
+        known = {key(name) for name in store.names}
+        missing = any(key(c) not in known for c in countries)
+    if missing:
+        check_names(NameIndex.from_names({"country": store.names, "continent": store.continents}),
+                    regions, countries)
+
+
+def _check_year(available: List[str], year: Any) -> None:
+    if year is not None and str(year) not in available:
+        raise KeyError(f"Year {year} not present in dataset columns")
+
+
+def open_store(data_file: str) -> MatrixStore | None:
+    """The matrix store for data_file, building it (with pandas) only if stale"""
+    store = MatrixStore.open(data_file, source_file=data_file)
+    if store is None:
+        from dataLoader import DataLoader
+        store = DataLoader().load_matrix(data_file)
+    return store
+
+
+def open_ranks(data_file: str) -> RankIndex | None:
+    """The saved rank index for data_file, rebuilt from the matrix store if stale"""
+    ranks = RankIndex.load(data_file + RANK_SUFFIX, source_file=data_file)
+    if ranks is None:
+        store = open_store(data_file)
+        if store is None:
+            return None
+        ranks = RankIndex.from_store(store)
+        ranks.save(data_file + RANK_SUFFIX, file_fingerprint(data_file))
+    return ranks
+
+
+def query_stats(store: MatrixStore, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """process_data-shaped result for one config, computed from the store"""
+    year = cfg.get("year")
+    operation = cfg.get("operation", "average")
+    extra = expand_operations(cfg.get("operations"))
+    if str(year) not in store.year_index:
+        raise KeyError(f"Year {year} not present in dataset columns")
+
+    countries = _names(cfg.get("country"))
+    positions = store.select(_names(cfg.get("region")), countries)
+    if not countries:
+        # like process_data: aggregate rows only count when named
+        positions = positions[~is_aggregate(store.codes[positions])]
+    results = compute_statistics(store.year_column(year)[positions], [operation, *extra, "count"])
+
+    region = cfg.get("region", "All")
+    country = cfg.get("country", "All")
+    if len(positions):
+        if region == "All":
+            region = store.continent_labels()[positions[0]] if len(positions) == 1 else "Multiple"
+        if country == "All":
+            country = str(store.names[positions[0]]) if len(positions) == 1 else "Multiple"
+
+    stats = {
+        "operation": operation,
+        "year": year,
+        "region": region,
+        "country": country,
+        "result": results[operation],
+        "data_points": int(results["count"]),
+    }
+    if extra:
+        stats["results"] = {op: results[op] for op in dict.fromkeys([operation, *extra])}
+    return stats
+
+
+def query_series(store: MatrixStore, metric: str, regions: List[str], countries: List[str],
+                 start: int | None = None, end: int | None = None, window: int = 5) -> Dict[str, Any]:
+    """A time-series metric for every selected country, computed in one pass"""
+    names, years, block = timeSeries.series_block(store, regions, countries, start, end)
+    if metric == "cagr":
+        rates = timeSeries.cagr(block, years, years[0], years[-1])
+        return {"metric": metric, "start": years[0], "end": years[-1],
+                "series": {str(n): _json_number(r) for n, r in zip(names, rates)}}
+
+    compute = {
+        "yoy": timeSeries.yoy_growth,
+        "rolling_mean": lambda v: timeSeries.rolling_mean(v, window),
+        "volatility": lambda v: timeSeries.volatility(v, window),
+        "cumsum": timeSeries.nan_cumsum,
+    }[metric]
+    result = compute(block)
+    return {"metric": metric, "years": years,
+            "series": {str(n): [_json_number(v) for v in row] for n, row in zip(names, result)}}
+
+
+def _json_number(value: float) -> float | None:
+    return None if value != value else float(value)
+
+
+# -----------------------------
+# Commands
+# -----------------------------
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    cfg = {"year": args.year, "operation": args.operation, "region": args.region or "All",
+           "country": args.country or "All"}
+    if args.operations:
+        cfg["operations"] = args.operations.split(",")
+
+    store = open_store(args.data)
+    if store is None:
+        print(f"Error: data file '{args.data}' not found or empty", file=sys.stderr)
+        return 1
+    check_store_names(store, _names(args.region), _names(args.country))
+    print(json.dumps(query_stats(store, cfg)))
+    return 0
+
+
+def cmd_series(args: argparse.Namespace) -> int:
+    store = open_store(args.data)
+    if store is None:
+        print(f"Error: data file '{args.data}' not found or empty", file=sys.stderr)
+        return 1
+    check_store_names(store, _names(args.region), _names(args.country))
+    for year in (args.start, args.end):
+        _check_year(store.years, year)
+    print(json.dumps(query_series(store, args.metric, _names(args.region), _names(args.country),
+                                  args.start, args.end, args.window)))
+    return 0
+
+
+def cmd_rank(args: argparse.Namespace) -> int:
+    ranks = open_ranks(args.data)
+    if ranks is None:
+        print(f"Error: data file '{args.data}' not found or empty", file=sys.stderr)
+        return 1
+    if args.country:
+        if ranks.name_index.get(args.country.strip().casefold()) is None:
+            check_names(NameIndex.from_names({"country": ranks.names}), [], [args.country])
+        if args.year is None:
+            result = {"country": args.country, "ranks": ranks.rank_history(args.country)}
+        else:
+            result = {"country": args.country, "year": args.year,
+                      "rank": ranks.rank_of(args.country, args.year)}
+    elif args.year is None:
+        print("Error: --year is required without --country", file=sys.stderr)
+        return 1
+    elif args.bottom:
+        result = {"year": args.year, "bottom": ranks.bottom(args.year, args.bottom)}
+    else:
+        result = {"year": args.year, "top": ranks.top(args.year, args.top)}
+    print(json.dumps(result))
+    return 0
+
+
+def cmd_chart(args: argparse.Namespace) -> int:
+    if args.kind == "country_line" and not _names(args.country):
+        print("Error: country_line needs --country", file=sys.stderr)
+        return 1
+    if args.kind.startswith("region_") and not _names(args.region):
+        print(f"Error: {args.kind} needs --region", file=sys.stderr)
+        return 1
+
+    import os
+    import chart_jobs
+    from dashboard import chart_jobs_from_config, render_cache_from_config
+    from dataLoader import DataLoader
+
+    loader = DataLoader()
+    df = loader.load_cleaned(args.data)
+    if df.empty:
+        print(f"Error: data file '{args.data}' not found or empty", file=sys.stderr)
+        return 1
+    _check_year([str(c) for c in df.columns], args.year)
+    check_names(loader.names_for(df), _names(args.region), _names(args.country))
+    cube = loader.load_cube(args.data, df)
+
+    cfg = {"year": args.year, "region": args.region, "country": args.country,
+           "charts": CHART_CONFIG[args.kind], "render_cache": args.render_cache}
+    out_dir = os.path.dirname(args.out) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = chart_jobs_from_config(df, cfg, cube=cube, save_dir=out_dir)
+    for job in jobs:
+        job["out_path"] = args.out
+    saved = chart_jobs.render_jobs(jobs, workers=1, cache=render_cache_from_config(cfg))
+    if not saved:
+        print(f"Error: no {args.kind} chart was drawn", file=sys.stderr)
+        return 1
+    print(json.dumps({"saved": saved}))
+    return 0
+
+
+def _year_range(spec: str | None, available: List[str]) -> List[str]:
+    """"1990-2000", "1990,2000" or None (every year) as available year columns"""
+    if not spec:
+        return list(available)
+    if "-" in spec:
+        first, last = (int(part) for part in spec.split("-", 1))
+        return [y for y in available if first <= int(y) <= last]
+    wanted = {s.strip() for s in spec.split(",")}
+    return [y for y in available if y in wanted]
+
+
+# derived matrices export-results --matrix can write
+MATRICES = ("yoy", "rolling_mean", "volatility", "cumsum", "rollup")
+
+
+def cmd_export_results(args: argparse.Namespace) -> int:
+    import resultExport
+    from statsEngine import OPERATIONS
+
+    try:
+        if args.matrix:
+            store = open_store(args.data)
+            if store is None:
+                print(f"Error: data file '{args.data}' not found or empty", file=sys.stderr)
+                return 1
+            years = _year_range(args.years, store.years)
+            if not years:
+                print(f"Error: no years in the data match '{args.years}'", file=sys.stderr)
+                return 1
+            j0, j1 = store.year_index[years[0]], store.year_index[years[-1]] + 1
+            if args.matrix == "rollup":
+                from countryHierarchy import Rollup
+                rollup = Rollup.from_store(store)
+                names = rollup.hierarchy.continents + ["World"]
+                block = np.vstack([rollup.continent_totals(), rollup.world()])[:, j0:j1]
+            else:
+                names = store.names
+                block = {"yoy": timeSeries.yoy_growth, "cumsum": timeSeries.nan_cumsum,
+                         "rolling_mean": lambda v: timeSeries.rolling_mean(v, args.window),
+                         "volatility": lambda v: timeSeries.volatility(v, args.window)}[args.matrix](
+                    store.values[:, j0:j1])
+            rows = resultExport.export_matrix(args.out, names, years, block, value_name=args.matrix,
+                                              fmt=args.format, batch_rows=args.batch_rows)
+        else:
+            from dataLoader import DataLoader
+            from dataProcessor import DataProcessor
+
+            loader = DataLoader()
+            df = loader.load_cleaned(args.data)
+            if df.empty:
+                print(f"Error: data file '{args.data}' not found or empty", file=sys.stderr)
+                return 1
+            years = _year_range(args.years, [str(c) for c in df.columns if str(c).isdigit() and len(str(c)) == 4])
+            if not years:
+                print(f"Error: no years in the data match '{args.years}'", file=sys.stderr)
+                return 1
+            if args.regions:
+                names = loader.load_name_index(args.data, df)
+                regions = []
+                for region in _names(args.regions.split(",")):
+                    if names.exact(region, "continent") is None:
+                        print(f"Error: region '{region}' not found.{names.did_you_mean(region, 'continent')}",
+                              file=sys.stderr)
+                        return 1
+                    regions.append(names.exact(region, "continent"))
+            else:
+                # continents with countries in them; "Global" only holds aggregate rows
+                regions = sorted(df.loc[loader.leaves_for(df), "Continent"].dropna().unique().tolist())
+            operations = list(OPERATIONS) if args.operations == "all" else args.operations.split(",")
+            operations = [op for op in operations if op != "weighted_mean"]
+            records = resultExport.grid_result_rows(DataProcessor(), df, years, ["All", *regions], operations,
+                                                    loader=loader)
+            rows = resultExport.export_records(records, args.out, fmt=args.format, batch_rows=args.batch_rows)
+    except (ImportError, ValueError, KeyError) as e:
+        print(f"Error: {e.args[0] if e.args else e}", file=sys.stderr)
+        return 1
+    print(json.dumps({"saved": args.out, "rows": rows}))
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    import bulk_export
+    argv = [args.grid] + (["--workers", str(args.workers)] if args.workers else [])
+    bulk_export.main(argv + (["--engine", args.engine] if args.engine else []))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="GDP analyzer command line")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="cleaned GDP CSV")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats = sub.add_parser("stats", help="statistics only (no plotting imports)")
+    stats.add_argument("--year", required=True, type=int)
+    stats.add_argument("--operation", default="average")
+    stats.add_argument("--operations", help="comma-separated extra operations, or 'all'")
+    stats.add_argument("--region")
+    stats.add_argument("--country")
+    stats.set_defaults(func=cmd_stats)
+
+    series = sub.add_parser("series", help="growth, CAGR, rolling and cumulative series")
+    series.add_argument("metric", choices=timeSeries.METRICS)
+    series.add_argument("--region")
+    series.add_argument("--country")
+    series.add_argument("--start", type=int, help="first year (default: first in data)")
+    series.add_argument("--end", type=int, help="last year (default: last in data)")
+    series.add_argument("--window", type=int, default=5, help="rolling window in years")
+    series.set_defaults(func=cmd_series)
+
+    rank = sub.add_parser("rank", help="top/bottom economies or a country's rank")
+    rank.add_argument("--year", type=int)
+    rank.add_argument("--top", type=int, default=10)
+    rank.add_argument("--bottom", type=int)
+    rank.add_argument("--country", help="rank in --year, or in every year without it")
+    rank.set_defaults(func=cmd_rank)
+
+    chart = sub.add_parser("chart", help="render one chart")
+    chart.add_argument("kind", choices=sorted(CHART_CONFIG))
+    chart.add_argument("--year", required=True, type=int)
+    chart.add_argument("--region")
+    chart.add_argument("--country")
+    chart.add_argument("--out", required=True, help="output .png or .svg")
+    chart.add_argument("--render-cache", action="store_true", help="reuse cached images")
+    chart.set_defaults(func=cmd_chart)
+
+    export = sub.add_parser("export", help="bulk chart export over a grid spec")
+    export.add_argument("grid", help="JSON grid specification")
+    export.add_argument("--workers", type=int)
+    export.add_argument("--engine", choices=("matplotlib", "template", "svg"),
+                        help="renderer: matplotlib (default), template (reused figures) or svg (direct SVG)")
+    export.set_defaults(func=cmd_export)
+
+    results = sub.add_parser("export-results", help="stream the results table to Parquet/Arrow/JSON Lines")
+    results.add_argument("--out", required=True, help=".parquet, .arrow or .jsonl file")
+    results.add_argument("--format", choices=("parquet", "arrow", "jsonl"), help="default: from --out")
+    results.add_argument("--years", help="'1990-2000' or '1990,2000' (default: every year)")
+    results.add_argument("--regions", help="comma-separated continents (default: every continent with "
+                                           "countries, plus 'All')")
+    results.add_argument("--operations", default="all", help="comma-separated operations, or 'all'")
+    results.add_argument("--matrix", choices=MATRICES, help="write this derived matrix instead")
+    results.add_argument("--window", type=int, default=5, help="rolling window in years (--matrix)")
+    results.add_argument("--batch-rows", type=int, default=65536, help="rows per record batch")
+    results.set_defaults(func=cmd_export_results)
+
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e.args[0] if e.args else e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import chart_jobs
+from configLoader import config_key
+from dashboard import chart_jobs_from_config
+from dataLoader import DataLoader
+from dataProcessor import DataProcessor
+from gdp_cli import CHART_CONFIG
+from lruCache import LRUCache
+
+DEFAULT_PORT = 8765
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+class GDPServer:
+    """Keeps one cleaned dataset, its cube and its name index in memory and
+    answers stats and chart requests over HTTP.
+
+    Responses are cached in LRU caches keyed on (dataset fingerprint,
+    normalised config), so a repeated query is served straight from memory.
+    Cache misses never run on the event loop: statistics are computed on a
+    single worker thread (which also keeps the loader's and processor's
+    caches single-threaded) and charts are rendered in a process pool, so
+    one large query does not hold up other connections. Cache entries are
+    sized by their encoded response, so cache_bytes/chart_cache_bytes bound
+    the memory the caches hold.
+
+        GET  /health                  dataset fingerprint and row count
+        GET  /cache                   stats and chart cache counters
+        GET  /stats?year=2020&...     one config from the query string
+        POST /stats                   a config object or a list of configs
+        GET  /chart?kind=year_bar&... one chart image (format=png|svg)
+        POST /chart                   the same as a JSON object
+    """
+
+    def __init__(self, data_file: str, cache_size: int = 1024, chart_cache_size: int = 256,
+                 render_workers: int | None = None, cache_bytes: int | None = None,
+                 chart_cache_bytes: int | None = None):
+        self.data_file = data_file
+        self.loader = DataLoader()
+        self.processor = DataProcessor()
+        self.stats_cache = LRUCache(cache_size, cache_bytes)
+        self.chart_cache = LRUCache(chart_cache_size, chart_cache_bytes)
+        self.render_workers = render_workers
+        self.pool = None
+        self.stats_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gdp-stats")
+        self.df = None
+        self.cube = None
+        self.fingerprint = None
+        # chart key -> future of a render already in flight
+        self._rendering: Dict[Any, asyncio.Future] = {}
+
+    def load(self) -> None:
+        """Load, clean and index the dataset once"""
+        df = self.loader.load_cleaned(self.data_file)
+        if df.empty:
+            raise SystemExit(f"Data file '{self.data_file}' not found or empty")
+        self.cube = self.loader.load_cube(self.data_file, df)
+        self.loader.index_for(df)
+        self.df = df
+        self.fingerprint = self.loader.fingerprint
+        self.stats_cache.clear()
+        self.chart_cache.clear()
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+
+    async def stats(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """process_data result for the rows the config's region/country select"""
+        if str(config.get("year")) not in self.df.columns:
+            raise KeyError(f"Year {config.get('year')} not present in dataset columns")
+        key = (self.fingerprint, config_key(config))
+        result = self.stats_cache.get(key)
+        if result is None:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.stats_pool, self._process, config)
+            self.stats_cache.put(key, result, len(json.dumps(result).encode()))
+        return result
+
+    def _process(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return next(self.processor.process_batch(self.df, [config], loader=self.loader))
+
+    async def chart(self, request: Dict[str, Any]) -> Tuple[bytes, str]:
+        """Rendered chart bytes and format for {"kind", "year", "region", "country", "format"}"""
+        kind = request.get("kind")
+        if kind not in CHART_CONFIG:
+            raise ValueError(f"Unknown chart kind: {kind}")
+        fmt = request.get("format", "png")
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Unknown format: {fmt}")
+
+        key = (self.fingerprint, kind, fmt, config_key(request), request.get("top_n"))
+        payload = self.chart_cache.get(key)
+        if payload is not None:
+            return payload, fmt
+        if key in self._rendering:
+            return await asyncio.shield(self._rendering[key]), fmt
+
+        cfg = {"year": request.get("year"), "region": request.get("region"),
+               "country": request.get("country"), "charts": CHART_CONFIG[kind]}
+        if request.get("top_n"):
+            cfg["top_n"] = int(request["top_n"])
+        jobs = chart_jobs_from_config(self.df, cfg, cube=self.cube)
+        if not jobs:
+            raise KeyError(f"No data for {kind} chart")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._render_pool(), chart_jobs.render_chart_bytes, jobs[0], fmt)
+        self._rendering[key] = future
+        try:
+            payload = await future
+        finally:
+            del self._rendering[key]
+        self.chart_cache.put(key, payload, len(payload))
+        return payload, fmt
+
+    def _render_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.render_workers)
+        return self.pool
+
+    # -----------------------------
+    # HTTP
+    # -----------------------------
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, str, bytes]:
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        try:
+            if url.path == "/health" and method == "GET":
+                return _json(200, {"status": "ok", "fingerprint": self.fingerprint, "rows": len(self.df)})
+            if url.path == "/cache" and method == "GET":
+                return _json(200, {"stats": self.stats_cache.stats(), "charts": self.chart_cache.stats()})
+            if url.path == "/stats":
+                if method == "GET":
+                    if "operations" in query:
+                        query["operations"] = query["operations"].split(",")
+                    return _json(200, await self.stats(query))
+                if method == "POST":
+                    config = json.loads(body or b"{}")
+                    if isinstance(config, list):
+                        return _json(200, [await self.stats(c) for c in config])
+                    return _json(200, await self.stats(config))
+                return _json(405, {"error": f"{method} not allowed"})
+            if url.path == "/chart":
+                if method not in ("GET", "POST"):
+                    return _json(405, {"error": f"{method} not allowed"})
+                request = query if method == "GET" else json.loads(body or b"{}")
+                payload, fmt = await self.chart(request)
+                return 200, CONTENT_TYPES[fmt], payload
+            return _json(404, {"error": f"No route for {url.path}"})
+        except (ValueError, TypeError) as e:
+            return _json(400, {"error": str(e)})
+        except KeyError as e:
+            return _json(404, {"error": str(e.args[0]) if e.args else "not found"})
+        except Exception as e:
+            return _json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, content_type, payload = await self.dispatch(method.upper(), target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                    unix_path: str | None = None) -> asyncio.AbstractServer:
+        if self.df is None:
+            self.load()
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self) -> None:
+        self.stats_pool.shutdown(cancel_futures=True)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+
+def _json(status: int, payload: Any) -> Tuple[int, str, bytes]:
+    return status, "application/json", json.dumps(payload).encode()
+
+
+def _mb(megabytes: float | None) -> int | None:
+    return None if megabytes is None else int(megabytes * 1024 * 1024)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = GDPServer(args.data, cache_size=args.cache_size, render_workers=args.workers,
+                       cache_bytes=_mb(args.cache_mb), chart_cache_bytes=_mb(args.chart_cache_mb))
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"http://{args.host}:{listener.sockets[0].getsockname()[1]}"
+    print(f"Serving {args.data} ({len(server.df)} rows) on {where}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve GDP stats and charts from a resident dataset")
+    parser.add_argument("--data", default="gdp_cleaned_fixed.csv", help="cleaned GDP CSV")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on a Unix socket path instead of TCP")
+    parser.add_argument("--cache-size", type=int, default=1024, help="cached stats results")
+    parser.add_argument("--cache-mb", type=float, help="memory bound for cached stats results")
+    parser.add_argument("--chart-cache-mb", type=float, help="memory bound for cached chart images")
+    parser.add_argument("--workers", type=int, help="chart render processes")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
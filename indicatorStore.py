@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import Dict, Any, List, Tuple
+
+from tracing import traced
+
+
+def _is_year(col: Any) -> bool:
+    return str(col).strip().isdigit() and len(str(col).strip()) == 4
+
+
+def _load_file(filepath: str) -> List[Dict[str, Any]]:
+    """One cleaned file as one block per Indicator Code it contains (runs in a worker)"""
+    from dataLoader import DataLoader  # workers import pandas on their own
+
+    df = DataLoader().load_cleaned(filepath)
+    if df.empty:
+        return []
+    years = sorted(str(c) for c in df.columns if _is_year(c))
+    df = df.rename(columns={c: str(c).strip() for c in df.columns})
+    if 'Indicator Code' in df.columns:
+        groups = df.groupby('Indicator Code', sort=False)
+    else:
+        groups = [(os.path.basename(filepath), df)]
+
+    blocks = []
+    for code, rows in groups:
+        labels = rows['Continent'].to_numpy(dtype=object) if 'Continent' in rows.columns \
+            else np.full(len(rows), None, dtype=object)
+        blocks.append({
+            "code": str(code),
+            "name": str(rows['Indicator Name'].iloc[0]) if 'Indicator Name' in rows.columns else str(code),
+            "years": years,
+            "country_codes": rows['Country Code'].astype(str).str.strip().to_numpy(dtype=str),
+            "names": rows['Country Name'].astype(str).to_numpy(dtype=str),
+            "continents": [label if isinstance(label, str) else None for label in labels],
+            "values": rows[years].to_numpy(dtype=np.float64, na_value=np.nan),
+        })
+    return blocks
+
+
+class IndicatorStore:
+    """Indicator x country x year float array over one shared country/year index.
+
+    Each source file keeps its own row order; loading scatters every
+    indicator into the rows of the shared index (keyed on Country Code), so
+    indicators are aligned by position and cross-indicator arithmetic is
+    plain array arithmetic. Cells a file does not have are NaN.
+    """
+
+    def __init__(self, values: np.ndarray, indicators: List[str], indicator_names: List[str],
+                 years: List[str], codes: np.ndarray, names: np.ndarray,
+                 continent_codes: np.ndarray, continents: List[str]):
+        self.values = values
+        self.indicators = list(indicators)
+        self.indicator_names = list(indicator_names)
+        self.years = list(years)
+        self.codes = codes
+        self.names = names
+        self.continent_codes = continent_codes
+        self.continents = list(continents)
+        self.indicator_index = {code: i for i, code in enumerate(self.indicators)}
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+        self.country_index = {code: i for i, code in enumerate(self.codes)}
+
+    @classmethod
+    def from_blocks(cls, blocks: List[Dict[str, Any]]) -> "IndicatorStore":
+        """Align per-indicator blocks (as _load_file returns them) on one index"""
+        years = sorted({year for block in blocks for year in block["years"]})
+        year_index = {year: j for j, year in enumerate(years)}
+
+        # shared country index, in order of first appearance; names and
+        # continents come from the first file that has the country
+        country_index: Dict[str, int] = {}
+        names: List[str] = []
+        labels: List[str | None] = []
+        for block in blocks:
+            for code, name, label in zip(block["country_codes"], block["names"], block["continents"]):
+                if code not in country_index:
+                    country_index[code] = len(names)
+                    names.append(name)
+                    labels.append(label)
+                elif labels[country_index[code]] is None and label is not None:
+                    labels[country_index[code]] = label
+
+        indicators: List[str] = []
+        indicator_names: List[str] = []
+        for block in blocks:
+            if block["code"] in indicators:
+                raise ValueError(f"Indicator {block['code']} is loaded twice")
+            indicators.append(block["code"])
+            indicator_names.append(block["name"])
+
+        values = np.full((len(blocks), len(names), len(years)), np.nan)
+        for i, block in enumerate(blocks):
+            rows = np.array([country_index[code] for code in block["country_codes"]], dtype=np.intp)
+            columns = np.array([year_index[year] for year in block["years"]], dtype=np.intp)
+            values[i][np.ix_(rows, columns)] = block["values"]
+
+        continents = sorted({label for label in labels if label is not None})
+        lookup = {name: i for i, name in enumerate(continents)}
+        # -1 marks rows without a continent, as in MatrixStore
+        continent_codes = np.array([lookup.get(label, -1) for label in labels], dtype=np.int16)
+        return cls(values, indicators, indicator_names, years, np.array(list(country_index), dtype=str),
+                   np.array(names, dtype=str), continent_codes, continents)
+
+    # -----------------------------
+    # Views
+    # -----------------------------
+
+    def indicator(self, code: str) -> np.ndarray:
+        """Countries x years block of one indicator (a view)"""
+        if code not in self.indicator_index:
+            raise KeyError(f"Indicator {code} not loaded")
+        return self.values[self.indicator_index[code]]
+
+    def year_column(self, code: str, year: Any) -> np.ndarray:
+        """One indicator for one year across all countries"""
+        return self.indicator(code)[:, self.year_index[str(year)]]
+
+    def rows_for(self, countries: List[str]) -> np.ndarray:
+        """Row positions of Country Codes (unknown codes are skipped)"""
+        return np.array([self.country_index[c] for c in countries if c in self.country_index], dtype=np.intp)
+
+
+@traced("load_indicators", rows=lambda store: store.values.size)
+def load_indicators(filepaths: List[str], workers: int | None = None) -> IndicatorStore:
+    """Load indicator files into one IndicatorStore, one file per worker process.
+
+    Every file goes through DataLoader.load_cleaned, so its binary cache is
+    reused; only the aligning scatter runs in the calling process.
+    """
+    workers = min(len(filepaths), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        loaded = [_load_file(path) for path in filepaths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            loaded = list(pool.map(_load_file, filepaths))
+
+    for path, blocks in zip(filepaths, loaded):
+        if not blocks:
+            print(f"Warning: no indicator data in '{path}'")
+    blocks = [block for file_blocks in loaded for block in file_blocks]
+    if not blocks:
+        raise ValueError("No indicator data loaded")
+    return IndicatorStore.from_blocks(blocks)
@@ -0,0 +1,73 @@
+import sys
+
+import pandas as pd
+
+from dataLoader import DataLoader
+from nameIndex import NameIndex
+
+
+def lookup(df: pd.DataFrame, country: str, year: str, names: NameIndex | None = None) -> None:
+    """Print one country's GDP for a year; country may be a name or a code"""
+    if year not in df.columns:
+        print(f" Year must be between 1960-2024")
+        return
+
+    # exact match, ignoring case and surrounding spaces
+    names = names or NameIndex.from_frame(df)
+    name = names.exact(country, 'country')
+    if name is not None:
+        found = df[df['Country Name'].str.strip() == name]
+    elif names.exact(country, 'code') is not None:
+        found = df[df['Country Code'].str.strip() == names.exact(country, 'code')]
+    else:
+        print(f" '{country}' not found.{names.did_you_mean(country, 'country')}")
+        return
+
+    gdp = found.iloc[0][year]
+
+    if pd.isna(gdp):
+        print(f" {country} in {year}: NO DATA AVAILABLE")
+    else:
+        print(f" {country} in {year}: ${gdp:,.2f}")
+        print(f"   Continent: {found.iloc[0]['Continent']}")
+        print(f"   Code: {found.iloc[0]['Country Code']}")
+
+
+def main() -> None:
+    data_file = sys.argv[1] if len(sys.argv) > 1 else 'gdp_cleaned_fixed.csv'
+    loader = DataLoader()
+    df = loader.load_cleaned(data_file)
+    if df.empty:
+        print(f"Error: '{data_file}' not found or empty")
+        sys.exit(1)
+    names = loader.load_name_index(data_file, df)
+
+    print("=" * 60)
+    print(" CHECK YOUR CLEANED DATA")
+    print("=" * 60)
+
+    # Show first few countries
+    print("Available countries (first 5):")
+    for i, country in enumerate(df['Country Name'].head()):
+        print(f"  {i+1}. {country}")
+
+    while True:
+        print("\nOptions:")
+        print("1. Check a country's GDP")
+        print("2. Exit")
+
+        choice = input("Choose (1 or 2): ").strip()
+
+        if choice == '1':
+            print("Examples: 'Aruba', 'Andorra', 'Afghanistan' (or a code like 'ABW')")
+            country = input("Country name: ").strip()
+            year = input("Year (1960-2024): ").strip()
+            lookup(df, country, year, names)
+        elif choice == '2':
+            break
+        else:
+            print("Please enter 1 or 2")
+
+
+if __name__ == "__main__":
+    main()
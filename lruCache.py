@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, List
+
+
+class LRUCache:
+    """Bounded in-memory mapping that drops the least recently used entry.
+
+    Every get refreshes the entry; put evicts from the cold end once there
+    are more than max_entries, or once the sizes given to put add up to more
+    than max_bytes (when set). Hits, misses and evictions are counted for
+    stats(), together with the total of those sizes (bytes).
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, size: int = 0) -> None:
+        self.bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes):
+            old, _ = self._data.popitem(last=False)
+            self.bytes -= self._sizes.pop(old)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        self.bytes -= self._sizes.pop(key, 0)
+        return self._data.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        return list(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "bytes": self.bytes,
+        }
@@ -0,0 +1,172 @@
+import json
+import os
+import numpy as np
+from typing import Dict, Any, List
+
+from sourceFingerprint import source_matches
+
+MATRIX_VERSION = 1
+MATRIX_SUFFIX = ".matrix.npy"
+LABELS_SUFFIX = ".labels.npz"
+
+# Columns that are the same on every row of a single-indicator file; they are
+# kept once in the metadata instead of once per row
+CONSTANT_COLUMNS = ('Indicator Name', 'Indicator Code')
+
+
+def _is_year(col: Any) -> bool:
+    return str(col).strip().isdigit() and len(str(col).strip()) == 4
+
+
+def _matrix_header_ok(matrix_file: str, shape: tuple) -> bool:
+    """True if matrix_file is a complete C-order float .npy of the given shape"""
+    try:
+        with open(matrix_file, "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                header = np.lib.format.read_array_header_2_0(f)
+            else:
+                return False
+            offset = f.tell()
+    except (OSError, ValueError):
+        return False
+    file_shape, fortran_order, dtype = header
+    if fortran_order or tuple(file_shape) != tuple(shape) or dtype.kind != "f":
+        return False
+    return os.path.getsize(matrix_file) == offset + int(np.prod(shape)) * dtype.itemsize
+
+
+class MatrixStore:
+    """Countries x years float matrix with interned label arrays.
+
+    ``values`` is a plain array when built in memory and a read-only
+    np.memmap when opened from disk, so every process that opens the same
+    file shares one copy of the data through the page cache. Only numpy is
+    needed to open and query a store; pandas is imported by to_frame alone.
+    """
+
+    def __init__(self, values: np.ndarray, years: List[str], names: np.ndarray, codes: np.ndarray,
+                 continent_codes: np.ndarray, continents: List[str], constants: Dict[str, str]):
+        self.values = values
+        self.years = list(years)
+        self.names = names
+        self.codes = codes
+        self.continent_codes = continent_codes
+        self.continents = list(continents)
+        self.constants = dict(constants)
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+
+    @classmethod
+    def from_frame(cls, df, dtype: Any = np.float64) -> "MatrixStore":
+        """Build a store from a cleaned frame"""
+        years = sorted(str(c) for c in df.columns if _is_year(c))
+        values = np.ascontiguousarray(df[years].to_numpy(dtype=dtype, na_value=np.nan))
+
+        names = df['Country Name'].astype(str).to_numpy(dtype=str)
+        codes = df['Country Code'].astype(str).to_numpy(dtype=str) if 'Country Code' in df.columns \
+            else np.full(len(df), '', dtype=str)
+
+        labels = df['Continent'].to_numpy(dtype=object)
+        continents = sorted({label for label in labels if isinstance(label, str)})
+        lookup = {name: i for i, name in enumerate(continents)}
+        # -1 marks rows without a continent
+        continent_codes = np.array([lookup.get(label, -1) for label in labels], dtype=np.int16)
+
+        constants = {}
+        for column in CONSTANT_COLUMNS:
+            if column in df.columns and df[column].nunique(dropna=False) == 1:
+                constants[column] = str(df[column].iloc[0])
+
+        return cls(values, years, names, codes, continent_codes, continents, constants)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def save(self, base_path: str, source: Dict[str, Any]) -> None:
+        """Write base_path + MATRIX_SUFFIX and LABELS_SUFFIX, keyed on source"""
+        meta = {"version": MATRIX_VERSION, "source": source, "years": self.years,
+                "continents": self.continents, "constants": self.constants}
+        matrix_file = base_path + MATRIX_SUFFIX
+        labels_file = base_path + LABELS_SUFFIX
+
+        # Labels go last: a store only counts as present once both files are in place
+        tmp_matrix = matrix_file + ".tmp.npy"
+        tmp_labels = labels_file + ".tmp.npz"
+        try:
+            np.save(tmp_matrix, self.values)
+            np.savez(tmp_labels, meta=np.array(json.dumps(meta)), names=self.names,
+                     codes=self.codes, continent_codes=self.continent_codes)
+            os.replace(tmp_matrix, matrix_file)
+            os.replace(tmp_labels, labels_file)
+        except OSError:
+            for path in (tmp_matrix, tmp_labels):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @classmethod
+    def open(cls, base_path: str, source_file: str | None = None) -> "MatrixStore | None":
+        """Memory-map a saved store; None if missing or stale for source_file"""
+        matrix_file = base_path + MATRIX_SUFFIX
+        labels_file = base_path + LABELS_SUFFIX
+        if not (os.path.exists(matrix_file) and os.path.exists(labels_file)):
+            return None
+        try:
+            with np.load(labels_file, allow_pickle=False) as saved:
+                meta = json.loads(str(saved["meta"]))
+                if meta.get("version") != MATRIX_VERSION:
+                    return None
+                if source_file is not None and not source_matches(meta["source"], source_file)[0]:
+                    return None
+                names, codes = saved["names"], saved["codes"]
+                continent_codes = saved["continent_codes"]
+            # a save that failed part way can leave a matrix that does not
+            # match the labels; check the header before mapping it
+            if not _matrix_header_ok(matrix_file, (len(names), len(meta["years"]))):
+                return None
+            values = np.load(matrix_file, mmap_mode='r')
+        except Exception:
+            return None
+        return cls(values, meta["years"], names, codes, continent_codes,
+                   meta["continents"], meta["constants"])
+
+    # -----------------------------
+    # Views
+    # -----------------------------
+
+    def year_column(self, year: Any) -> np.ndarray:
+        """One year across all countries (a strided view, no copy)"""
+        return self.values[:, self.year_index[str(year)]]
+
+    def select(self, regions: List[str], countries: List[str]) -> np.ndarray:
+        """Row positions matching any region and any country (stripped, case-insensitive)"""
+        positions = np.arange(len(self.names))
+        if regions:
+            wanted = {str(r).strip().casefold() for r in regions}
+            codes = [i for i, name in enumerate(self.continents) if name.strip().casefold() in wanted]
+            positions = positions[np.isin(self.continent_codes, codes)]
+        if countries:
+            wanted = np.array([str(c).strip().casefold() for c in countries])
+            normalised = np.array([str(name).strip().casefold() for name in self.names[positions]])
+            positions = positions[np.isin(normalised, wanted)]
+        return positions
+
+    def continent_labels(self) -> np.ndarray:
+        """Continent name per row (None where missing)"""
+        lookup = np.array(self.continents + [None], dtype=object)
+        return lookup[self.continent_codes]
+
+    def to_frame(self, include_constants: bool = False):
+        """Thin DataFrame over the matrix; the year block is not copied"""
+        import pandas as pd  # only needed here, keeps opening a store pandas-free
+
+        df = pd.DataFrame(self.values, columns=self.years, copy=False)
+        df.insert(0, 'Country Name', self.names)
+        df.insert(1, 'Country Code', self.codes)
+        if include_constants:
+            for offset, (column, value) in enumerate(self.constants.items()):
+                df.insert(2 + offset, column, pd.Categorical([value] * len(df)))
+        df['Continent'] = pd.Categorical.from_codes(self.continent_codes, categories=self.continents)
+        return df
@@ -0,0 +1,142 @@
+import json
+import os
+import numpy as np
+from typing import Dict, Any, Iterable, List, Tuple
+
+NAMES_VERSION = 1
+NAMES_SUFFIX = ".names.npz"
+
+# kind -> column the names come from
+NAME_COLUMNS = {'country': 'Country Name', 'code': 'Country Code', 'continent': 'Continent'}
+KINDS = tuple(NAME_COLUMNS)
+
+
+def _normalise(value: Any) -> str:
+    return str(value).strip().casefold()
+
+
+def _trigrams(key: str) -> List[str]:
+    """Distinct trigrams of a normalised key, padded so word starts weigh more"""
+    padded = f"  {' '.join(key.split())} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class NameIndex:
+    """Exact and fuzzy lookup over country names, country codes and continents.
+
+    Exact lookups are one dict probe on the stripped, casefolded name. Fuzzy
+    lookups score every entity sharing a trigram with the query (Dice
+    coefficient over trigram sets) from an inverted index kept as flat
+    arrays, so a miss costs one bincount instead of a pass over all rows.
+    """
+
+    def __init__(self, names: List[str], kinds: np.ndarray, grams: List[str],
+                 offsets: np.ndarray, postings: np.ndarray, gram_counts: np.ndarray):
+        self.names = list(names)
+        self.kinds = kinds
+        self.grams = {gram: i for i, gram in enumerate(grams)}
+        self.offsets = offsets
+        self.postings = postings
+        self.gram_counts = gram_counts
+        # normalised key -> entity ids (one per kind at most)
+        self.exact_ids: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            self.exact_ids.setdefault(_normalise(name), []).append(i)
+
+    @classmethod
+    def from_names(cls, names_by_kind: Dict[str, Iterable[Any]]) -> "NameIndex":
+        """Build from {kind: names}; duplicates and blanks are dropped"""
+        names: List[str] = []
+        kinds: List[int] = []
+        for k, kind in enumerate(KINDS):
+            seen = set()
+            for name in names_by_kind.get(kind, ()):
+                if not isinstance(name, str):
+                    continue
+                key = _normalise(name)
+                if key and key not in seen:
+                    seen.add(key)
+                    names.append(name.strip())
+                    kinds.append(k)
+
+        gram_lists = [_trigrams(_normalise(name)) for name in names]
+        vocabulary = sorted({gram for grams in gram_lists for gram in grams})
+        gram_ids = {gram: i for i, gram in enumerate(vocabulary)}
+        pairs = np.array([(gram_ids[gram], entity) for entity, grams in enumerate(gram_lists) for gram in grams],
+                         dtype=np.int64).reshape(-1, 2)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        offsets = np.searchsorted(pairs[:, 0], np.arange(len(vocabulary) + 1)).astype(np.int64)
+        return cls(names, np.array(kinds, dtype=np.int8), vocabulary, offsets,
+                   pairs[:, 1].astype(np.int32), np.array([len(g) for g in gram_lists], dtype=np.int32))
+
+    @classmethod
+    def from_frame(cls, df) -> "NameIndex":
+        return cls.from_names({kind: df[column].dropna().unique() for kind, column in NAME_COLUMNS.items()
+                               if column in df.columns})
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+
+    def exact(self, name: Any, kind: str | None = None) -> str | None:
+        """The indexed spelling of a name matching exactly (ignoring case and spaces)"""
+        for i in self.exact_ids.get(_normalise(name), ()):
+            if kind is None or KINDS[self.kinds[i]] == kind:
+                return self.names[i]
+        return None
+
+    def suggest(self, name: Any, kind: str | None = None, limit: int = 5,
+                min_score: float = 0.3) -> List[Tuple[str, str, float]]:
+        """(name, kind, score) of the closest names, best first"""
+        query = _trigrams(_normalise(name))
+        ids = [self.grams[gram] for gram in query if gram in self.grams]
+        if not ids or not self.names:
+            return []
+        hits = np.concatenate([self.postings[self.offsets[g]:self.offsets[g + 1]] for g in ids])
+        shared = np.bincount(hits, minlength=len(self.names))
+        candidates = np.unique(hits)
+        if kind is not None:
+            candidates = candidates[self.kinds[candidates] == KINDS.index(kind)]
+        scores = 2.0 * shared[candidates] / (len(query) + self.gram_counts[candidates])
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        best = np.lexsort((candidates, -scores))[:limit]
+        return [(self.names[candidates[i]], KINDS[self.kinds[candidates[i]]], float(scores[i])) for i in best]
+
+    def did_you_mean(self, name: Any, kind: str | None = None, limit: int = 3) -> str:
+        """" Did you mean: X, Y?" for a missed name, or "" when nothing is close"""
+        suggestions = self.suggest(name, kind, limit)
+        if not suggestions:
+            return ""
+        return " Did you mean: " + ", ".join(
+            s if kind is not None else f"{s} ({k})" for s, k, _ in suggestions) + "?"
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def save(self, path: str, fingerprint: str | None) -> None:
+        meta = {"version": NAMES_VERSION, "fingerprint": fingerprint}
+        grams = sorted(self.grams, key=self.grams.get)
+        tmp_file = path + ".tmp.npz"
+        try:
+            np.savez(tmp_file, meta=np.array(json.dumps(meta)), names=np.array(self.names, dtype=str),
+                     kinds=self.kinds, grams=np.array(grams, dtype=str), offsets=self.offsets,
+                     postings=self.postings, gram_counts=self.gram_counts)
+            os.replace(tmp_file, path)
+        except OSError:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["NameIndex", Dict[str, Any]] | None:
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                meta = json.loads(str(saved["meta"]))
+                if meta.get("version") != NAMES_VERSION:
+                    return None
+                index = cls(saved["names"].tolist(), saved["kinds"], saved["grams"].tolist(),
+                            saved["offsets"], saved["postings"], saved["gram_counts"])
+        except Exception:
+            return None
+        return index, meta
@@ -0,0 +1,161 @@
+import json
+import os
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+from countryHierarchy import is_aggregate
+from sourceFingerprint import source_matches
+
+RANK_VERSION = 1
+RANK_SUFFIX = ".rank.npz"
+
+
+def _normalise(value: Any) -> str:
+    return str(value).strip().casefold()
+
+
+class RankIndex:
+    """Per-year GDP rankings of real countries, built once per dataset.
+
+    ``order[j]`` lists the leaf (non-aggregate) rows by descending value in
+    year j, with ``valid[j]`` rows that have a value; rows without one come
+    after them. ``ranks[row, j]`` is the 1-based rank of a row, 0 for
+    aggregates and missing values. Top-K and bottom-K are slices of
+    ``order`` (O(K)); rank-of is one lookup (O(1)).
+    """
+
+    def __init__(self, years: List[str], names: np.ndarray, values: np.ndarray,
+                 continent_codes: np.ndarray, continents: List[str],
+                 order: np.ndarray, valid: np.ndarray, ranks: np.ndarray):
+        self.years = [str(y) for y in years]
+        self.names = names
+        self.values = values
+        self.continent_codes = continent_codes
+        self.continents = list(continents)
+        self.order = order
+        self.valid = valid
+        self.ranks = ranks
+        self.year_index = {year: j for j, year in enumerate(self.years)}
+        self.name_index = {}
+        for row, name in enumerate(names):
+            self.name_index.setdefault(_normalise(name), row)
+
+    @classmethod
+    def from_store(cls, store) -> "RankIndex":
+        """Build from a MatrixStore (or anything with the same attributes)"""
+        values = np.asarray(store.values, dtype=np.float64)
+        leaves = np.flatnonzero(~is_aggregate(store.codes))
+
+        block = values[leaves].T                      # years x leaves
+        # descending with NaNs last: sort on -value, NaN stays NaN and sorts last
+        local = np.argsort(-block, axis=1, kind='stable')
+        order = leaves[local].astype(np.int32)
+        valid = (~np.isnan(block)).sum(axis=1).astype(np.int32)
+
+        ranks = np.zeros(values.shape, dtype=np.int32)
+        positions = np.arange(1, len(leaves) + 1, dtype=np.int32)
+        for j in range(values.shape[1]):
+            ranks[order[j, :valid[j]], j] = positions[:valid[j]]
+
+        return cls(store.years, store.names, values, store.continent_codes, store.continents,
+                   order, valid, ranks)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def save(self, path: str, source: Dict[str, Any]) -> None:
+        meta = {"version": RANK_VERSION, "source": source, "years": self.years, "continents": self.continents}
+        tmp_path = path + ".tmp.npz"
+        try:
+            np.savez(tmp_path, meta=np.array(json.dumps(meta)), names=self.names, values=self.values,
+                     continent_codes=self.continent_codes, order=self.order, valid=self.valid, ranks=self.ranks)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str, source_file: str | None = None) -> "RankIndex | None":
+        """A saved index; None if missing or stale for source_file"""
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                meta = json.loads(str(saved["meta"]))
+                if meta.get("version") != RANK_VERSION:
+                    return None
+                if source_file is not None and not source_matches(meta["source"], source_file)[0]:
+                    return None
+                arrays = {name: saved[name] for name in
+                          ("names", "values", "continent_codes", "order", "valid", "ranks")}
+        except Exception:
+            return None
+        return cls(meta["years"], arrays["names"], arrays["values"], arrays["continent_codes"],
+                   meta["continents"], arrays["order"], arrays["valid"], arrays["ranks"])
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+
+    def _year(self, year: Any) -> int:
+        if str(year) not in self.year_index:
+            raise KeyError(f"Year {year} not present in dataset columns")
+        return self.year_index[str(year)]
+
+    def _entries(self, rows: np.ndarray, j: int) -> List[Tuple[str, float]]:
+        return [(str(self.names[r]), float(self.values[r, j])) for r in rows]
+
+    def top(self, year: Any, k: int) -> List[Tuple[str, float]]:
+        """The k largest economies in a year, largest first"""
+        j = self._year(year)
+        return self._entries(self.order[j, :min(k, self.valid[j])], j)
+
+    def bottom(self, year: Any, k: int) -> List[Tuple[str, float]]:
+        """The k smallest economies with a value in a year, smallest first"""
+        j = self._year(year)
+        n = self.valid[j]
+        return self._entries(self.order[j, max(n - k, 0):n][::-1], j)
+
+    def rank_of(self, country: str, year: Any) -> int | None:
+        """1-based rank of a country in a year; None if unranked that year"""
+        row = self.name_index.get(_normalise(country))
+        if row is None:
+            raise KeyError(f"Country '{country}' not found in data")
+        rank = int(self.ranks[row, self._year(year)])
+        return rank or None
+
+    def rank_history(self, country: str) -> Dict[str, int | None]:
+        """Rank of a country in every year"""
+        row = self.name_index.get(_normalise(country))
+        if row is None:
+            raise KeyError(f"Country '{country}' not found in data")
+        return {year: (int(r) or None) for year, r in zip(self.years, self.ranks[row])}
+
+    def top_in_region(self, region: str, year: Any, n: int) -> Tuple[List[str], List[float], float]:
+        """(labels, values, rest) for the n largest countries of a continent.
+
+        ``rest`` is the summed GDP of the region's other ranked countries,
+        None when there are no others.
+        """
+        wanted = _normalise(region)
+        codes = [i for i, name in enumerate(self.continents) if _normalise(name) == wanted]
+        j = self._year(year)
+        ranked = self.order[j, :self.valid[j]]
+        ranked = ranked[np.isin(self.continent_codes[ranked], codes)]
+        values = self.values[ranked, j]
+        rest = float(values[n:].sum()) if len(values) > n else None
+        return [str(name) for name in self.names[ranked[:n]]], values[:n].tolist(), rest
+
+
+def top_n_with_other(labels: List[str], values: List[float], n: int,
+                     other_label: str = "Other") -> Tuple[List[str], List[float]]:
+    """Keep the n largest values and fold the rest into one "Other" entry"""
+    arr = np.asarray(values, dtype=np.float64)
+    keep = np.flatnonzero(~np.isnan(arr))
+    keep = keep[np.argsort(-arr[keep], kind='stable')]
+    top, rest = keep[:n], keep[n:]
+    labels_out = [labels[i] for i in top]
+    values_out = arr[top].tolist()
+    if len(rest):
+        labels_out.append(other_label)
+        values_out.append(float(arr[rest].sum()))
+    return labels_out, values_out
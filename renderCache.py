@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+from importlib import metadata
+from typing import Dict, Any, Callable, List
+
+DEFAULT_CACHE_DIR = ".render_cache"
+DEFAULT_MAX_MB = 256
+
+
+def _matplotlib_version() -> str:
+    # read from package metadata so a cache hit never imports matplotlib
+    try:
+        return metadata.version("matplotlib")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def format_of(path: str | None, default: str = "png") -> str:
+    ext = os.path.splitext(path or "")[1].lstrip(".").lower()
+    return ext if ext in ("png", "svg") else default
+
+
+class RenderCache:
+    """Content-addressed store of rendered chart images.
+
+    Keys hash the chart kind, the exact data slice plotted, the chart
+    parameters, the output format and the matplotlib version. Each entry is
+    ``<key>.<fmt>`` plus a ``<key>.json`` note of what it shows. Entries are
+    evicted least-recently-used first (by file mtime, refreshed on every hit)
+    once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._mpl_version = _matplotlib_version()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._entries())
+
+    def key(self, job: Dict[str, Any], fmt: str) -> str:
+        payload = json.dumps(
+            {"kind": job["kind"], "data": job["data"], "params": job["params"],
+             "format": fmt, "matplotlib": self._mpl_version},
+            sort_keys=True, default=float,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    def get(self, key: str, fmt: str) -> bytes | None:
+        path = self._path(key, fmt)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        os.utime(path)  # mark as recently used
+        self.hits += 1
+        return payload
+
+    def put(self, key: str, fmt: str, payload: bytes, job: Dict[str, Any]) -> None:
+        path = self._path(key, fmt)
+        try:
+            replaced = os.path.getsize(path)  # the old bytes of a key put again
+        except OSError:
+            replaced = 0
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        with open(os.path.join(self.directory, f"{key}.json"), 'w') as f:
+            json.dump({"kind": job["kind"], "params": job["params"], "format": fmt}, f)
+        self._total_bytes += len(payload) - replaced
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def render(self, job: Dict[str, Any], fmt: str | None = None,
+               renderer: Callable[[Dict[str, Any], str], bytes] | None = None) -> bytes:
+        """Image bytes for a chart job, rendering only on a cache miss"""
+        fmt = fmt or format_of(job.get("out_path"))
+        key = self.key(job, fmt)
+        payload = self.get(key, fmt)
+        if payload is None:
+            if renderer is None:
+                import chart_jobs  # matplotlib is only needed on a miss
+                renderer = chart_jobs.render_chart_bytes
+            payload = renderer(job, fmt)
+            self.put(key, fmt, payload, job)
+        return payload
+
+    def invalidate(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Drop entries whose note (kind, params, format) matches predicate"""
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            note_path = os.path.join(self.directory, name)
+            try:
+                with open(note_path, 'r') as f:
+                    note = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if predicate(note):
+                self._remove(name[:-len(".json")], note.get("format", "png"))
+                removed += 1
+        return removed
+
+    def _entries(self) -> List[tuple]:
+        """(mtime, path, size) of every cached image"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith((".png", ".svg")):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, path, st.st_size))
+        return entries
+
+    def _remove(self, key: str, fmt: str) -> None:
+        path = self._path(key, fmt)
+        try:
+            self._total_bytes -= os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            pass
+        try:
+            os.remove(os.path.join(self.directory, f"{key}.json"))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        self._total_bytes = sum(size for _, _, size in entries)
+        for _, path, _ in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            key, ext = os.path.splitext(os.path.basename(path))
+            self._remove(key, ext.lstrip("."))
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,216 @@
+import json
+import math
+import os
+import numpy as np
+from typing import Dict, Any, Iterable, Iterator, List
+
+from tracing import traced
+
+# Output format by file extension; JSON Lines needs nothing beyond the
+# standard library, Parquet and Arrow IPC need pyarrow (imported on use)
+FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet',
+           '.arrow': 'arrow', '.ipc': 'arrow', '.feather': 'arrow'}
+
+DEFAULT_BATCH_ROWS = 65536
+
+
+def format_of(path: str, default: str = 'jsonl') -> str:
+    return FORMATS.get(os.path.splitext(path)[1].lower(), default)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow output need pyarrow (pip install pyarrow); "
+                          "use a .jsonl file instead") from None
+    return pyarrow
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (np.floating, float)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    return value
+
+
+class BatchWriter:
+    """Writes column batches to one file, replacing it only when closed cleanly.
+
+    Batches are {column: numpy array or list} with equal lengths. Rows go to
+    ``<path>.tmp`` as they arrive, so memory holds one batch at a time, and
+    the temp file is renamed over path on close; an error leaves the old
+    file untouched. For Parquet and Arrow, float/int numpy arrays are
+    handed to pyarrow without a copy.
+    """
+
+    def __init__(self, path: str, fmt: str | None = None):
+        self.path = path
+        self.format = fmt or format_of(path)
+        if self.format not in ('jsonl', 'parquet', 'arrow'):
+            raise ValueError(f"Unknown export format: {self.format}")
+        self.tmp_path = path + ".tmp"
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._schema = None
+        if self.format != 'jsonl':
+            self._pa = _pyarrow()  # fail before anything is written
+
+    def write(self, batch: Dict[str, Any]) -> None:
+        if self.format == 'jsonl':
+            self._write_jsonl(batch)
+        else:
+            self._write_arrow(batch)
+
+    def _write_jsonl(self, batch: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = open(self.tmp_path, 'w')
+        names = list(batch)
+        columns = [batch[name].tolist() if isinstance(batch[name], np.ndarray) else batch[name] for name in names]
+        lines = [json.dumps({name: _json_value(v) for name, v in zip(names, row)}) for row in zip(*columns)]
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+        self.rows += len(lines)
+
+    def _write_arrow(self, batch: Dict[str, Any]) -> None:
+        pa = self._pa
+        arrays = {name: pa.array(values) for name, values in batch.items()}
+        record_batch = pa.RecordBatch.from_pydict(arrays, schema=self._schema)
+        if self._writer is None:
+            self._schema = record_batch.schema
+            if self.format == 'parquet':
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            else:
+                self._file = pa.OSFile(self.tmp_path, 'wb')
+                self._writer = pa.ipc.new_file(self._file, self._schema)
+        self._writer.write_batch(record_batch)
+        self.rows += record_batch.num_rows
+
+    def close(self) -> None:
+        """Finish the file and move it into place"""
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        if self._writer is None and self._file is None:
+            open(self.tmp_path, 'w').close()  # nothing was written: an empty file
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        for handle in (self._writer, self._file):
+            try:
+                if handle is not None:
+                    handle.close()
+            except Exception:
+                pass
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def record_batches(records: Iterable[Dict[str, Any]], batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[Dict[str, List[Any]]]:
+    """Group dict records into column batches of at most batch_rows rows"""
+    batch: Dict[str, List[Any]] = {}
+    size = 0
+    for record in records:
+        if not batch:
+            batch = {name: [] for name in record}
+        for name, column in batch.items():
+            column.append(record.get(name))
+        size += 1
+        if size == batch_rows:
+            yield batch
+            batch, size = {}, 0
+    if size:
+        yield batch
+
+
+@traced("export_records", rows=lambda rows: rows)
+def export_records(records: Iterable[Dict[str, Any]], path: str, fmt: str | None = None,
+                   batch_rows: int = DEFAULT_BATCH_ROWS) -> int:
+    """Stream flat dict records to path; returns the number of rows written"""
+    with BatchWriter(path, fmt) as writer:
+        for batch in record_batches(records, batch_rows):
+            writer.write(batch)
+    return writer.rows
+
+
+@traced("export_matrix", rows=lambda rows: rows)
+def export_matrix(path: str, names: Any, years: List[Any], block: np.ndarray, value_name: str = 'value',
+                  fmt: str | None = None, batch_rows: int = DEFAULT_BATCH_ROWS) -> int:
+    """Stream a countries x years block (growth rates, rollups, ...) as long rows.
+
+    Rows are (name, year, value_name); each batch covers whole countries and
+    its values are a ravel of a row slice, a view of the block when it is
+    C-contiguous.
+    """
+    names = np.asarray(names, dtype=str)
+    years = np.asarray([int(y) for y in years], dtype=np.int64)
+    rows_per_batch = max(batch_rows // max(len(years), 1), 1)
+    with BatchWriter(path, fmt) as writer:
+        for start in range(0, len(names), rows_per_batch):
+            chunk = block[start:start + rows_per_batch]
+            writer.write({
+                'name': np.repeat(names[start:start + rows_per_batch], len(years)),
+                'year': np.tile(years, len(chunk)),
+                value_name: chunk.reshape(-1),
+            })
+    return writer.rows
+
+
+# -----------------------------
+# Bulk results table
+# -----------------------------
+
+def result_rows(configs: Iterable[Dict[str, Any]], results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """One flat row per (year, region, country, operation) of process_data results.
+
+    Region and country are taken from the configs, so the "All" rows say
+    "All" rather than "Multiple". A missing or NaN value is written as null,
+    and so is every value but the count of an empty selection, whose
+    statistics would otherwise read as real zeros.
+    """
+    for config, stats in zip(configs, results):
+        per_op = stats.get("results") or {stats["operation"]: stats["result"]}
+        empty = not stats["data_points"]
+        for operation, value in per_op.items():
+            if value is None or (empty and operation != "count"):
+                value = None
+            else:
+                value = _json_value(float(value))
+            yield {"year": int(stats["year"]), "region": str(config.get("region") or "All"),
+                   "country": str(config.get("country") or "All"), "operation": operation,
+                   "value": value, "data_points": int(stats["data_points"])}
+
+
+def grid_configs(years: Iterable[Any], regions: Iterable[str], operations: List[str]) -> Iterator[Dict[str, Any]]:
+    """Every year x region config, each asking for all the operations"""
+    for year in years:
+        for region in regions:
+            yield {"year": int(year), "region": region, "operation": operations[0],
+                   "operations": operations[1:]}
+
+
+def grid_result_rows(processor, df, years: List[Any], regions: List[str], operations: List[str],
+                     loader=None, years_per_chunk: int = 1) -> Iterator[Dict[str, Any]]:
+    """result_rows for the whole year x region grid, evaluated a few years at a time.
+
+    Only one chunk of configs and results is alive at once, so memory does
+    not grow with the number of years.
+    """
+    for start in range(0, len(years), years_per_chunk):
+        configs = list(grid_configs(years[start:start + years_per_chunk], regions, operations))
+        yield from result_rows(configs, processor.process_batch(df, configs, loader=loader))
@@ -0,0 +1,27 @@
+import hashlib
+import os
+from typing import Dict, Any, Tuple
+
+
+def file_fingerprint(filepath: str) -> Dict[str, Any]:
+    """Return size, mtime and sha256 of a file"""
+    st = os.stat(filepath)
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest.hexdigest()}
+
+
+def source_matches(saved: Dict[str, Any], filepath: str) -> Tuple[bool, Dict[str, Any]]:
+    """Check a saved fingerprint against the file on disk.
+
+    Size and mtime are compared first; the content hash is only computed
+    when they differ (e.g. the file was touched). Returns (matches, current)
+    where current is the up-to-date fingerprint to store.
+    """
+    st = os.stat(filepath)
+    if (saved.get("size"), saved.get("mtime_ns")) == (st.st_size, st.st_mtime_ns):
+        return True, saved
+    current = file_fingerprint(filepath)
+    return current["sha256"] == saved.get("sha256"), current
@@ -0,0 +1,93 @@
+import numpy as np
+from typing import Dict, Any, Iterable, List
+
+# Operations understood besides percentiles, which are written as "p<q>"
+# (e.g. "p25", "p99.5")
+OPERATIONS = ('sum', 'average', 'min', 'max', 'count', 'median', 'std', 'weighted_mean')
+
+
+def percentile_of(operation: str) -> float | None:
+    """Return q for a "p<q>" operation name, or None"""
+    if not operation.startswith('p'):
+        return None
+    try:
+        q = float(operation[1:])
+    except ValueError:
+        return None
+    return q if 0 <= q <= 100 else None
+
+
+def is_supported(operation: str) -> bool:
+    return operation in OPERATIONS or percentile_of(operation) is not None
+
+
+def expand_operations(operations: Any) -> List[str]:
+    """Turn "all", a single name or a list of names into a list of names"""
+    if operations is None:
+        return []
+    if isinstance(operations, str):
+        operations = [operations]
+    expanded = []
+    for op in operations:
+        expanded.extend(OPERATIONS if op == 'all' else [op])
+    return list(dict.fromkeys(expanded))
+
+
+def compute_statistics(
+    values: Any,
+    operations: Iterable[str],
+    weights: Any = None,
+) -> Dict[str, float]:
+    """Compute several NaN-aware statistics over one array at once.
+
+    NaNs are masked out a single time and every requested operation reads
+    the same cleaned buffer; sum, median and percentiles are shared between
+    the operations that need them. ``std`` is the population standard
+    deviation. Empty input and unknown operations give 0.0, matching
+    DataProcessor.calculate_statistics.
+    """
+    operations = expand_operations(operations)
+    arr = np.asarray(values, dtype=np.float64)
+    mask = ~np.isnan(arr)
+    clean = arr if mask.all() else arr[mask]
+    n = clean.size
+
+    results = {op: 0.0 for op in operations}
+    if 'count' in results:
+        results['count'] = float(n)
+    if n == 0:
+        return results
+
+    wanted = set(operations)
+    total = None
+    if wanted & {'sum', 'average', 'std'}:
+        total = float(clean.sum())
+    if 'sum' in wanted:
+        results['sum'] = total
+    if 'average' in wanted:
+        results['average'] = total / n
+    if 'min' in wanted:
+        results['min'] = float(clean.min())
+    if 'max' in wanted:
+        results['max'] = float(clean.max())
+    if 'std' in wanted:
+        mean = total / n
+        results['std'] = float(np.sqrt(np.dot(clean - mean, clean - mean) / n))
+
+    # Median and percentiles share one partition of the data
+    quantiles = {op: percentile_of(op) for op in operations if percentile_of(op) is not None}
+    if 'median' in wanted:
+        quantiles['median'] = 50.0
+    if quantiles:
+        points = np.percentile(clean, list(quantiles.values()))
+        for op, value in zip(quantiles, points):
+            results[op] = float(value)
+
+    if 'weighted_mean' in wanted and weights is not None:
+        w = np.asarray(weights, dtype=np.float64)
+        both = mask & ~np.isnan(w)
+        weight_total = w[both].sum()
+        if weight_total:
+            results['weighted_mean'] = float(np.dot(arr[both], w[both]) / weight_total)
+
+    return results
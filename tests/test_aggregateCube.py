@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from aggregateCube import AggregateCube
+
+
+def _frame():
+    return pd.DataFrame({
+        "Country Name": ["A", "B", "C", "D"],
+        "Country Code": ["AAA", "BBB", "CCC", "DDD"],
+        "Continent": ["Asia", "Asia", "Europe", "Europe"],
+        "2019": [1.0, None, 3.0, 4.0],
+        "2020": [2.0, 5.0, None, 6.0],
+    })
+
+
+def test_cube_matches_groupby():
+    df = _frame()
+    cube = AggregateCube.from_frame(df)
+    labels, values = cube.year_slice(2020, "sum")
+    grouped = df.groupby("Continent")["2020"].sum()
+    assert labels == grouped.index.tolist()
+    assert np.allclose(values, grouped.values)
+    assert cube.get(" asia", 2019, "count") == 1
+    assert cube.total(2020, "mean") == df["2020"].mean()
+
+
+def test_cube_update_only_recomputes_changed_continents():
+    df = _frame()
+    cube = AggregateCube.from_frame(df)
+    df.loc[2, "2020"] = 10.0
+    assert cube.update(df) == ["Europe"]
+    assert cube.get("Europe", 2020, "sum") == 16.0
+    assert cube.get("Asia", 2020, "sum") == 7.0
+
+
+def test_process_data_reads_the_cube_only_for_its_own_frame():
+    from dataProcessor import DataProcessor
+
+    df = _frame()
+    df.attrs["fingerprint"] = "test"
+    cube = AggregateCube.from_frame(df)
+    proc = DataProcessor(memo_size=0)
+    config = {"year": 2020, "operation": "sum"}
+    assert proc.process_data(df, config, cube=cube)["result"] == 13.0
+
+    subset = df.iloc[[0, 2]]  # keeps the attrs, but not the rows
+    assert not cube.covers(subset)
+    stats = proc.process_data(subset, config, cube=cube)
+    assert (stats["result"], stats["data_points"]) == (2.0, 1)
+
+
+def test_chart_slices_read_the_cube_only_for_its_own_frame():
+    from draw_bar_chart import yearly_bar_data
+    from draw_line_chart import region_series_data
+    from draw_pie_chart import yearly_pie_data
+
+    df = _frame()
+    df.attrs["fingerprint"] = "test"
+    cube = AggregateCube.from_frame(df)
+    assert yearly_bar_data(df, 2020, cube) == (["Asia", "Europe"], [7.0, 6.0])
+
+    subset = df.iloc[[0, 3]].copy()  # keeps the attrs, but not the rows
+    assert yearly_bar_data(subset, 2020, cube) == (["Asia", "Europe"], [2.0, 6.0])
+    assert yearly_pie_data(subset, 2020, cube) == (["Asia", "Europe"], [2.0, 6.0])
+    assert region_series_data(subset, "Asia", cube) == ([2019, 2020], [1.0, 2.0])
@@ -0,0 +1,29 @@
+import json
+import os
+from bulk_export import export_grid
+
+CSV = ("Country Name,Country Code,Continent,2019,2020\n"
+       "A,AAA,Asia,1,2\nB,BBB,Asia,3,4\nC,CCC,Europe,5,6\nD,DDD,Europe,7,8\n")
+
+
+def test_export_grid_skips_finished_images_and_redraws_changed_ones(tmp_path):
+    src = tmp_path / "gdp.csv"
+    src.write_text(CSV)
+    spec = {"data_file": str(src), "output_dir": str(tmp_path / "charts"), "years": [2020],
+            "regions": ["Asia", "Europe"], "chart_types": ["region_bar", "year_bar"], "format": "svg"}
+
+    first = export_grid(spec, workers=1, engine="svg")
+    assert (first["rendered"], first["skipped"], first["failed"]) == (3, 0, 0)
+    assert export_grid(spec, workers=1, engine="svg")["skipped"] == 3
+
+    # one Europe value changes: the Europe bar and the continent bar are redrawn
+    src.write_text(CSV.replace("C,CCC,Europe,5,6", "C,CCC,Europe,5,60"))
+    os.utime(src, ns=(1, os.stat(src).st_mtime_ns + 1))
+    changed = export_grid(spec, workers=1, engine="svg")
+    assert (changed["rendered"], changed["skipped"]) == (2, 1)
+
+    switched = export_grid(spec, workers=1, engine="template")
+    assert (switched["rendered"], switched["skipped"]) == (3, 0)
+    with open(switched["manifest"]) as f:
+        images = json.load(f)["images"]
+    assert {entry["engine"] for entry in images.values()} == {"template"}
@@ -0,0 +1,17 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from chart_jobs import render_jobs
+
+
+def test_render_jobs_saves_in_job_order_without_pyplot_figures(tmp_path):
+    jobs = [
+        {"kind": "year_bar", "data": {"labels": ["Asia", "Europe"], "values": [3.0, 2.0]},
+         "params": {"year": 2020}, "out_path": str(tmp_path / "bar.png")},
+        {"kind": "country_line", "data": {"years": [2019, 2020], "values": [1.0, 2.0]},
+         "params": {"country": "A"}, "out_path": str(tmp_path / "line.png")},
+    ]
+    saved = render_jobs(jobs, workers=2)
+    assert saved == [job["out_path"] for job in jobs]
+    assert all((tmp_path / name).stat().st_size > 0 for name in ("bar.png", "line.png"))
+    assert plt.get_fignums() == []
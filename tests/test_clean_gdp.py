@@ -0,0 +1,26 @@
+import pandas as pd
+from clean_gdp import clean_file
+
+
+def test_clean_file_parses_thousands_in_chunks(tmp_path):
+    src = tmp_path / "raw.csv"
+    src.write_text('Country Name,1960,1961\nA,"1,000",x\nB,2,"3,500.5"\nC,,4\n')
+    out = tmp_path / "clean.csv"
+
+    summary = clean_file(str(src), str(out), chunk_rows=2)
+
+    assert (summary["rows"], summary["chunks"]) == (3, 2)
+    df = pd.read_csv(out)
+    assert df["1960"].tolist()[:2] == [1000.0, 2.0]
+    assert pd.isna(df["1961"][0]) and df["1961"].tolist()[1:] == [3500.5, 4.0]
+
+
+def test_clean_file_output_does_not_depend_on_chunk_size(tmp_path):
+    src = tmp_path / "raw.csv"
+    src.write_text('Country Name,1960,1961\nA,1,2\nB,3,\nC,"5,000",6\nD,7,8\n')
+    outputs = []
+    for rows in (1, 2, 3, 10):
+        out = tmp_path / f"clean_{rows}.csv"
+        clean_file(str(src), str(out), chunk_rows=rows)
+        outputs.append(out.read_bytes())
+    assert len(set(outputs)) == 1
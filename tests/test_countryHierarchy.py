@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from aggregateCube import AggregateCube
+from countryHierarchy import Rollup
+
+
+def _frame():
+    return pd.DataFrame({
+        "Country Name": ["World", "East Asia & Pacific", "China", "Japan", "France", "Kosovo"],
+        "Country Code": ["WLD", "EAS", "CHN", "JPN", "FRA", "XKX"],
+        "Continent": ["Global", "Asia", "Asia", "Asia", "Europe", None],
+        "2019": [20.0, 9.0, 5.0, 4.0, 3.0, 1.0],
+        "2020": [22.0, 10.0, 6.0, None, 4.0, 2.0],
+    })
+
+
+def test_rollup_sums_leaves_only():
+    rollup = Rollup.from_frame(_frame())
+    assert rollup.hierarchy.continents == ["Asia", "Europe"]
+    assert np.allclose(rollup.continent("Asia"), [9.0, 6.0])
+    assert np.allclose(rollup.world(), [13.0, 12.0])
+    assert rollup.world_counts.tolist() == [4, 3]
+
+    assert rollup.update([4], [[5.0, 5.0]]) == ["Europe", "World"]
+    assert np.allclose(rollup.world(), [15.0, 13.0])
+    assert rollup.update([1], [[0.0, 0.0]]) == []
+
+
+def test_cube_leaves_aggregates_out_of_continents():
+    cube = AggregateCube.from_frame(_frame())
+    assert cube.continents == ["Asia", "Europe"]
+    assert cube.get("Asia", 2019) == 9.0
+    assert cube.region_rows("Asia") == 2
+
+
+def test_cube_and_frame_paths_agree_on_leaf_totals():
+    from dataLoader import DataLoader
+    from dataProcessor import DataProcessor
+
+    df = _frame()
+    df.attrs["fingerprint"] = "test"
+    cube = AggregateCube.from_frame(df)
+    proc = DataProcessor(memo_size=0)
+    assert proc.uses_cube(cube, df, {"year": 2019, "operation": "sum"})
+    for config in ({"year": 2019, "operation": "sum", "region": "Asia"}, {"year": 2019, "operation": "sum"}):
+        from_cube = proc.process_data(df, config, cube=cube)
+        # the cube only speeds things up: same frame without it, or filtered first
+        assert from_cube == proc.process_data(df, config)
+        assert from_cube == proc.process_data(DataLoader().filter_by_config(df, config), config)
+    assert cube.total(2019) == Rollup.from_frame(df).world()[0] == 13.0
+    assert next(proc.process_batch(df, [{"year": 2019, "operation": "sum"}]))["data_points"] == 4
+    # the leaf mask is built once per frame
+    assert proc.loader.leaves_for(df) is proc.loader.leaves_for(df)
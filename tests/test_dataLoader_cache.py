@@ -0,0 +1,55 @@
+import pandas as pd
+from dataLoader import DataLoader
+
+
+def _write_csv(path, value):
+    pd.DataFrame({
+        "Country Name": ["A", "B"],
+        "Continent": ["Asia", None],
+        "2020": [value, "2,500"],
+    }).to_csv(path, index=False)
+
+
+def test_load_cleaned_hits_cache_on_second_load(tmp_path):
+    src = tmp_path / "gdp.csv"
+    _write_csv(src, "1,000")
+    loader = DataLoader()
+
+    cold = loader.load_cleaned(str(src))
+    assert loader.last_cache_hit is False
+
+    warm = loader.load_cleaned(str(src))
+    assert loader.last_cache_hit is True
+    pd.testing.assert_frame_equal(cold, warm)
+    assert warm["2020"].tolist() == [1000.0, 2500.0]
+
+
+def test_load_cleaned_rebuilds_when_source_changes(tmp_path):
+    src = tmp_path / "gdp.csv"
+    _write_csv(src, "1,000")
+    loader = DataLoader()
+    loader.load_cleaned(str(src))
+
+    _write_csv(src, "3,000")
+    df = loader.load_cleaned(str(src))
+    assert loader.last_cache_hit is False
+    assert df["2020"].tolist() == [3000.0, 2500.0]
+
+
+def test_load_lazy_reads_only_requested_columns(tmp_path):
+    from configLoader import required_columns
+
+    src = tmp_path / "gdp.csv"
+    _write_csv(src, "1,000")
+    cfg = {"year": 2020, "operation": "sum", "charts": {"country_chart": "line"}}
+    assert required_columns(cfg) is None
+    columns = required_columns(cfg, charts=False)
+
+    for use_cache in (False, True):
+        loader = DataLoader()
+        loader.load_cleaned(str(src))
+        lazy = loader.load_lazy(str(src), use_cache=use_cache)
+        df = lazy.frame(columns)
+        assert lazy.loaded_columns == ["Country Name", "Continent", "2020"]
+        assert df["2020"].tolist() == [1000.0, 2500.0]
+        assert df.attrs["fingerprint"] == loader.fingerprint
@@ -0,0 +1,29 @@
+import pandas as pd
+from dataLoader import DataLoader
+
+
+def _frame():
+    return pd.DataFrame({
+        "Country Name": ["Nigeria", "Kenya", "India", "France"],
+        "Continent": ["Africa", "Africa ", "Asia", "Europe"],
+        "2020": [1.0, 2.0, 3.0, 4.0],
+    })
+
+
+def test_filter_by_config_matches_case_and_whitespace():
+    df = _frame()
+    filtered = DataLoader().filter_by_config(df, {"region": " AFRICA", "country": "kenya"})
+    assert filtered["Country Name"].tolist() == ["Kenya"]
+    assert filtered.index.tolist() == [1]
+
+
+def test_filter_by_config_accepts_lists_in_row_order():
+    df = _frame()
+    loader = DataLoader()
+    filtered = loader.filter_by_config(df, {"region": ["Europe", "Asia"]})
+    assert filtered["Country Name"].tolist() == ["India", "France"]
+    assert loader.positions_for_config(df, {"country": ["France", "Nigeria"]}).tolist() == [0, 3]
+    # a label edited in place is seen once the frame's index is dropped
+    df.loc[0, "Continent"] = "Asia"
+    loader.forget(df)
+    assert loader.positions_for_config(df, {"region": "Asia"}).tolist() == [0, 2]
@@ -0,0 +1,29 @@
+import xml.etree.ElementTree as ET
+from fastRender import TemplateRenderer, svg_chart
+
+BAR = {"kind": "region_bar", "data": {"labels": ["A", "B & C", "D"], "values": [3.0, float("nan"), 1.0]},
+       "params": {"region": "Asia", "year": 2020}}
+PIE = {"kind": "year_pie", "data": {"labels": ["Asia", "Europe"], "values": [3.0, 1.0]}, "params": {"year": 2020}}
+LINE = {"kind": "country_line", "data": {"years": [2019, 2020, 2021], "values": [1.0, float("nan"), 2.0]},
+        "params": {"country": "A"}}
+
+
+def test_template_renderer_reuses_one_figure_per_kind():
+    renderer = TemplateRenderer()
+    first = renderer.render(BAR)
+    figure = renderer.templates["region_bar"]["figure"]
+    second = renderer.render({**BAR, "data": {"labels": ["X", "Y"], "values": [1.0, 2.0]}})
+    assert first.startswith(b"\x89PNG") and second.startswith(b"\x89PNG") and first != second
+    assert renderer.templates["region_bar"]["figure"] is figure
+    assert len(renderer.templates["region_bar"]["bars"].get_paths()) == 2
+    assert renderer.render(PIE, "svg").lstrip().startswith(b"<?xml")
+
+
+def svg_texts(job):
+    return [t.text for t in ET.fromstring(svg_chart(job)).iter("{http://www.w3.org/2000/svg}text")]
+
+
+def test_svg_chart_writes_well_formed_svg_for_every_shape():
+    assert svg_texts(BAR)[0] == "GDP by Country — Asia (2020)" and "B & C" in svg_texts(BAR)
+    assert svg_texts(PIE)[0] == "GDP Distribution by Continent (2020)" and "75.00%" in svg_texts(PIE)
+    assert svg_texts(LINE)[0] == "GDP over time — A"
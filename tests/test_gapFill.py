@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from dataLoader import DataLoader
+from dataProcessor import DataProcessor
+from gapFill import carry_forward, forward_fill, interpolate_linear
+
+NAN = np.nan
+BLOCK = np.array([[NAN, 1.0, NAN, NAN, 4.0, NAN],
+                  [2.0, NAN, 6.0, NAN, NAN, NAN]])
+
+
+def test_fill_methods_and_masks():
+    filled, imputed = interpolate_linear(BLOCK)
+    assert np.allclose(filled[0, 1:5], [1.0, 2.0, 3.0, 4.0]) and np.isnan(filled[0, [0, 5]]).all()
+    assert imputed.tolist() == [[False, False, True, True, False, False],
+                                [False, True, False, False, False, False]]
+    assert interpolate_linear(BLOCK, limit=1)[1][0].sum() == 0
+
+    filled, imputed = forward_fill(BLOCK, limit=1)
+    assert filled[1].tolist()[:4] == [2.0, 2.0, 6.0, 6.0] and np.isnan(filled[1, 4])
+
+    filled, imputed = carry_forward(BLOCK)
+    assert filled[1].tolist()[2:] == [6.0, 6.0, 6.0, 6.0] and np.isnan(filled[1, 1])
+    assert imputed[0].tolist() == [False] * 5 + [True]
+
+
+def test_process_data_reports_imputed_points():
+    df = pd.DataFrame({"Country Name": ["A", "B", "C"], "Continent": ["Asia"] * 3,
+                       "2019": [1.0, 2.0, 3.0], "2020": [NAN, 4.0, NAN], "2021": [3.0, 6.0, NAN]})
+    df.attrs["fingerprint"] = "abc:v1"
+    filled, imputed = DataLoader().fill_gaps(df, "linear")
+    assert filled.attrs["fingerprint"] != df.attrs["fingerprint"]
+
+    stats = DataProcessor().process_data(filled, {"year": 2020, "operation": "sum"}, imputed=imputed)
+    assert (stats["result"], stats["data_points"]) == (6.0, 2)
+    assert (stats["observed_points"], stats["imputed_points"]) == (1, 1)
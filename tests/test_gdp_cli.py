@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+from dataLoader import DataLoader
+from dataProcessor import DataProcessor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measured around 0.25s for a full `stats` run (interpreter start included);
+# the budget leaves headroom for slow CI machines but catches a regression
+# that drags pandas or matplotlib back into the stats path.
+COLD_START_BUDGET_SECONDS = 1.5
+
+
+def test_stats_cold_start_skips_pandas_and_matplotlib(tmp_path):
+    src = tmp_path / "gdp.csv"
+    pd.read_csv(os.path.join(REPO, "gdp_cleaned_fixed.csv")).to_csv(src, index=False)
+    DataLoader().load_matrix(str(src))  # the store is what the stats path answers from
+
+    script = (
+        "import json, sys, gdp_cli\n"
+        f"gdp_cli.main(['--data', {str(src)!r}, 'stats', '--year', '2020', '--operation', 'sum', "
+        "'--region', 'Asia'])\n"
+        "print(json.dumps(sorted(m for m in ('pandas', 'matplotlib') if m in sys.modules)))\n"
+    )
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", script], cwd=REPO, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+
+    result_line, modules_line = out.stdout.strip().splitlines()
+    assert json.loads(modules_line) == []
+    assert elapsed < COLD_START_BUDGET_SECONDS
+
+    result = json.loads(result_line)
+    df = DataLoader().load_cleaned(str(src))
+    expected = DataProcessor().process_data(df[df["Continent"] == "Asia"], {"year": 2020, "operation": "sum"})
+    assert result["result"] == expected["result"]
+    assert result["data_points"] == expected["data_points"]
+
+
+def test_commands_report_bad_input_with_an_exit_code(tmp_path, capsys):
+    import gdp_cli
+
+    src = tmp_path / "gdp.csv"
+    pd.read_csv(os.path.join(REPO, "gdp_cleaned_fixed.csv")).to_csv(src, index=False)
+    data = ["--data", str(src)]
+    cases = [
+        (["stats", "--year", "1900"], "Year 1900 not present"),
+        (["rank", "--year", "1800"], "Year 1800 not present"),
+        (["stats", "--year", "2020", "--region", "Asai"], "Did you mean: Asia?"),
+        (["series", "yoy", "--country", "Frnace"], "Did you mean: France?"),
+        (["chart", "country_line", "--year", "2020", "--out", str(tmp_path / "c.png")], "needs --country"),
+    ]
+    for argv, message in cases:
+        assert gdp_cli.main(data + argv) == 1
+        out = capsys.readouterr()
+        assert out.out == "" and message in out.err
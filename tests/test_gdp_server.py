@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import threading
+
+import pandas as pd
+from configLoader import config_key
+from dataLoader import DataLoader
+from dataProcessor import DataProcessor
+from gdp_server import GDPServer
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _post(port, path, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+def test_server_answers_stats_and_serves_repeats_from_cache(tmp_path):
+    src = tmp_path / "gdp.csv"
+    pd.read_csv(os.path.join(REPO, "gdp_cleaned_fixed.csv")).to_csv(src, index=False)
+    assert config_key({"year": "2020", "region": " Asia", "charts": {}}) == config_key({"year": 2020, "region": ["asia"]})
+
+    async def scenario():
+        server = GDPServer(str(src))
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            first = await _post(port, "/stats", {"year": 2020, "operation": "sum", "region": "Asia"})
+            second = await _post(port, "/stats", {"year": "2020", "operation": "sum", "region": "asia "})
+            missing = await _post(port, "/stats", {"year": 1800, "operation": "sum"})
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+        return server, first, second, missing
+
+    server, first, second, missing = asyncio.run(scenario())
+
+    loader = DataLoader()
+    df = loader.load_cleaned(str(src))
+    cfg = {"year": 2020, "operation": "sum", "region": "Asia"}
+    expected = DataProcessor().process_data(loader.filter_by_config(df, cfg), cfg)
+    assert first == (200, expected)
+    assert second[1]["result"] == expected["result"]
+    assert missing[0] == 404
+    assert server.stats_cache.stats()["hits"] == 1
+
+
+def test_slow_stats_do_not_block_other_connections_and_cache_is_sized(tmp_path):
+    src = tmp_path / "gdp.csv"
+    pd.read_csv(os.path.join(REPO, "gdp_cleaned_fixed.csv")).to_csv(src, index=False)
+
+    async def scenario():
+        server = GDPServer(str(src), cache_bytes=1)
+        compute = server._process
+        release = threading.Event()
+
+        def slow(config):
+            release.wait(5)
+            return compute(config)
+
+        server._process = slow
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            pending = asyncio.ensure_future(_post(port, "/stats", {"year": 2020, "operation": "sum"}))
+            health = await asyncio.wait_for(_get(port, "/health"), 2)
+            done_early = pending.done()
+            release.set()
+            stats = await pending
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+        return server, health, done_early, stats
+
+    server, health, done_early, stats = asyncio.run(scenario())
+    assert health[0] == 200
+    assert not done_early
+    assert stats[0] == 200
+    # the response is larger than cache_bytes, so it is sized and dropped
+    assert server.stats_cache.stats()["evictions"] == 1
+    assert len(server.stats_cache) == 0
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from dataProcessor import DataProcessor
+from indicatorStore import load_indicators
+
+
+def _write(path, code, rows):
+    pd.DataFrame([
+        {"Country Name": name, "Country Code": cc, "Indicator Name": code, "Indicator Code": code,
+         "Continent": continent, "2019": v19, "2020": v20}
+        for name, cc, continent, v19, v20 in rows
+    ]).to_csv(path, index=False)
+
+
+def test_indicators_align_on_country_code(tmp_path):
+    gdp, pop = tmp_path / "gdp.csv", tmp_path / "pop.csv"
+    _write(gdp, "NY.GDP.MKTP.CD", [("A", "AAA", "Asia", 10.0, 20.0), ("B", "BBB", "Asia", 30.0, None),
+                                   ("C", "CCC", "Europe", 8.0, 9.0)])
+    # different row order, a missing country and a "1,000" style value
+    _write(pop, "SP.POP.TOTL", [("C", "CCC", "Europe", "4", "3"), ("A", "AAA", "Asia", "1,0", 5.0),
+                                ("World", "WLD", "Global", 100.0, 100.0)])
+
+    store = load_indicators([str(gdp), str(pop)], workers=1)
+    assert store.indicators == ["NY.GDP.MKTP.CD", "SP.POP.TOTL"]
+    assert store.values.shape == (2, 4, 2)
+    assert store.year_column("SP.POP.TOTL", 2019)[store.rows_for(["AAA", "CCC"])].tolist() == [10.0, 4.0]
+
+    proc = DataProcessor()
+    per_capita = proc.indicator_ratio(store, "NY.GDP.MKTP.CD", "SP.POP.TOTL")
+    assert per_capita[store.rows_for(["AAA"])[0]].tolist() == [1.0, 4.0]
+    assert np.isnan(per_capita[store.rows_for(["BBB"])[0]]).all()
+
+    labels, means = proc.indicator_weighted_mean(store, "NY.GDP.MKTP.CD", "SP.POP.TOTL", values=per_capita)
+    assert labels == ["Asia", "Europe", "Global", "All"]
+    # population-weighted GDP per capita is total GDP over total population; WLD is left out
+    assert np.allclose(means[-1], [(10.0 + 8.0) / 14.0, (20.0 + 9.0) / 8.0])
+    assert np.isnan(means[2]).all()
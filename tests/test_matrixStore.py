@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from dataLoader import DataLoader
+
+
+def test_load_matrix_memory_maps_and_frames_without_copy(tmp_path):
+    src = tmp_path / "gdp.csv"
+    pd.DataFrame({
+        "Country Name": ["A", "B"],
+        "Country Code": ["AAA", "BBB"],
+        "Indicator Code": ["NY.GDP.MKTP.CD", "NY.GDP.MKTP.CD"],
+        "2019": ["1,000", None],
+        "2020": [2.0, 3.0],
+        "Continent": ["Asia", None],
+    }).to_csv(src, index=False)
+
+    store = DataLoader().load_matrix(str(src))
+    assert isinstance(store.values, np.memmap)
+    assert store.constants == {"Indicator Code": "NY.GDP.MKTP.CD"}
+
+    frame = store.to_frame()
+    assert np.shares_memory(frame["2020"].to_numpy(), store.values)
+    assert frame["2019"].tolist()[0] == 1000.0
+    assert frame["Continent"].tolist()[0] == "Asia"
+    assert pd.isna(frame["Continent"].tolist()[1])
+
+
+def test_load_matrix_rebuilds_a_truncated_or_mismatched_matrix(tmp_path):
+    src = tmp_path / "gdp.csv"
+    pd.DataFrame({
+        "Country Name": ["Straße", "B"],
+        "Country Code": ["AAA", "BBB"],
+        "2020": [2.0, 3.0],
+        "Continent": ["Europe", "Asia"],
+    }).to_csv(src, index=False)
+    loader = DataLoader()
+    matrix_file = str(src) + ".matrix.npy"
+    loader.load_matrix(str(src))
+
+    # a save interrupted part way: the matrix is cut short
+    with open(matrix_file, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 8)
+    assert loader.load_matrix(str(src)).values.tolist() == [[2.0], [3.0]]
+
+    # or a matrix from another save sits next to these labels
+    np.save(matrix_file, np.zeros((3, 1)))
+    store = loader.load_matrix(str(src))
+    assert store.values.tolist() == [[2.0], [3.0]]
+    assert store.select([], ["STRASSE"]).tolist() == [0]
@@ -0,0 +1,23 @@
+import pandas as pd
+from nameIndex import NameIndex
+
+
+def _frame():
+    return pd.DataFrame({
+        "Country Name": ["Nigeria", "Niger", "South Asia", "France"],
+        "Country Code": ["NGA", "NER", "SAS", "FRA"],
+        "Continent": ["Africa", "Africa", "Global", "Europe"],
+    })
+
+
+def test_exact_and_fuzzy_lookup(tmp_path):
+    names = NameIndex.from_frame(_frame())
+    assert names.exact(" south asia ") == "South Asia"
+    assert names.exact("nga", "code") == "NGA" and names.exact("nga", "country") is None
+    assert [s[0] for s in names.suggest("Nigera", "country")] == ["Niger", "Nigeria"]
+    assert names.did_you_mean("Afrika", "continent") == " Did you mean: Africa?"
+
+    names.save(str(tmp_path / "n.names.npz"), "fp")
+    loaded, meta = NameIndex.load(str(tmp_path / "n.names.npz"))
+    assert meta["fingerprint"] == "fp"
+    assert loaded.suggest("Nigera", "country") == names.suggest("Nigera", "country")
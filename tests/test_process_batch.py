@@ -0,0 +1,26 @@
+import pandas as pd
+from dataLoader import DataLoader
+from dataProcessor import DataProcessor
+
+
+def test_process_batch_matches_filtered_process_data_in_order():
+    df = pd.DataFrame({
+        "Country Name": ["Nigeria", "Kenya", "India"],
+        "Continent": ["Africa", "Africa", "Asia"],
+        "2020": [1.0, 3.0, 5.0],
+        "2021": [2.0, None, 6.0],
+    })
+    configs = [
+        {"year": 2020, "operation": "sum", "region": "Africa"},
+        {"year": 2021, "operation": "max"},
+        {"year": 2020, "operation": "average", "region": "africa "},
+        {"year": 2020, "operation": "sum", "country": "India"},
+    ]
+    loader = DataLoader()
+    proc = DataProcessor()
+
+    results = list(proc.process_batch(df, configs, loader=loader))
+
+    expected = [proc.process_data(loader.filter_by_config(df, cfg), cfg) for cfg in configs]
+    assert results == expected
+    assert [r["result"] for r in results] == [4.0, 6.0, 2.0, 5.0]
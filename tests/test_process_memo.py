@@ -0,0 +1,50 @@
+from dataLoader import DataLoader
+from dataProcessor import DataProcessor
+
+
+def test_process_data_memo_reuses_results_until_the_data_changes(tmp_path):
+    src = tmp_path / "gdp.csv"
+    src.write_text("Country Name,Continent,2020\nA,Asia,1\nB,Asia,3\nC,Europe,5\n")
+    memo_dir = tmp_path / "memo"
+    loader = DataLoader()
+    df = loader.load_cleaned(str(src), use_cache=False)
+
+    proc = DataProcessor(memo_dir=str(memo_dir))
+    first = proc.process_data(df, {"year": 2020, "operation": "sum", "region": "Asia"})
+    again = proc.process_data(df, {"year": "2020", "operation": "sum", "region": " asia"})
+    assert again == {**first, "year": "2020", "region": " asia"}
+    assert proc.memo.stats()["hits"] == 1
+
+    # a filtered frame keeps the attrs but is a different dataset
+    subset = loader.filter_by_config(df, {"region": "Europe"})
+    assert proc.process_data(subset, {"year": 2020, "operation": "sum"})["result"] == 5.0
+
+    # another process starts warm from disk
+    other = DataProcessor(memo_dir=str(memo_dir))
+    assert other.process_data(df, {"year": 2020, "operation": "sum", "region": "Asia"}) == first
+    assert other.memo.stats()["disk_hits"] == 1
+
+    src.write_text("Country Name,Continent,2020\nA,Asia,10\nB,Asia,3\nC,Europe,5\n")
+    changed = loader.load_cleaned(str(src), use_cache=False)
+    assert other.process_data(changed, {"year": 2020, "operation": "sum", "region": "Asia"})["result"] == 13.0
+
+
+def test_process_data_memo_keys_on_the_loaded_rows(tmp_path):
+    src = tmp_path / "gdp.csv"
+    src.write_text("Country Name,Continent,2020\nA,Asia,1\nB,Asia,3\nC,Europe,5\n")
+    df = DataLoader().load_cleaned(str(src), use_cache=False)
+    proc = DataProcessor()
+    config = {"year": 2020, "operation": "sum", "operations": ["average"]}
+    assert proc.process_data(df, config)["result"] == 9.0
+
+    # same fingerprint and length, other rows
+    assert proc.process_data(df.iloc[[0, 1]], config)["result"] == 4.0
+    assert proc.process_data(df.iloc[[1, 2]], config)["result"] == 8.0
+
+    doubled = df.copy()
+    doubled["2020"] *= 2
+    doubled.attrs.pop("fingerprint")  # derived values: not the loaded dataset any more
+    assert proc.process_data(doubled, config)["result"] == 18.0
+
+    proc.process_data(df, config)["results"]["sum"] = -1.0
+    assert proc.process_data(df, config)["results"]["sum"] == 9.0
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from matrixStore import MatrixStore
+from rankIndex import RankIndex, top_n_with_other
+
+
+def test_rank_index_ranks_countries_and_skips_aggregates():
+    df = pd.DataFrame({
+        "Country Name": ["World", "A", "B", "C", "D"],
+        "Country Code": ["WLD", "AAA", "BBB", "CCC", "DDD"],
+        "2019": [10.0, 4.0, np.nan, 5.0, 1.0],
+        "2020": [12.0, 3.0, 6.0, 2.0, 1.0],
+        "Continent": ["Global", "Asia", "Asia", "Europe", "Asia"],
+    })
+    ranks = RankIndex.from_store(MatrixStore.from_frame(df))
+
+    assert ranks.top(2020, 2) == [("B", 6.0), ("A", 3.0)]
+    assert ranks.bottom(2019, 2) == [("D", 1.0), ("A", 4.0)]
+    assert ranks.rank_of("a", 2019) == 2
+    assert ranks.rank_history("B") == {"2019": None, "2020": 1}
+    assert ranks.rank_of("World", 2020) is None
+    assert ranks.top_in_region("Asia", 2020, 1) == (["B"], [6.0], 4.0)
+
+    assert top_n_with_other(["x", "y", "z"], [1.0, 3.0, 2.0], 2) == (["y", "z", "Other"], [3.0, 2.0, 1.0])
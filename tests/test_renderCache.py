@@ -0,0 +1,31 @@
+from renderCache import RenderCache
+
+
+def _job(value):
+    return {"kind": "year_bar", "data": {"labels": ["Asia"], "values": [value]}, "params": {"year": 2020}}
+
+
+def test_render_cache_hits_on_identical_slice(tmp_path):
+    calls = []
+    renderer = lambda job, fmt: calls.append(job) or b"png-bytes"
+    cache = RenderCache(str(tmp_path))
+
+    assert cache.render(_job(1.0), fmt="png", renderer=renderer) == b"png-bytes"
+    assert cache.render(_job(1.0), fmt="png", renderer=renderer) == b"png-bytes"
+    cache.render(_job(2.0), fmt="png", renderer=renderer)
+
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_render_cache_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path), max_bytes=25)
+    for value in (1.0, 2.0, 3.0):
+        cache.render(_job(value), fmt="png", renderer=lambda job, fmt: b"x" * 10)
+    assert cache.evictions == 1
+    assert cache.get(cache.key(_job(1.0), "png"), "png") is None
+    assert cache.get(cache.key(_job(3.0), "png"), "png") == b"x" * 10
+    # putting a key again replaces its bytes rather than adding to them
+    key = cache.key(_job(3.0), "png")
+    cache.put(key, "png", b"y" * 10, _job(3.0))
+    assert cache.stats()["bytes"] == 20 and cache.evictions == 1
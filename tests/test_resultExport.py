@@ -0,0 +1,65 @@
+import json
+import numpy as np
+import pytest
+from resultExport import BatchWriter, export_matrix, export_records
+
+
+def test_jsonl_export_is_batched_and_atomic(tmp_path):
+    out = tmp_path / "results.jsonl"
+    records = ({"year": 2000 + i, "value": float(i) if i else float("nan")} for i in range(5))
+    assert export_records(records, str(out), batch_rows=2) == 5
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert rows[0] == {"year": 2000, "value": None} and rows[4]["value"] == 4.0
+
+    with pytest.raises(RuntimeError):
+        with BatchWriter(str(out)) as writer:
+            writer.write({"year": [1], "value": [1.0]})
+            raise RuntimeError("interrupted")
+    assert len(out.read_text().splitlines()) == 5
+    assert not (tmp_path / "results.jsonl.tmp").exists()
+
+
+def test_matrix_export_long_rows(tmp_path):
+    block = np.arange(6, dtype=float).reshape(3, 2)
+    out = tmp_path / "growth.jsonl"
+    assert export_matrix(str(out), ["A", "B", "C"], ["2000", "2001"], block, "yoy", batch_rows=3) == 6
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert rows[3] == {"name": "B", "year": 2001, "yoy": 3.0}
+
+
+def test_parquet_roundtrip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "results.parquet"
+    export_records(({"year": y, "value": y / 2} for y in range(10)), str(out), batch_rows=4)
+    assert pq.read_table(out).column("value").to_pylist()[-1] == 4.5
+
+
+def test_export_results_command_validates_and_streams(tmp_path, capsys):
+    import gdp_cli
+    from resultExport import result_rows
+
+    src = tmp_path / "gdp.csv"
+    src.write_text("Country Name,Country Code,Continent,2000,2001\n"
+                   "World,WLD,Global,9,9\nA,AAA,Asia,1,2\nB,BBB,Europe,3,4\n")
+    out = tmp_path / "results.jsonl"
+    base = ["--data", str(src), "export-results", "--out", str(out)]
+    assert gdp_cli.main(base + ["--regions", "Asai"]) == 1
+    assert "Did you mean: Asia?" in capsys.readouterr().err
+    assert gdp_cli.main(base + ["--matrix", "yoy", "--years", "3000-3001"]) == 1
+
+    assert gdp_cli.main(base + ["--operations", "sum", "--regions", "asia"]) == 0
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [(r["year"], r["region"], r["value"]) for r in rows] == [
+        (2000, "All", 4.0), (2000, "Asia", 1.0), (2001, "All", 6.0), (2001, "Asia", 2.0)]
+
+    # by default every continent with countries; Global holds only aggregates
+    assert gdp_cli.main(base + ["--operations", "sum", "--years", "2000"]) == 0
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["region"] for r in rows] == ["All", "Asia", "Europe"]
+
+    stats = {"year": 2000, "operation": "max", "result": None, "data_points": 0}
+    assert next(result_rows([{}], [stats]))["value"] is None
+    # an empty selection writes null, not a zero that looks real
+    stats = {"year": 2000, "operation": "sum", "result": 0.0, "data_points": 0,
+             "results": {"sum": 0.0, "count": 0.0}}
+    assert [r["value"] for r in result_rows([{"region": "Global"}], [stats])] == [None, 0.0]
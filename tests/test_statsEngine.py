@@ -0,0 +1,24 @@
+import math
+import pandas as pd
+from dataProcessor import DataProcessor
+from statsEngine import compute_statistics
+
+
+def test_compute_statistics_ignores_nan_and_shares_one_pass():
+    stats = compute_statistics([1.0, float("nan"), 3.0, 2.0], ["sum", "average", "min", "max",
+                                                               "count", "median", "std", "p50"])
+    assert stats["sum"] == 6.0
+    assert stats["average"] == 2.0
+    assert (stats["min"], stats["max"], stats["count"]) == (1.0, 3.0, 3.0)
+    assert stats["median"] == stats["p50"] == 2.0
+    assert math.isclose(stats["std"], math.sqrt(2 / 3))
+
+
+def test_process_data_returns_all_requested_operations():
+    df = pd.DataFrame({"2020": [10.0, None, 30.0], "pop": [1.0, 5.0, 3.0]})
+    stats = DataProcessor().process_data(
+        df, {"year": 2020, "operation": "sum", "operations": ["average", "weighted_mean"],
+             "weights": "pop"})
+    assert stats["result"] == 40.0
+    assert stats["data_points"] == 2
+    assert stats["results"] == {"sum": 40.0, "average": 20.0, "weighted_mean": 25.0}
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import timeSeries
+
+
+def test_metrics_match_pandas_and_keep_leading_gaps():
+    values = np.array([
+        [np.nan, np.nan, 100.0, 110.0, 121.0, np.nan, 133.1],
+        [50.0, 40.0, 60.0, 30.0, 90.0, 45.0, 60.0],
+    ])
+    years = list(range(1984, 1991))
+    frame = pd.DataFrame(values)
+
+    growth = timeSeries.yoy_growth(values)
+    assert np.isnan(growth[0, :3]).all()
+    assert np.allclose(growth[0, 3:5], 0.1)
+
+    rates = timeSeries.cagr(values, years, 1984, 1990)
+    assert np.isclose(rates[0], 1.331 ** (1 / 4) - 1)  # measured from 1986, its first year
+    assert np.isclose(rates[1], (60 / 50) ** (1 / 6) - 1)
+
+    expected_mean = frame.T.rolling(3, min_periods=2).mean().T.to_numpy()
+    assert np.allclose(timeSeries.rolling_mean(values, 3, 2), expected_mean, equal_nan=True)
+    expected_std = frame.T.rolling(3, min_periods=2).std().T.to_numpy()
+    assert np.allclose(timeSeries.rolling_std(values, 3, 2), expected_std, equal_nan=True)
+
+    totals = timeSeries.nan_cumsum(values)
+    assert np.isnan(totals[0, :2]).all()
+    assert totals[0, 5] == 331.0 and totals[0, 6] == 464.1
+
+
+def test_select_rows_is_a_view_for_contiguous_rows():
+    values = np.arange(20.0).reshape(5, 4)
+    assert np.shares_memory(timeSeries.select_rows(values, np.array([1, 2, 3])), values)
+    assert timeSeries.select_rows(values, np.array([0, 4])).tolist() == [values[0].tolist(), values[4].tolist()]
+
+
+def test_windowed_metrics_agree_across_row_blocks(monkeypatch):
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(10.0, 1.0, size=(10, 12))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    whole = [f(values, 4, 2) for f in (timeSeries.rolling_mean, timeSeries.rolling_std, timeSeries.volatility)]
+
+    monkeypatch.setattr(timeSeries, "BLOCK_ROWS", 3)
+    blocked = [f(values, 4, 2) for f in (timeSeries.rolling_mean, timeSeries.rolling_std, timeSeries.volatility)]
+    for a, b in zip(whole, blocked):
+        assert np.allclose(a, b, equal_nan=True)
+    expected = pd.DataFrame(values).T.rolling(4, min_periods=2).std().T.to_numpy()
+    assert np.allclose(blocked[1], expected, equal_nan=True)
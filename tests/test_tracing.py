@@ -0,0 +1,57 @@
+import json
+import os
+
+import chart_jobs
+import tracing
+from dataLoader import DataLoader
+from tracing import Tracer, span, traced
+
+
+@traced("double", rows=len)
+def double(values):
+    return values * 2
+
+
+def test_spans_are_noops_when_tracing_is_off():
+    assert span("anything") is span("other")
+    assert double([1]) == [1, 1]
+    assert not tracing.tracing_enabled()
+
+
+def test_tracer_records_nested_stages(tmp_path):
+    csv = tmp_path / "gdp.csv"
+    csv.write_text("Country Name,Continent,2020\nA,Asia,\"1,000\"\nB,Asia,2\n")
+    loader = DataLoader()
+
+    with Tracer() as tracer:
+        with span("outer") as s:
+            df = loader.load_cleaned(str(csv), use_cache=False)
+            s.set_rows(len(df))
+
+    names = [r["name"] for r in tracer.records]
+    assert names == ["load_csv", "clean_numeric_columns", "load_cleaned", "outer"]
+    outer = tracer.records[-1]
+    assert outer["rows"] == 2 and outer["depth"] == 0 and outer["peak_mb"] >= 0
+    assert tracer.records[0]["depth"] == 2
+
+    tracer.write_chrome(str(tmp_path / "trace.json"))
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert not tracing.tracing_enabled()
+
+
+def test_spans_from_worker_processes_are_merged(tmp_path):
+    jobs = [{"kind": "region_bar", "out_path": str(tmp_path / f"{i}.png"),
+             "data": {"labels": ["A", "B"], "values": [1.0, 2.0]}, "params": {"region": "Asia", "year": 2020}}
+            for i in range(2)]
+
+    with Tracer(memory=False) as tracer:
+        assert len(chart_jobs.render_jobs(jobs, workers=2)) == 2
+
+    worker = [r for r in tracer.records if r["name"] == "savefig"]
+    assert len(worker) == 2 and all(r["pid"] != os.getpid() for r in worker)
+    assert all(r["depth"] == 1 for r in worker)
+    outer = tracer.records[-1]
+    assert outer["name"] == "render_jobs"
+    assert all(outer["start"] <= r["start"] <= outer["start"] + outer["wall_s"] for r in worker)
+    assert {e["pid"] for e in tracer.chrome_events()["traceEvents"]} > {os.getpid()}
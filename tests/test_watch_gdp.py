@@ -0,0 +1,31 @@
+import os
+from renderCache import RenderCache
+from watch_gdp import Watcher
+
+RAW = ('Country Name,Country Code,2019,2020,Continent\n'
+       'A,AAA,"1,000",2,Asia\nB,BBB,3,4,Asia\nC,CCC,5,6,Europe\nWorld,WLD,9,12,Global\n')
+
+
+def test_watcher_recleans_changed_cells_only(tmp_path):
+    src, out = tmp_path / "raw.csv", tmp_path / "clean.csv"
+    src.write_text(RAW)
+    cache = RenderCache(str(tmp_path / "charts"))
+    for kind, params in [("region_bar", {"region": "Europe", "year": 2020}),
+                         ("region_bar", {"region": "Asia", "year": 2020}),
+                         ("country_line", {"country": "A"})]:
+        job = {"kind": kind, "data": {}, "params": params}
+        cache.render(job, fmt="png", renderer=lambda job, fmt: b"png")
+
+    watcher = Watcher(str(src), str(out), render_cache=cache)
+    watcher.start()
+    assert watcher.poll() is None
+
+    src.write_text(RAW.replace("C,CCC,5,6", 'C,CCC,5,"6,500"').replace("WLD,9,12", "WLD,9,13"))
+    os.utime(src, ns=(1, os.stat(src).st_mtime_ns + 1))
+    report = watcher.poll()
+
+    assert (report["mode"], report["changed_cells"], report["changed_rows"]) == ("incremental", 2, 2)
+    assert report["continents"] == ["Europe"] and report["cube_recomputed"] == ["Europe"]
+    assert report["charts_invalidated"] == 1
+    assert watcher.df["2020"].tolist() == [2.0, 4.0, 6500.0, 13.0]
+    assert watcher.loader.load_cleaned(str(out))["2019"].tolist() == [1000.0, 3.0, 5.0, 9.0]
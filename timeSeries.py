@@ -0,0 +1,198 @@
+import numpy as np
+from typing import Any, List, Tuple
+
+# Every function takes a countries x years float block (rows are countries,
+# columns consecutive years) and works on all rows at once. Missing years are
+# NaN; a country whose series starts late (Aruba before 1986) simply has
+# leading NaNs, which every function keeps as NaN instead of treating as 0.
+
+METRICS = ('yoy', 'cagr', 'rolling_mean', 'volatility', 'cumsum')
+
+
+def first_valid(values: np.ndarray) -> np.ndarray:
+    """Column of the first non-NaN value per row, -1 for all-NaN rows"""
+    observed = ~np.isnan(values)
+    first = observed.argmax(axis=1)
+    first[~observed.any(axis=1)] = -1
+    return first
+
+
+def yoy_growth(values: np.ndarray) -> np.ndarray:
+    """Year-over-year growth (0.05 = +5%); NaN for the first year, gaps and non-positive bases"""
+    values = np.asarray(values, dtype=np.float64)
+    growth = np.empty(values.shape)
+    growth[:, 0] = np.nan
+    previous = values[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(values[:, 1:], previous, out=growth[:, 1:])
+    growth[:, 1:] -= 1.0
+    growth[:, 1:][previous <= 0] = np.nan
+    return growth
+
+
+def cagr(values: np.ndarray, years: List[Any], start: Any, end: Any,
+         first_available: bool = True) -> np.ndarray:
+    """Compound annual growth rate per row between two years.
+
+    With first_available, a row with no value in ``start`` is measured from
+    its first observed year inside the range instead (so late starters still
+    get a rate over the years they have). Rows without two positive points
+    give NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    years = [int(y) for y in years]
+    j0, j1 = years.index(int(start)), years.index(int(end))
+    if j1 <= j0:
+        raise ValueError("end year must come after start year")
+
+    window = values[:, j0:j1 + 1]
+    if first_available:
+        offset = first_valid(window)
+        rows = np.arange(len(window))
+        begin = np.where(offset >= 0, window[rows, np.maximum(offset, 0)], np.nan)
+        span = (j1 - j0 - offset).astype(np.float64)
+    else:
+        begin = window[:, 0]
+        span = np.full(len(window), float(j1 - j0))
+    finish = window[:, -1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (finish / begin) ** (1.0 / span) - 1.0
+    return np.where((begin > 0) & (finish > 0) & (span > 0), rate, np.nan)
+
+
+def _filled(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(values with NaNs set to 0, NaN mask, observed mask as 0/1 uint8)"""
+    missing = np.isnan(values)
+    filled = values.copy()
+    filled[missing] = 0.0
+    return filled, missing, (~missing).view(np.uint8)
+
+
+# Rows per block for the windowed metrics: a block's working arrays (a few
+# MB) stay in cache, so each extra pass over it costs little
+BLOCK_ROWS = 4096
+
+
+def _blocks(n_rows: int):
+    return (slice(start, start + BLOCK_ROWS) for start in range(0, n_rows, BLOCK_ROWS))
+
+
+def _windowed(running: np.ndarray, window: int) -> np.ndarray:
+    """Running sums along the year axis turned into trailing window sums, in place"""
+    if window < running.shape[1]:
+        running[:, window:] -= running[:, :-window].copy()
+    return running
+
+
+def _rolling_mean_block(values: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    missing = np.isnan(values)
+    sums = np.where(missing, 0.0, values)
+    _windowed(np.cumsum(sums, axis=1, out=sums), window)
+    counts = _windowed(np.cumsum(~missing, axis=1, dtype=np.int32), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sums /= counts
+    sums[counts < min_periods] = np.nan
+    return sums
+
+
+def _rolling_std_block(values: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    missing = np.isnan(values)
+    observed = ~missing
+    counts = np.cumsum(observed, axis=1, dtype=np.int32)
+    # centre each row on its mean first so the sum-of-squares form keeps its precision
+    x = np.where(missing, 0.0, values)
+    x -= x.sum(axis=1, keepdims=True) / np.maximum(counts[:, -1:], 1)
+    x[missing] = 0.0
+
+    squares = _windowed(np.cumsum(x * x, axis=1), window)
+    sums = _windowed(np.cumsum(x, axis=1, out=x), window)
+    counts = _windowed(counts, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sums *= sums
+        sums /= counts
+        squares -= sums
+        squares /= counts - 1.0
+    np.maximum(squares, 0.0, out=squares)
+    np.sqrt(squares, out=squares)
+    squares[counts < min_periods] = np.nan
+    return squares
+
+
+def rolling_mean(values: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """Trailing rolling mean ignoring NaNs; NaN where fewer than min_periods values"""
+    values = np.asarray(values, dtype=np.float64)
+    min_periods = max(window if min_periods is None else min_periods, 1)
+    out = np.empty(values.shape)
+    for rows in _blocks(len(values)):
+        out[rows] = _rolling_mean_block(values[rows], window, min_periods)
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """Trailing rolling sample standard deviation ignoring NaNs.
+
+    One pass of running sums of x and x squared per block of rows, the
+    window sums being differences of those.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    min_periods = max(window if min_periods is None else min_periods, 2)
+    out = np.empty(values.shape)
+    for rows in _blocks(len(values)):
+        out[rows] = _rolling_std_block(values[rows], window, min_periods)
+    return out
+
+
+def volatility(values: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """Rolling standard deviation of year-over-year growth"""
+    values = np.asarray(values, dtype=np.float64)
+    min_periods = max(window if min_periods is None else min_periods, 2)
+    out = np.empty(values.shape)
+    for rows in _blocks(len(values)):
+        # growth of one block at a time, while it is still in cache
+        out[rows] = _rolling_std_block(yoy_growth(values[rows]), window, min_periods)
+    return out
+
+
+def nan_cumsum(values: np.ndarray) -> np.ndarray:
+    """Running total per row; NaN before the first observation, gaps add nothing"""
+    values = np.asarray(values, dtype=np.float64)
+    filled, missing, _ = _filled(values)
+    total = np.cumsum(filled, axis=1, out=filled)
+    total[~np.logical_or.accumulate(~missing, axis=1)] = np.nan
+    return total
+
+
+# -----------------------------
+# Matrix store selections
+# -----------------------------
+
+def select_rows(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Rows at positions; a view when they are one contiguous run"""
+    if len(positions) == 0:
+        return values[:0]
+    first, last = int(positions[0]), int(positions[-1])
+    if last - first + 1 == len(positions) and np.all(np.diff(positions) == 1):
+        return values[first:last + 1]
+    return values[positions]
+
+
+def series_block(store, regions: List[str] | None = None, countries: List[str] | None = None,
+                 start: Any = None, end: Any = None) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """(country names, years, block) of a MatrixStore selection over a year range.
+
+    The year range is a column slice and the whole matrix or a contiguous
+    run of rows is a row slice, so the block is a view of the (possibly
+    memory-mapped) store whenever the selection allows it.
+    """
+    years = [int(y) for y in store.years]
+    j0 = years.index(int(start)) if start is not None else 0
+    j1 = years.index(int(end)) + 1 if end is not None else len(years)
+    if regions or countries:
+        positions = store.select(regions or [], countries or [])
+        rows = select_rows(store.values, positions)
+        names = store.names[positions]
+    else:
+        rows = store.values
+        names = store.names
+    return names, years[j0:j1], rows[:, j0:j1]
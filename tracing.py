@@ -0,0 +1,261 @@
+import functools
+import json
+import os
+import time
+import tracemalloc
+from typing import Dict, Any, Callable, List
+
+# The tracer spans report to, or None when tracing is off. While it is None,
+# span() hands back one shared no-op object and traced() calls straight
+# through, so instrumented code pays a global lookup and nothing else.
+_active = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_rows(self, rows: int) -> None:
+        pass
+
+    def annotate(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed stage; created by span() while a Tracer is active"""
+
+    def __init__(self, tracer: "Tracer", name: str, rows: int | None, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs
+        # highest traced memory seen by spans nested in this one
+        self.child_peak = 0
+
+    def set_rows(self, rows: int) -> None:
+        self.rows = int(rows)
+
+    def annotate(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        tracer = self.tracer
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if tracer.stack:
+                # keep the parent's peak so far before restarting the counter
+                parent = tracer.stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+        tracer.stack.append(self)
+        self.depth = len(tracer.stack) - 1
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        tracer = self.tracer
+        tracer.stack.pop()
+
+        record = {
+            "name": self.name,
+            "start": self.wall_start - tracer.origin,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "rows": self.rows,
+            "depth": self.depth,
+        }
+        if tracer.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            record["peak_mb"] = max(peak - self.mem_start, 0) / 1e6
+            tracemalloc.reset_peak()
+            if tracer.stack:
+                parent = tracer.stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        tracer.records.append(record)
+        return False
+
+
+class Tracer:
+    """Collects spans while active.
+
+        with Tracer() as tracer:
+            run_pipeline()
+        tracer.write_chrome("trace.json")
+
+    Each record holds the stage name, start offset, wall and CPU seconds,
+    rows processed and, with memory=True, the tracemalloc peak above the
+    memory in use when the stage started. Records are appended when a span
+    ends, so nested stages come before the stage that contains them.
+    tracemalloc slows allocation-heavy code down noticeably; use
+    memory=False when the wall/CPU times matter more than the peaks.
+    """
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.records: List[Dict[str, Any]] = []
+        self.stack: List[Span] = []
+        self.origin = time.perf_counter()
+        # wall-clock time at origin, to line up spans from other processes
+        self.epoch = time.time()
+        self._previous = None
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        global _active
+        self._previous = _active
+        _active = self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.origin = time.perf_counter()
+        self.epoch = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return False
+
+    def merge(self, records: List[Dict[str, Any]], epoch: float, pid: int) -> None:
+        """Add records traced in another process, nested under the open span"""
+        shift = epoch - self.epoch
+        depth = len(self.stack)
+        for r in records:
+            self.records.append({**r, "start": r["start"] + shift, "depth": r["depth"] + depth, "pid": pid})
+
+    def summary(self) -> List[str]:
+        """One line per record, in start order and indented by nesting"""
+        lines = []
+        for r in sorted(self.records, key=lambda r: r["start"]):
+            line = f"{'  ' * r['depth']}{r['name']:<{40 - 2 * r['depth']}} {r['wall_s'] * 1000:9.2f} ms wall" \
+                   f" {r['cpu_s'] * 1000:9.2f} ms cpu"
+            if r["rows"] is not None:
+                line += f" {r['rows']:>9} rows"
+            if "peak_mb" in r:
+                line += f" {r['peak_mb']:8.2f} MB peak"
+            lines.append(line)
+        return lines
+
+    # -----------------------------
+    # Output
+    # -----------------------------
+
+    def write_jsonl(self, path: str) -> None:
+        """One JSON record per line, in start order"""
+        _write_atomic(path, "".join(json.dumps(r) + "\n"
+                                    for r in sorted(self.records, key=lambda r: r["start"])))
+
+    def chrome_events(self) -> Dict[str, Any]:
+        """Records in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            args = {"cpu_ms": r["cpu_s"] * 1000, "rows": r["rows"], **r.get("attrs", {})}
+            if "peak_mb" in r:
+                args["peak_mb"] = r["peak_mb"]
+            events.append({"name": r["name"], "ph": "X", "pid": r.get("pid", pid), "tid": 0,
+                           "ts": r["start"] * 1e6, "dur": r["wall_s"] * 1e6, "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome(self, path: str) -> None:
+        _write_atomic(path, json.dumps(self.chrome_events(), default=str))
+
+
+def _write_atomic(path: str, text: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# Instrumentation API
+# -----------------------------
+
+def span(name: str, rows: int | None = None, **attrs: Any):
+    """Context manager timing one stage; a shared no-op when tracing is off"""
+    if _active is None:
+        return _NULL_SPAN
+    return Span(_active, name, rows, attrs)
+
+
+def traced(name: str | None = None, rows: Callable[[Any], int] | None = None):
+    """Decorator form of span(); ``rows`` derives the row count from the result"""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with Span(_active, label, None, {}) as s:
+                result = fn(*args, **kwargs)
+                if rows is not None and result is not None:
+                    s.set_rows(rows(result))
+                return result
+        return wrapper
+    return decorate
+
+
+def tracing_enabled() -> bool:
+    return _active is not None
+
+
+# -----------------------------
+# Worker processes
+# -----------------------------
+
+class _TracedResult:
+    """What a traced worker call sends back: the result plus its spans"""
+
+    def __init__(self, result: Any, records: List[Dict[str, Any]], epoch: float, pid: int):
+        self.result = result
+        self.records = records
+        self.epoch = epoch
+        self.pid = pid
+
+
+def _run_traced(fn: Callable, args: tuple, memory: bool) -> _TracedResult:
+    with Tracer(memory=memory) as tracer:
+        result = fn(*args)
+    return _TracedResult(result, tracer.records, tracer.epoch, os.getpid())
+
+
+def remote(fn: Callable, *args: Any) -> tuple:
+    """(fn, args) to submit to a worker process, traced there while tracing is on here.
+
+        future = pool.submit(*remote(render_chart, job))
+        path = absorb(future.result())
+
+    Spans of a call that raises are lost with it.
+    """
+    if _active is None:
+        return (fn, *args)
+    return (_run_traced, fn, args, _active.memory)
+
+
+def absorb(result: Any) -> Any:
+    """Merge the spans a remote() call returned into the active tracer; returns fn's result"""
+    if not isinstance(result, _TracedResult):
+        return result
+    if _active is not None:
+        _active.merge(result.records, result.epoch, result.pid)
+    return result.result
@@ -0,0 +1,276 @@
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Any, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from clean_gdp import DEFAULT_INPUT, DEFAULT_OUTPUT, clean_cells, clean_file, year_columns
+from countryHierarchy import is_aggregate
+from dataLoader import DataLoader
+from dataProcessor import ResultMemo
+from matrixStore import MATRIX_SUFFIX
+from rankIndex import RANK_SUFFIX
+from renderCache import RenderCache
+
+DEFAULT_INTERVAL = 5.0
+
+
+def read_raw(filepath: str) -> pd.DataFrame:
+    """The raw CSV with every cell kept as its original text ('' for empty)"""
+    return pd.read_csv(filepath, dtype=str, keep_default_na=False)
+
+
+def diff_raw(old: pd.DataFrame, new: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray] | None:
+    """(rows, column positions) of the cells whose text changed.
+
+    None when the files are not cell-for-cell comparable: other columns, or
+    other countries or another row order. Those changes need a full clean.
+    """
+    if list(old.columns) != list(new.columns) or len(old) != len(new):
+        return None
+    if 'Country Code' in new.columns and not old['Country Code'].equals(new['Country Code']):
+        return None
+    return np.nonzero(old.to_numpy() != new.to_numpy())
+
+
+class Watcher:
+    """Keeps a cleaned dataset and its sidecar stores in step with a raw CSV.
+
+    Each refresh of the raw file is diffed against the previous one cell by
+    cell; only the changed cells are re-cleaned, the continent cube is
+    updated for the affected continents, and only the rendered charts and
+    memoized results that depend on the changed (country, year) cells are
+    dropped. Structural changes (new countries or years) fall back to a
+    full clean.
+    """
+
+    def __init__(self, input_file: str = DEFAULT_INPUT, output_file: str = DEFAULT_OUTPUT,
+                 render_cache: RenderCache | None = None, memo_dir: str | None = None):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.render_cache = render_cache
+        self.memo_dir = memo_dir
+        self.loader = DataLoader()
+        self.df = None
+        self.raw = None
+        self._stat = None
+        # continent -> years whose totals the last update changed
+        self.region_years: Dict[str, Set[str]] = {}
+
+    def start(self) -> None:
+        """Clean the input if the output is missing or older, then load both"""
+        if not os.path.exists(self.output_file) or \
+                os.path.getmtime(self.output_file) < os.path.getmtime(self.input_file):
+            clean_file(self.input_file, self.output_file)
+        self._stat = self._source_stat()
+        self.raw = read_raw(self.input_file)
+        self.df = self.loader.load_cleaned(self.output_file)
+        self.loader.load_cube(self.output_file, self.df)
+
+    def _source_stat(self) -> Tuple[int, int]:
+        st = os.stat(self.input_file)
+        return st.st_size, st.st_mtime_ns
+
+    def poll(self) -> Dict[str, Any] | None:
+        """Update if the input changed since the last look; the report, or None"""
+        if self._source_stat() == self._stat:
+            return None
+        return self.update()
+
+    def update(self) -> Dict[str, Any]:
+        """Bring the cleaned file, its caches and the render cache up to date"""
+        seconds: Dict[str, float] = {}
+        start = last = time.perf_counter()
+
+        def lap(stage: str) -> None:
+            nonlocal last
+            now = time.perf_counter()
+            seconds[stage] = now - last
+            last = now
+
+        self._stat = self._source_stat()
+        raw = read_raw(self.input_file)
+        changes = diff_raw(self.raw, raw)
+        lap("diff")
+        old_fingerprint = self.loader.fingerprint
+
+        if changes is None:
+            report = self._full_update()
+            lap("clean")
+        else:
+            rows, cols = changes
+            report = self._apply(raw, rows, cols)
+            lap("clean")
+            if report["changed_cells"]:
+                self.loader.save_cleaned(self.df, self.output_file)
+            lap("write")
+        self.raw = raw
+
+        if report["changed_cells"]:
+            self.loader.load_cube(self.output_file, self.df)
+            report["cube_recomputed"] = self.loader.last_cube_rebuilt
+            lap("cube")
+            report["stores_rebuilt"] = self._refresh_stores()
+            lap("stores")
+            report["charts_invalidated"] = self._invalidate_charts(report)
+            if self.memo_dir and old_fingerprint:
+                report["memo_invalidated"] = ResultMemo(directory=self.memo_dir).invalidate(old_fingerprint)
+            lap("invalidate")
+
+        seconds["total"] = time.perf_counter() - start
+        report["seconds"] = seconds
+        return report
+
+    def _apply(self, raw: pd.DataFrame, rows: np.ndarray, cols: np.ndarray) -> Dict[str, Any]:
+        """Re-clean the changed cells into a copy of the cleaned frame"""
+        report = {"mode": "incremental", "changed_cells": int(len(rows)), "changed_rows": 0,
+                  "countries": [], "years": [], "continents": []}
+        if not len(rows):
+            return report
+
+        # edit a copy, so self.df stays whole if the update fails part way
+        df = self.df.copy()
+        years = set(year_columns(raw.columns))
+        values = raw.to_numpy()
+        for j in np.unique(cols):
+            column = raw.columns[j]
+            changed = rows[cols == j]
+            if column in years:
+                if df[column].dtype != np.float64:
+                    df[column] = df[column].astype(np.float64)
+                df.iloc[changed, df.columns.get_loc(column)] = clean_cells(values[changed, j])
+            else:
+                text = values[changed, j]
+                df.iloc[changed, df.columns.get_loc(column)] = np.where(text == '', None, text)
+        df.attrs = dict(self.df.attrs)
+
+        # years in which a continent total moved, per continent (under the
+        # old and the new label); aggregate rows are in no continent total
+        codes = df['Country Code'].astype(str).to_numpy() if 'Country Code' in df.columns \
+            else np.full(len(df), '')
+        year_cell = np.isin(raw.columns.to_numpy()[cols], list(years))
+        leaf_cell = ~is_aggregate(codes[rows])
+        region_years: Dict[str, Set[str]] = {}
+        for r, j in zip(rows[year_cell & leaf_cell], cols[year_cell & leaf_cell]):
+            for label in {df['Continent'].iat[r], self.df['Continent'].iat[r]}:
+                if isinstance(label, str):
+                    region_years.setdefault(label, set()).add(str(raw.columns[j]))
+        if 'Continent' in raw.columns:
+            # a country moved between continents: both totals change in every year
+            moved = rows[(cols == raw.columns.get_loc('Continent')) & leaf_cell]
+            for r in moved:
+                for label in {df['Continent'].iat[r], self.df['Continent'].iat[r]}:
+                    if isinstance(label, str):
+                        region_years.setdefault(label, set()).update(years)
+
+        self.df = df
+        self.region_years = region_years
+        report.update(changed_rows=int(len(np.unique(rows))),
+                      countries=sorted(set(df['Country Name'].iloc[rows].astype(str))),
+                      years=sorted({str(y) for y in raw.columns.to_numpy()[cols[year_cell]]}),
+                      continents=sorted(region_years))
+        return report
+
+    def _full_update(self) -> Dict[str, Any]:
+        clean_file(self.input_file, self.output_file)
+        self.df = self.loader.load_cleaned(self.output_file)
+        self.region_years = {}
+        return {"mode": "full", "changed_cells": int(self.df.size), "changed_rows": len(self.df),
+                "countries": [], "years": [], "continents": []}
+
+    def _refresh_stores(self) -> List[str]:
+        """Rebuild the matrix store and rank index if they are in use"""
+        rebuilt = []
+        if os.path.exists(self.output_file + MATRIX_SUFFIX):
+            self.loader.load_matrix(self.output_file)
+            rebuilt.append("matrix")
+        if os.path.exists(self.output_file + RANK_SUFFIX):
+            self.loader.load_rank_index(self.output_file)
+            rebuilt.append("rank")
+        return rebuilt
+
+    def _invalidate_charts(self, report: Dict[str, Any]) -> int:
+        if self.render_cache is None:
+            return 0
+        if report["mode"] == "full":
+            return self.render_cache.invalidate(lambda note: True)
+
+        countries = {c.strip().casefold() for c in report["countries"]}
+        region_years = {region.strip().casefold(): years for region, years in self.region_years.items()}
+        any_region_years = set().union(*region_years.values())
+
+        def stale(note: Dict[str, Any]) -> bool:
+            kind, params = note.get("kind"), note.get("params", {})
+            region = str(params.get("region", "")).strip().casefold()
+            year = str(params.get("year"))
+            if kind in ("year_bar", "year_pie"):
+                return year in any_region_years
+            if kind in ("region_bar", "region_pie"):
+                return year in region_years.get(region, ())
+            if kind == "region_line":
+                return region in region_years
+            if kind == "country_line":
+                return str(params.get("country", "")).strip().casefold() in countries
+            return False
+
+        return self.render_cache.invalidate(stale)
+
+    def run(self, interval: float = DEFAULT_INTERVAL, max_updates: int | None = None) -> None:
+        """Poll the input every interval seconds and print a report per update"""
+        updates = 0
+        while max_updates is None or updates < max_updates:
+            report = self.poll()
+            if report is not None:
+                print_report(report)
+                updates += 1
+            else:
+                time.sleep(interval)
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    seconds = report["seconds"]
+    print(f"Update ({report['mode']}): {report['changed_cells']} cell(s) in "
+          f"{report['changed_rows']} row(s), {seconds['total'] * 1000:.1f} ms", flush=True)
+    if report["countries"]:
+        print(f"   countries: {', '.join(report['countries'][:10])}"
+              f"{' ...' if len(report['countries']) > 10 else ''}")
+    if report["years"]:
+        print(f"   years: {', '.join(report['years'])}")
+    for field in ("cube_recomputed", "stores_rebuilt", "charts_invalidated", "memo_invalidated"):
+        if field in report:
+            print(f"   {field.replace('_', ' ')}: {report[field]}")
+    print("   " + ", ".join(f"{stage} {s * 1000:.1f} ms" for stage, s in seconds.items()), flush=True)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Keep the cleaned GDP data in step with its raw CSV")
+    parser.add_argument("input", nargs="?", default=DEFAULT_INPUT)
+    parser.add_argument("output", nargs="?", default=DEFAULT_OUTPUT)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between checks")
+    parser.add_argument("--render-cache", help="render cache directory to invalidate")
+    parser.add_argument("--memo-dir", help="process_data memo directory to invalidate")
+    parser.add_argument("--once", action="store_true", help="bring the output up to date and exit")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"Error: input file '{args.input}' not found")
+        sys.exit(1)
+
+    watcher = Watcher(args.input, args.output,
+                      render_cache=RenderCache(args.render_cache) if args.render_cache else None,
+                      memo_dir=args.memo_dir)
+    watcher.start()
+    print(f"Watching '{args.input}' -> '{args.output}' ({len(watcher.df)} rows)", flush=True)
+    if args.once:
+        return
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()